@@ -1,6 +1,7 @@
 from fastapi import APIRouter
 
-from app.api.endpoints import wireframe
+from app.api.endpoints import image_conversion, wireframe
 
 api_router = APIRouter()
-api_router.include_router(wireframe.router, prefix="/wireframe", tags=["wireframe"])
\ No newline at end of file
+api_router.include_router(wireframe.router, prefix="/wireframe", tags=["wireframe"])
+api_router.include_router(image_conversion.router, prefix="/image", tags=["image"])
\ No newline at end of file
@@ -1,4 +1,6 @@
+import threading
 import time
+from collections import OrderedDict
 from typing import Optional
 import redis
 import json
@@ -6,29 +8,42 @@ from functools import lru_cache
 from pydantic import BaseModel
 
 from app.config import settings
+from app.services.artifacts import ArtifactStore, LocalArtifactBackend, ThumbnailService
+from app.services.conversation import SessionStore
+from app.services.imaging import ImageConversionPool, ImageResultCache, PerceptualHashIndex
+from app.services.wireframe.speculation import SpeculationManager
 
 
 class SimpleCache:
-    """A simple in-memory cache implementation."""
+    """A simple in-memory cache implementation, dropping the least recently used entries beyond max_entries."""
     
-    def __init__(self, ttl: int = 3600):
-        self.cache = {}
+    def __init__(self, ttl: int = 3600, max_entries: Optional[int] = None):
+        self.cache = OrderedDict()
         self.ttl = ttl
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
         
     def get(self, key: str) -> Optional[dict]:
         """Get a value from the cache."""
-        if key in self.cache:
-            value, expiry = self.cache[key]
-            if expiry > time.time():
-                return value
-            else:
-                del self.cache[key]
+        with self.lock:
+            if key in self.cache:
+                value, expiry = self.cache[key]
+                if expiry > time.time():
+                    self.cache.move_to_end(key)
+                    return value
+                else:
+                    del self.cache[key]
         return None
         
     def set(self, key: str, value: dict) -> None:
         """Set a value in the cache."""
         expiry = time.time() + self.ttl
-        self.cache[key] = (value, expiry)
+        with self.lock:
+            self.cache[key] = (value, expiry)
+            self.cache.move_to_end(key)
+            if self.max_entries is not None:
+                while len(self.cache) > self.max_entries:
+                    self.cache.popitem(last=False)
 
 @lru_cache()
 def get_cache():
@@ -43,4 +58,105 @@ def get_cache():
         
     # Use simple in-memory cache for now
     # This could be extended to use Redis or other cache backends
-    return SimpleCache(ttl=settings.CACHE_TTL)
+    return SimpleCache(ttl=settings.CACHE_TTL, max_entries=settings.CACHE_MAX_ENTRIES)
+
+
+@lru_cache()
+def get_artifact_store():
+    """
+    Get the content-addressed store for generated artifacts.
+
+    Returns:
+        ArtifactStore on the local disk backend or None if the store is disabled
+    """
+    if not settings.ARTIFACT_STORE_ENABLED:
+        return None
+
+    # Other backends (object storage, shared volumes) plug in through ArtifactBackend
+    return ArtifactStore(
+        LocalArtifactBackend(settings.ARTIFACT_STORE_PATH),
+        min_compress_size=settings.ARTIFACT_MIN_COMPRESS_SIZE,
+    )
+
+
+@lru_cache()
+def get_thumbnail_service():
+    """
+    Get the thumbnail renderer for stored SVG artifacts.
+
+    Returns:
+        ThumbnailService sharing the artifact store, or None if the store is disabled
+    """
+    artifacts = get_artifact_store()
+    if artifacts is None:
+        return None
+
+    return ThumbnailService(
+        artifacts,
+        max_workers=settings.THUMBNAIL_WORKERS,
+        timeout=settings.THUMBNAIL_TIMEOUT,
+        sizes=[int(size) for size in settings.THUMBNAIL_SIZES.split(",")],
+    )
+
+
+@lru_cache()
+def get_image_pool():
+    """
+    Get the process pool shared by every image conversion endpoint.
+
+    Returns:
+        ImageConversionPool sized from the settings; workers start on first use
+    """
+    return ImageConversionPool(
+        max_workers=settings.IMAGE_WORKERS,
+        timeout=settings.IMAGE_JOB_TIMEOUT,
+        max_queue=settings.IMAGE_MAX_QUEUE,
+    )
+
+
+@lru_cache()
+def get_image_cache():
+    """
+    Get the content-addressed cache of image conversion results.
+
+    Returns:
+        ImageResultCache over the response cache; it converts without caching when caching is disabled
+    """
+    phash_index = None
+    if settings.IMAGE_PHASH_ENABLED:
+        phash_index = PerceptualHashIndex(
+            max_distance=settings.IMAGE_PHASH_MAX_DISTANCE,
+            max_entries=settings.IMAGE_PHASH_MAX_ENTRIES,
+        )
+    return ImageResultCache(get_cache(), phash_index)
+
+
+@lru_cache()
+def get_session_store():
+    """
+    Get the store for server-side conversation sessions.
+
+    Sessions always need a backend, so this does not depend on CACHE_ENABLED.
+
+    Returns:
+        SessionStore backed by the cache implementation
+    """
+    return SessionStore(SimpleCache(ttl=settings.SESSION_TTL, max_entries=settings.SESSION_MAX_ENTRIES))
+
+
+@lru_cache()
+def get_speculation_manager():
+    """
+    Get the manager for speculative pre-generation.
+
+    Returns:
+        SpeculationManager or None if speculation is disabled
+    """
+    if not settings.SPECULATION_ENABLED:
+        return None
+
+    return SpeculationManager(
+        max_workers=settings.SPECULATION_MAX_WORKERS,
+        ttl=settings.SPECULATION_TTL,
+        max_drift=settings.SPECULATION_MAX_DRIFT,
+    )
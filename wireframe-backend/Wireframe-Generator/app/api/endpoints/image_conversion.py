@@ -1,37 +1,110 @@
-from fastapi import APIRouter, HTTPException, File, UploadFile
+import asyncio
+
+import orjson
+from fastapi import APIRouter, HTTPException, File, UploadFile, Depends, Query
+from fastapi.responses import StreamingResponse
+from PIL import UnidentifiedImageError
 from typing import List, Optional
-from ...utils.image_processor import process_image_to_wireframe, detect_ui_elements
+from ...api.dependencies import get_image_cache, get_image_pool
+from ...api.uploads import check_image_bytes, open_batch_uploads, read_image_upload
+from ...config import settings
+from ...services.imaging import PoolSaturatedError
+from ...utils.image_processor import analyze_image, image_bytes_to_svg
 
 router = APIRouter()
 
 @router.post("/image-to-wireframe")
 async def convert_image_to_wireframe(
     file: UploadFile = File(...),
-    detect_elements: bool = True
+    detect_elements: bool = True,
+    image_pool = Depends(get_image_pool),
+    image_cache = Depends(get_image_cache)
 ):
     """
     Convert an uploaded image to a wireframe SVG
     """
     try:
-        # Validate file type
-        if not file.content_type.startswith('image/'):
-            raise HTTPException(status_code=400, detail="File must be an image")
-        
-        # Read file content
-        content = await file.read()
+        # Read the upload into memory, rejecting non-images, oversized files and decompression bombs
+        content = await read_image_upload(file, settings.IMAGE_MAX_UPLOAD_BYTES, settings.IMAGE_MAX_PIXELS)
         
-        # Convert image to wireframe SVG
-        svg_code = process_image_to_wireframe(content)
-        
-        # Detect UI elements if requested
-        elements = None
-        if detect_elements:
-            elements = detect_ui_elements(content)
+        # Convert image to wireframe SVG (and detect UI elements if requested) in the conversion pool,
+        # unless the same picture was converted before
+        svg_code, elements = await image_cache.convert(image_pool, analyze_image, content, detect_elements)
         
         return {
             "svg_code": svg_code,
             "elements": elements,
             "message": "Image successfully converted to wireframe"
         }
+    except HTTPException:
+        raise
+    except UnidentifiedImageError:
+        raise HTTPException(status_code=400, detail="Could not decode the image")
+    except PoolSaturatedError:
+        raise HTTPException(status_code=503, detail="Image conversion is at capacity, retry shortly",
+                            headers={"Retry-After": "1"})
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Image conversion timed out")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/image-to-wireframe/batch")
+async def convert_images_to_wireframes(
+    files: List[UploadFile] = File(...),
+    mode: str = Query("elements", pattern="^(elements|contours)$"),
+    image_pool = Depends(get_image_pool),
+    image_cache = Depends(get_image_cache)
+):
+    """
+    Convert a batch of images, uploaded as several files and/or zip archives.
+
+    Up to IMAGE_BATCH_CONCURRENCY images of the batch are converted at once in the
+    conversion pool, and each result is streamed back as one NDJSON line as soon as
+    it is ready, so results arrive in completion order and carry their batch index.
+    A failing image gets an error line and does not stop the batch. The last line
+    summarises the batch.
+
+    Args:
+        files: Images and zip archives of images
+        mode: "elements" for the detected-element wireframe (as /image-to-wireframe),
+              "contours" for the traced-edge wireframe
+    """
+    items = await open_batch_uploads(files, settings.IMAGE_BATCH_MAX_FILES, settings.IMAGE_MAX_UPLOAD_BYTES)
+    semaphore = asyncio.Semaphore(settings.IMAGE_BATCH_CONCURRENCY)
+
+    async def convert(index: int, filename: str, read) -> dict:
+        async with semaphore:
+            try:
+                content = check_image_bytes(await read(), settings.IMAGE_MAX_UPLOAD_BYTES, settings.IMAGE_MAX_PIXELS)
+                if mode == "contours":
+                    svg_code, elements = await image_cache.convert(image_pool, image_bytes_to_svg, content, "contours"), None
+                else:
+                    svg_code, elements = await image_cache.convert(image_pool, analyze_image, content, True)
+                return {"index": index, "filename": filename, "status": 200, "svg_code": svg_code, "elements": elements}
+            except HTTPException as e:
+                return {"index": index, "filename": filename, "status": e.status_code, "error": e.detail}
+            except UnidentifiedImageError:
+                return {"index": index, "filename": filename, "status": 400, "error": "Could not decode the image"}
+            except PoolSaturatedError:
+                return {"index": index, "filename": filename, "status": 503, "error": "Image conversion is at capacity"}
+            except asyncio.TimeoutError:
+                return {"index": index, "filename": filename, "status": 504, "error": "Image conversion timed out"}
+            except Exception as e:
+                return {"index": index, "filename": filename, "status": 500, "error": str(e)}
+
+    async def results():
+        tasks = [asyncio.ensure_future(convert(index, *item)) for index, item in enumerate(items)]
+        converted = 0
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                result = await next_result
+                converted += result["status"] == 200
+                yield orjson.dumps(result) + b"\n"
+        finally:
+            # the client went away: drop the images that have not started
+            for task in tasks:
+                task.cancel()
+        yield orjson.dumps({"done": True, "images": len(tasks), "converted": converted, "failed": len(tasks) - converted}) + b"\n"
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
@@ -1,18 +1,26 @@
 from http.client import HTTPException
-from app.api.dependencies import get_cache
+from app.api.dependencies import get_artifact_store, get_cache, get_image_cache, get_image_pool, get_session_store, get_speculation_manager, get_thumbnail_service
 from app.models.wireframe import WireframeRequest, WireframeResponse
 from app.services.wireframe.graph import generate_wireframe
+from app.services.wireframe.agents import llm_client_options
+from app.services.conversation import ConversationSession, get_intent_classifier, has_common_pattern
+from app.services.artifacts import MEDIA_TYPES, THUMBNAIL_FORMATS, etag_for, etag_matches, rasterizer_available
+from app.api.responses import PreparedWireframe
+from app.api.uploads import read_image_upload
 from app.config import settings
-from app.utils.image_processor import image_to_svg
+from app.services.imaging import PoolSaturatedError
+from app.services.wireframe.image_plan import image_requirements, image_wireframe_plan
+from app.utils.image_processor import detect_layout, image_bytes_to_svg
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langsmith import traceable
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, UploadFile, File
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, UploadFile, File, Form, Request, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, JSONResponse, Response
 from pydantic import BaseModel
+import asyncio
+import hashlib
 import time
 from typing import List, Dict, Any, Optional
-import tempfile
-import os
 
 
 
@@ -24,12 +32,15 @@ class ChatMessage(BaseModel):
     content: str
 
 class ConversationRequest(BaseModel):
-    messages: List[ChatMessage]
+    messages: List[ChatMessage] = []
     user_input: str
+    session_id: Optional[str] = None
+    start_session: bool = False
 
 class ConversationResponse(BaseModel):
     response: str
     should_generate: bool = False
+    session_id: Optional[str] = None
 
 
 def get_conversation_llm():
@@ -41,67 +52,73 @@ def get_conversation_llm():
         max_tokens=None,
         timeout=None,
         max_retries=3,
+        **llm_client_options(),
     )
 
 @router.post("/conversation", response_model=ConversationResponse)
 @traceable
-async def handle_conversation(request: ConversationRequest):
+async def handle_conversation(
+    request: ConversationRequest,
+    sessions = Depends(get_session_store),
+    speculation = Depends(get_speculation_manager)
+    ):
     """
     Handle intelligent conversation for wireframe requirements gathering.
+
+    With a `session_id` the history lives on the server: the request only carries
+    the new `user_input`, plus any messages the client added locally since the last
+    turn. Without one, the full `messages` history is used for this turn only, unless
+    `start_session` asks to keep it as a new session whose id is returned.
     
     Args:
-        request: ConversationRequest containing message history and new user input
+        request: ConversationRequest containing the new user input and a session id or message history
         
     Returns:
-        ConversationResponse with AI-generated response and generation flag
+        ConversationResponse with AI-generated response, generation flag and session id
     """
     
+    if request.session_id:
+        session = sessions.get(request.session_id)
+        if session is None:
+            raise HTTPException(status_code=404, detail="Unknown or expired conversation session")
+        for msg in request.messages:
+            session.append(msg.role, msg.content)
+    else:
+        session = ConversationSession.from_messages(request.messages)
+
     try:
-        # Get conversation history
-        conversation_history = "\n".join([f"{msg.role}: {msg.content}" for msg in request.messages])
-        
-        # Analyze if we can generate immediately based on knowledge
-        user_input_lower = request.user_input.lower()
-        
-        # Knowledge-based immediate generation for common patterns
-        common_patterns = [
-            'website', 'homepage', 'landing page', 'site',
-            'dashboard', 'admin panel', 'control panel',
-            'e-commerce', 'shop', 'store', 'marketplace',
-            'app', 'mobile app', 'application',
-            'blog', 'news', 'article', 'content',
-            'portfolio', 'profile', 'resume',
-            'login', 'signup', 'authentication',
-            'contact', 'about', 'services',
-            'restaurant', 'cafe', 'food', 'menu',
-            'booking', 'reservation', 'appointment',
-            'fitness', 'gym', 'health', 'workout',
-            'social', 'chat', 'messaging', 'forum',
-            'education', 'learning', 'course', 'school',
-            'finance', 'banking', 'payment', 'wallet'
-        ]
-        
         # Check if user described something we have knowledge about
-        has_clear_pattern = any(pattern in user_input_lower for pattern in common_patterns)
-        
-        # Also check conversation history for patterns
-        conversation_text = conversation_history.lower()
-        has_pattern_in_history = any(pattern in conversation_text for pattern in common_patterns)
-        
-        # Count assistant messages
-        assistant_messages = [msg for msg in request.messages if msg.role == 'assistant']
-        question_count = len(assistant_messages)
+        has_clear_pattern = has_common_pattern(request.user_input)
+
+        question_count = session.question_count
+
+        # Clear-cut turns are decided locally, only ambiguous ones go to the LLM. The new
+        # message is scored with a few of the user's previous ones, so the cost of a turn
+        # does not grow with the length of the conversation
+        intent = None
+        if settings.INTENT_CLASSIFIER_ENABLED and not session.wireframe_created:
+            context = session.recent_user_text(settings.INTENT_CONTEXT_MESSAGES)
+            intent = get_intent_classifier().decide(
+                f"{context}\n{request.user_input}" if context else request.user_input,
+                generate_threshold=settings.INTENT_GENERATE_THRESHOLD,
+                ask_threshold=settings.INTENT_ASK_THRESHOLD,
+            )
         
         # Force generation after 3-4 questions to prevent endless questioning
         # Force generation after 3-4 questions or if we have detailed info
-        if (question_count >= 3 or (has_clear_pattern and question_count >= 2)) and not any(msg.content.lower().startswith("perfect! i've created your wireframe") for msg in request.messages):
-            return ConversationResponse(
-                response="Perfect! I understand what you need. Let me create your wireframe using my knowledge of proven UI patterns and best practices.",
-                should_generate=True
-            )
-        
-        # Only ask ONE clarifying question if we truly don't understand
-        prompt = f"""You are an expert UX/UI consultant. Analyze the user request and ask ONE intelligent follow-up question. 
+        if (question_count >= 3 or (has_clear_pattern and question_count >= 2)) and not session.wireframe_created:
+            response_text = "Perfect! I understand what you need. Let me create your wireframe using my knowledge of proven UI patterns and best practices."
+            should_generate = True
+        elif intent and intent.action == "generate":
+            response_text = "Perfect! I understand what you need. Let me create your wireframe using my knowledge of proven UI patterns and best practices."
+            should_generate = True
+        elif intent and intent.action == "ask":
+            response_text = intent.question
+            should_generate = False
+        else:
+            # Only ask ONE clarifying question if we truly don't understand
+            conversation_history = session.history_text
+            prompt = f"""You are an expert UX/UI consultant. Analyze the user request and ask ONE intelligent follow-up question. 
 
 User's input: {request.user_input}
 Conversation: {conversation_history}
@@ -114,49 +131,123 @@ Examples of good single questions:
 
 Be brief and helpful. Ask only ONE question that is directly relevant to their request:"""
 
-        model = get_conversation_llm()
-        response = model.invoke(prompt)
-        
-        # Check if AI thinks we should generate the wireframe
-        should_generate = (
-            "enough information" in response.content.lower() or
-            "get started" in response.content.lower() or
-            "create your wireframe" in response.content.lower()
-        )
+            model = get_conversation_llm()
+            response = model.invoke(prompt)
+            response_text = response.content
+            
+            # Check if AI thinks we should generate the wireframe
+            response_lower = response_text.lower()
+            should_generate = (
+                "enough information" in response_lower or
+                "get started" in response_lower or
+                "create your wireframe" in response_lower
+            )
+
+        session.append("user", request.user_input)
+        session.append("assistant", response_text)
+        # clients that neither continue nor start a session resend their history every turn
+        persisted = bool(request.session_id or request.start_session)
+        if persisted:
+            sessions.save(session)
+
+        # start the upstream stages early once the conversation is about to converge
+        if persisted and speculation and (should_generate or (
+            session.pattern_in_history and session.turns_until_generation() <= settings.SPECULATION_TURNS_AHEAD
+        )):
+            speculation.start(session.session_id, session.user_description())
         
         return ConversationResponse(
-            response=response.content,
-            should_generate=should_generate
+            response=response_text,
+            should_generate=should_generate,
+            session_id=session.session_id if persisted else None
         )
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Conversation error: {str(e)}")
 
 
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Validate a comma separated `fields=` selection against the response model."""
+    if not fields:
+        return None
+    selected = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in selected if field not in WireframeResponse.model_fields]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(WireframeResponse.model_fields)}"
+        )
+    return selected
+
+
 @router.post("/generate", response_model=WireframeResponse)
 async def create_wireframe(
     request: WireframeRequest, 
     background_tasks: BackgroundTasks, 
-    cache= Depends(get_cache)
+    http_request: Request,
+    fields: Optional[str] = Query(default=None, description="Comma separated response fields to return, e.g. svg_code,artifacts"),
+    cache= Depends(get_cache),
+    sessions = Depends(get_session_store),
+    speculation = Depends(get_speculation_manager),
+    artifacts = Depends(get_artifact_store)
     ):
     """
     Generate a wireframe from a user query.
+
+    When the request names a conversation session whose speculative run still covers
+    the session's description, generation resumes from its expanded query and
+    requirements. Such results are not cached, as they stem from the session's run.
+
+    Results are written to the artifact store and their ids returned in `artifacts`;
+    with `ids_only` the SVG, requirements and plan are not inlined at all and clients
+    fetch them from /artifacts/{id}.
+
+    `fields=` limits the JSON to the named top-level fields, and a request whose
+    Accept header prefers `image/svg+xml` receives the SVG bytes directly, without
+    the JSON envelope and its escaping. The cache holds the serialized response, so
+    hits skip model validation and JSON encoding.
     
     Args:
-        request: The user's description of the desired wireframe
+        request: The user's description of the desired wireframe, the number of variants and an optional session id
+        fields: Comma separated response fields to return
         
     Returns:
         State containing the generated wireframe and intermediary data
     """
 
+    if request.ids_only and not artifacts:
+        raise HTTPException(status_code=400, detail="ids_only requires the artifact store to be enabled")
+    selected_fields = parse_fields(fields)
+    accept = http_request.headers.get("accept", "")
+
+    # variants share the cache only with requests asking for the same number of layouts
+    cache_key = request.user_query if request.variants == 1 else f"{request.user_query}#variants={request.variants}"
+
     if cache:
-        cache_result = cache.get(request.user_query)
+        cache_result = cache.get(cache_key)
         if cache_result:
-            return cache_result
+            return cache_result.render(request.ids_only, selected_fields, accept, cache_status="hit")
+
+    partial_state = None
+    session = sessions.get(request.session_id) if speculation and request.session_id else None
+    if session:
+        # clients wrap the conversation in their own prompt, so the run is matched against the
+        # session's description as it stands now rather than against `user_query`
+        future = speculation.claim(request.session_id, session.user_description())
+        if future:
+            try:
+                partial_state = await asyncio.wrap_future(future)
+            except Exception:
+                partial_state = None
+            if not partial_state or partial_state.get("errors"):
+                partial_state = None
+                speculation.unusable()
 
     try:
-        # generate the wireframe
-        result = generate_wireframe(request.user_query)
+        # generate the wireframe; the graph blocks on LLM calls, so it runs off the event loop
+        result = await run_in_threadpool(
+            generate_wireframe, request.user_query, variants=request.variants, partial_state=partial_state
+        )
 
         # check for errors
         if result.get("errors") and len(result['errors']) > 0:
@@ -171,20 +262,35 @@ async def create_wireframe(
                 }
             )
         
+        # persist the artifacts, hashing and compressing off the event loop
+        artifact_ids = None
+        svg_variants = result.get('svg_variants') if request.variants > 1 else None
+        if artifacts:
+            artifact_ids = await run_in_threadpool(artifacts.store_result, result)
+            for variant in svg_variants or []:
+                if variant.get("svg_code"):
+                    variant["artifact_id"] = await run_in_threadpool(artifacts.put_svg, variant["svg_code"])
+
         # Prepare the response
         respnonse = WireframeResponse(
             svg_code = result['svg_code'],
             detailed_requirements = result.get('detailed_requirements'), 
             wireframe_plan = result.get('wireframe_plan'),
+            svg_variants = svg_variants,
+            svg_optimization = result.get('svg_optimization'),
+            artifacts = artifact_ids,
             errors = result.get('errors'),
             status = 200
         )
 
-        # store in cache if enabled
-        if cache:
-            background_tasks.add_task(cache.set, request.user_query, respnonse)
+        # serialize once; the cache keeps the encoded bytes instead of the model
+        prepared = PreparedWireframe(respnonse)
 
-        return respnonse
+        # store in cache if enabled; a speculative result answers the session's description, not the query itself
+        if cache and partial_state is None:
+            background_tasks.add_task(cache.set, cache_key, prepared)
+
+        return prepared.render(request.ids_only, selected_fields, accept, cache_status="miss")
     
     
     except Exception as e:
@@ -198,55 +304,260 @@ async def create_wireframe(
 @router.post("/image-to-wireframe", response_model=WireframeResponse)
 async def convert_image_to_wireframe(
     file: UploadFile = File(...),
-    background_tasks: BackgroundTasks = None,
-    cache = Depends(get_cache)
+    image_pool = Depends(get_image_pool),
+    image_cache = Depends(get_image_cache)
     ):
     """
     Convert an uploaded image to a wireframe SVG.
     """
     try:
-        # Check if file is an image
-        if not file.content_type.startswith('image/'):
+        # Read the upload into memory, rejecting non-images, oversized files and decompression bombs
+        content = await read_image_upload(file, settings.IMAGE_MAX_UPLOAD_BYTES, settings.IMAGE_MAX_PIXELS)
+
+        # Convert image to SVG wireframe in the conversion pool, unless the same picture was converted before
+        svg_code = await image_cache.convert(image_pool, image_bytes_to_svg, content, "contours")
+
+        response = WireframeResponse(
+            svg_code=svg_code,
+            detailed_requirements={"source": "image-to-wireframe", "filename": file.filename},
+            wireframe_plan={"type": "image-conversion"},
+            errors=None,
+            status=200
+        )
+
+        return response
+
+    except HTTPException:
+        raise
+    except PoolSaturatedError:
+        raise HTTPException(
+            status_code=503,
+            detail="Image conversion is at capacity, retry shortly",
+            headers={"Retry-After": "1"}
+        )
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=504,
+            detail="Image conversion timed out"
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error converting image to wireframe: {str(e)}"
+        )
+
+
+@router.post("/image-guided", response_model=WireframeResponse)
+async def create_wireframe_from_image(
+    http_request: Request,
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    hint: str = Form(default="", max_length=500, description="Optional short description of the screen"),
+    variants: int = Form(default=1, ge=1, le=4),
+    cache = Depends(get_cache),
+    artifacts = Depends(get_artifact_store),
+    image_pool = Depends(get_image_pool),
+    image_cache = Depends(get_image_cache)
+    ):
+    """
+    Generate a wireframe from a screenshot, guided by its detected layout.
+
+    UI elements are detected locally and turned into the wireframe plan, so query
+    expansion, requirement gathering and planning are skipped and only the SVG
+    generation stage calls the LLM. The optional hint names the screen and guides
+    the placeholder labels.
+
+    Returns:
+        Same response as /generate, with the plan built from the screenshot
+    """
+    try:
+        content = await read_image_upload(file, settings.IMAGE_MAX_UPLOAD_BYTES, settings.IMAGE_MAX_PIXELS)
+
+        cache_key = f"image-guided:{hashlib.sha256(content).hexdigest()}:{variants}:{hint.strip()}"
+        if cache:
+            cache_result = cache.get(cache_key)
+            if cache_result:
+                return cache_result.render(False, None, http_request.headers.get("accept", ""), cache_status="hit")
+
+        layout = await image_cache.convert(image_pool, detect_layout, content)
+        if not layout["elements"]:
+            raise HTTPException(status_code=422, detail="No UI elements were detected in the image")
+
+        partial_state = {
+            "detailed_requirements": image_requirements(layout, hint.strip()),
+            "wireframe_plan": image_wireframe_plan(layout, hint.strip()),
+        }
+        result = await run_in_threadpool(
+            generate_wireframe, hint.strip() or "Wireframe of an uploaded screenshot", variants=variants, partial_state=partial_state
+        )
+
+        if result.get("errors"):
             raise HTTPException(
-                status_code=400,
-                detail="File must be an image"
-            )
-            
-        # Create a temporary file to store the uploaded image
-        with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-            temp_file.write(await file.read())
-            temp_file_path = temp_file.name
-            
-        try:
-            # Convert image to SVG wireframe
-            svg_code = await image_to_svg(temp_file_path)
-            
-            response = WireframeResponse(
-                svg_code=svg_code,
-                detailed_requirements={"source": "image-to-wireframe", "filename": file.filename},
-                wireframe_plan={"type": "image-conversion"},
-                errors=None,
-                status=200
+                status_code=500,
+                detail={
+                    "message": "Error generating wireframe",
+                    "wireframe_plan": result['wireframe_plan'],
+                    "svg_code": result['svg_code'],
+                    "errors": result['errors']
+                }
             )
-            
-            # Store in cache if enabled
-            if cache:
-                cache_key = f"image-{file.filename}"
-                background_tasks.add_task(cache.set, cache_key, response)
-                
-            return response
-            
-        finally:
-            # Clean up the temporary file
-            os.unlink(temp_file_path)
-            
+
+        artifact_ids = None
+        svg_variants = result.get('svg_variants') if variants > 1 else None
+        if artifacts:
+            artifact_ids = await run_in_threadpool(artifacts.store_result, result)
+            for variant in svg_variants or []:
+                if variant.get("svg_code"):
+                    variant["artifact_id"] = await run_in_threadpool(artifacts.put_svg, variant["svg_code"])
+
+        prepared = PreparedWireframe(WireframeResponse(
+            svg_code = result['svg_code'],
+            detailed_requirements = result.get('detailed_requirements'),
+            wireframe_plan = result.get('wireframe_plan'),
+            svg_variants = svg_variants,
+            svg_optimization = result.get('svg_optimization'),
+            artifacts = artifact_ids,
+            errors = result.get('errors'),
+            status = 200
+        ))
+        if cache:
+            background_tasks.add_task(cache.set, cache_key, prepared)
+
+        return prepared.render(False, None, http_request.headers.get("accept", ""), cache_status="miss")
+
+    except HTTPException:
+        raise
+    except PoolSaturatedError:
+        raise HTTPException(
+            status_code=503,
+            detail="Image conversion is at capacity, retry shortly",
+            headers={"Retry-After": "1"}
+        )
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=504,
+            detail="Image conversion timed out"
+        )
     except Exception as e:
         raise HTTPException(
             status_code=500,
-            detail=f"Error converting image to wireframe: {str(e)}"
+            detail={
+                "message": f"Error generating wireframe: {str(e)}"
+            }
         )
+
+
+@router.get("/image-pool/stats")
+async def get_image_pool_stats(image_pool = Depends(get_image_pool), image_cache = Depends(get_image_cache)):
+    """
+    Report the image conversion pool's load: running and queued jobs and outcome counters,
+    plus exact and near-duplicate hits of the image result cache.
+    """
+    return {**image_pool.snapshot(), "cache": dict(image_cache.stats)}
     
 
+@router.get("/artifacts/{artifact_id}")
+async def get_artifact(artifact_id: str, request: Request, artifacts = Depends(get_artifact_store)):
+    """
+    Serve a stored artifact by its content hash.
+
+    Artifacts never change, so responses carry a strong ETag and a long-lived
+    immutable Cache-Control. A precompressed brotli or gzip variant is sent when
+    the client accepts it, and a matching If-None-Match gets a 304.
+
+    Args:
+        artifact_id: SHA-256 hex digest returned by /generate
+
+    Returns:
+        The artifact bytes as image/svg+xml or application/json
+    """
+    kind = artifacts.find(artifact_id) if artifacts else None
+    if kind is None:
+        raise HTTPException(status_code=404, detail="Artifact not found")
+
+    name, encoding = artifacts.select(artifact_id, kind, request.headers.get("accept-encoding", ""))
+    etag = etag_for(artifact_id, encoding)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "public, max-age=31536000, immutable",
+        "Vary": "Accept-Encoding",
+    }
+    if encoding:
+        headers["Content-Encoding"] = encoding
+
+    if etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+
+    path = artifacts.backend.local_path(name)
+    if path:
+        return FileResponse(path, media_type=MEDIA_TYPES[kind], headers=headers)
+    return Response(content=artifacts.backend.read(name), media_type=MEDIA_TYPES[kind], headers=headers)
+
+
+@router.get("/artifacts/{artifact_id}/thumbnail")
+async def get_artifact_thumbnail(
+    artifact_id: str,
+    request: Request,
+    width: int = Query(default=320, ge=16, le=settings.THUMBNAIL_MAX_SIZE),
+    height: Optional[int] = Query(default=None, ge=16, le=settings.THUMBNAIL_MAX_SIZE, description="Omit to keep the aspect ratio"),
+    image_format: str = Query(default="png", alias="format", pattern="^(png|webp)$"),
+    artifacts = Depends(get_artifact_store),
+    thumbnails = Depends(get_thumbnail_service)
+    ):
+    """
+    Serve a PNG or WebP thumbnail of a stored SVG artifact.
+
+    Thumbnails are rendered once per artifact, size and format in a process pool
+    and kept next to the artifacts, so gallery pages load small images instead of
+    every full SVG. Sizes are rounded up to the configured THUMBNAIL_SIZES.
+
+    Args:
+        artifact_id: Id of an SVG artifact returned by /generate
+        width: Thumbnail width in pixels
+        height: Thumbnail height in pixels
+        image_format: "png" or "webp"
+
+    Returns:
+        The encoded thumbnail
+    """
+    if not artifacts or artifacts.find(artifact_id) != "svg":
+        raise HTTPException(status_code=404, detail="SVG artifact not found")
+    if not rasterizer_available():
+        raise HTTPException(status_code=501, detail="Thumbnail rendering requires the cairosvg package and the cairo library")
+
+    width, height = thumbnails.snap(width, height)
+    size = f"{width}x{height}" if height else f"{width}w"
+    etag = f'"{artifact_id}-{size}-{image_format}"'
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=31536000, immutable"}
+    if etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+
+    try:
+        name = await thumbnails.thumbnail(artifact_id, width, height, image_format)
+    except PoolSaturatedError:
+        raise HTTPException(status_code=503, detail="Thumbnail rendering is at capacity, retry shortly",
+                            headers={"Retry-After": "1"})
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Thumbnail rendering timed out")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error rendering thumbnail: {str(e)}")
+
+    path = artifacts.backend.local_path(name)
+    if path:
+        return FileResponse(path, media_type=THUMBNAIL_FORMATS[image_format], headers=headers)
+    return Response(content=artifacts.backend.read(name), media_type=THUMBNAIL_FORMATS[image_format], headers=headers)
+
+
+@router.get("/speculation/stats")
+async def speculation_stats(speculation = Depends(get_speculation_manager)):
+    """
+    Report speculative pre-generation hit rate and wasted LLM calls.
+    """
+    if not speculation:
+        return {"enabled": False}
+    return {"enabled": True, **speculation.report()}
+
+
 @router.get("/health")
 async def health_check():
     """
@@ -0,0 +1,113 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
+from fastapi.responses import Response
+
+from app.models.wireframe import WireframeResponse
+
+
+SVG_MEDIA_TYPE = "image/svg+xml"
+JSON_MEDIA_TYPE = "application/json"
+# encoded shapes kept per response besides the full body; rarer selections are encoded per request
+MAX_PREPARED_BODIES = 8
+
+
+def media_quality(accept: str, media_type: str) -> float:
+    """Quality the Accept header gives a media type, counting only exact and type/* ranges."""
+    quality = 0.0
+    for item in accept.split(","):
+        range_, *params = [part.strip() for part in item.split(";")]
+        if range_ not in (media_type, media_type.split("/")[0] + "/*"):
+            continue
+        value = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    value = float(param[2:])
+                except ValueError:
+                    value = 0.0
+        quality = max(quality, value)
+    return quality
+
+
+def wants_raw_svg(accept: str) -> bool:
+    """True when the client explicitly prefers image/svg+xml over JSON."""
+    svg_quality = media_quality(accept, SVG_MEDIA_TYPE)
+    return svg_quality > 0 and svg_quality >= media_quality(accept, JSON_MEDIA_TYPE)
+
+
+def ids_only_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of a response payload with the inlined artifacts dropped, leaving their ids."""
+    variants = payload.get("svg_variants")
+    return {
+        **payload,
+        "svg_code": None,
+        "detailed_requirements": None,
+        "wireframe_plan": None,
+        "svg_variants": [{**variant, "svg_code": None} for variant in variants] if variants else variants,
+    }
+
+
+class PreparedWireframe:
+    """
+    A wireframe response serialized once and kept as bytes.
+
+    The model is validated and dumped a single time when the result is produced.
+    Each response shape (full, ids only, a field selection) is encoded with orjson
+    the first time it is asked for and reused afterwards, so serving a cache hit
+    is a dictionary lookup plus a copy of the body. Field selections are keyed
+    regardless of order and repeats, and at most MAX_PREPARED_BODIES shapes are
+    kept besides the full body, so clients varying `fields=` cannot grow a
+    cached response without bound.
+    """
+
+    def __init__(self, response: WireframeResponse):
+        self.payload = response.model_dump(mode="json")
+        self.svg = (response.svg_code or "").encode("utf-8")
+        self.svg_artifact_id = (response.artifacts or {}).get("svg_code")
+        self.bodies: Dict[Tuple[bool, Optional[Tuple[str, ...]]], bytes] = {
+            (False, None): orjson.dumps(self.payload),
+        }
+
+    def json_body(self, ids_only: bool = False, fields: Optional[List[str]] = None) -> bytes:
+        """
+        Encoded JSON for one response shape.
+
+        Args:
+            ids_only: Drop the inlined artifacts, keeping their ids
+            fields: Top-level fields to keep, or None for all of them
+
+        Returns:
+            orjson-encoded body
+        """
+        key = (ids_only, tuple(sorted(set(fields))) if fields else None)
+        body = self.bodies.get(key)
+        if body is None:
+            payload = ids_only_payload(self.payload) if ids_only else self.payload
+            if fields:
+                # response model order, so every spelling of a selection encodes the same bytes
+                payload = {field: value for field, value in payload.items() if field in key[1]}
+            body = orjson.dumps(payload)
+            if len(self.bodies) <= MAX_PREPARED_BODIES:
+                self.bodies[key] = body
+        return body
+
+    def render(self, ids_only: bool, fields: Optional[List[str]], accept: str, cache_status: str) -> Response:
+        """
+        Build the HTTP response for a request's shaping options.
+
+        Args:
+            ids_only: Drop the inlined artifacts, keeping their ids
+            fields: Top-level fields to keep, or None for all of them
+            accept: Accept header of the request
+            cache_status: "hit" or "miss", sent as X-Cache
+
+        Returns:
+            Raw SVG when the client prefers image/svg+xml, otherwise the encoded JSON
+        """
+        headers = {"X-Cache": cache_status}
+        if wants_raw_svg(accept):
+            if self.svg_artifact_id:
+                headers["X-Artifact-Id"] = self.svg_artifact_id
+            return Response(content=self.svg, media_type=SVG_MEDIA_TYPE, headers=headers)
+        return Response(content=self.json_body(ids_only, fields), media_type=JSON_MEDIA_TYPE, headers=headers)
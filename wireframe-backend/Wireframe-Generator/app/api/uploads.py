@@ -0,0 +1,154 @@
+import zipfile
+from functools import partial
+from io import BytesIO
+from typing import Awaitable, Callable, Iterable, List, Tuple
+
+from fastapi import HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from PIL import Image, UnidentifiedImageError
+
+from app.utils.image_processor import probe_image
+
+
+ZIP_MEDIA_TYPES = ("application/zip", "application/x-zip-compressed")
+
+
+class UploadSizeLimitMiddleware:
+    """
+    ASGI middleware that caps the request body size of upload endpoints.
+
+    A declared Content-Length over the limit is refused before the body is read.
+    Otherwise the bytes are counted as they arrive and the request fails with 413 as
+    soon as the limit is crossed, so an oversized upload is never spooled in full.
+    """
+
+    def __init__(self, app, max_bytes: int, path_suffixes: Iterable[str] = ("/image-to-wireframe",)):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.path_suffixes = tuple(path_suffixes)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].endswith(self.path_suffixes):
+            await self.app(scope, receive, send)
+            return
+
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > self.max_bytes:
+            response = JSONResponse(status_code=413, content={"detail": self.too_large_detail()})
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # re-raised by FastAPI's body parsing and turned into the 413 response
+                    raise HTTPException(status_code=413, detail=self.too_large_detail())
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+    def too_large_detail(self) -> str:
+        return f"Upload exceeds the {self.max_bytes} byte limit"
+
+
+async def read_image_upload(file: UploadFile, max_bytes: int, max_pixels: int) -> bytes:
+    """
+    Read an uploaded image into memory and check it before it is decoded.
+
+    Args:
+        file: Uploaded file
+        max_bytes: Largest accepted upload size
+        max_pixels: Largest accepted width * height
+
+    Returns:
+        The encoded image bytes
+
+    Raises:
+        HTTPException: 400 for non-images, 413 for oversized uploads or decompression bombs
+    """
+    if not (file.content_type or '').startswith('image/'):
+        raise HTTPException(status_code=400, detail="File must be an image")
+
+    # never hold more than the limit, even when the middleware is not mounted
+    return check_image_bytes(await file.read(max_bytes + 1), max_bytes, max_pixels)
+
+
+def check_image_bytes(content: bytes, max_bytes: int, max_pixels: int) -> bytes:
+    """
+    Check the size and header of an encoded image without decoding it.
+
+    Returns:
+        The same bytes
+
+    Raises:
+        HTTPException: 400 if the header is not an image, 413 for oversized images or decompression bombs
+    """
+    if len(content) > max_bytes:
+        raise HTTPException(status_code=413, detail=f"Upload exceeds the {max_bytes} byte limit")
+
+    # only the header is parsed here; decoding happens in the conversion pool
+    try:
+        probe_image(content, max_pixels)
+    except UnidentifiedImageError:
+        raise HTTPException(status_code=400, detail="Could not decode the image")
+    except Image.DecompressionBombError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    return content
+
+
+async def already_read(content: bytes) -> bytes:
+    return content
+
+
+def is_zip_upload(file: UploadFile) -> bool:
+    return file.content_type in ZIP_MEDIA_TYPES or (file.filename or "").lower().endswith(".zip")
+
+
+async def open_batch_uploads(files: List[UploadFile], max_files: int, max_bytes: int) -> List[Tuple[str, Callable[[], Awaitable[bytes]]]]:
+    """
+    List the images of a batch upload: the uploaded images plus the members of uploaded zip archives.
+
+    The uploads are read here, since FastAPI closes them when the endpoint returns
+    and the batch is converted after that, while its response streams. Archive
+    members are only inflated when their reader is called, reading at most
+    max_bytes + 1 bytes, so an oversized member is caught without inflating it.
+
+    Args:
+        files: Uploaded images and zip archives
+        max_files: Most images accepted in one batch
+        max_bytes: Largest accepted image size
+
+    Returns:
+        (filename, reader) per image, in upload and archive order
+
+    Raises:
+        HTTPException: 400 for an unreadable archive or a non-image upload, 413 for too many images
+    """
+    items = []
+    for file in files:
+        if is_zip_upload(file):
+            try:
+                archive = zipfile.ZipFile(BytesIO(await file.read()))
+            except zipfile.BadZipFile:
+                raise HTTPException(status_code=400, detail=f"{file.filename} is not a valid zip archive")
+            for info in archive.infolist():
+                name = info.filename.rsplit("/", 1)[-1]
+                if info.is_dir() or not name or name.startswith(".") or info.filename.startswith("__MACOSX/"):
+                    continue
+                reader = partial(run_in_threadpool, lambda archive=archive, info=info: archive.open(info).read(max_bytes + 1))
+                items.append((info.filename, reader))
+        elif (file.content_type or '').startswith('image/'):
+            content = await file.read(max_bytes + 1)
+            items.append((file.filename, partial(already_read, content)))
+        else:
+            raise HTTPException(status_code=400, detail=f"{file.filename} must be an image or a zip archive")
+
+        if len(items) > max_files:
+            raise HTTPException(status_code=413, detail=f"A batch holds at most {max_files} images")
+    return items
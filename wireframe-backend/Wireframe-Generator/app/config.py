@@ -4,6 +4,9 @@ from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
 
 
+# backend root; relative data paths are resolved against it rather than the working directory
+BASE_DIR = Path(__file__).resolve().parent.parent
+
 #load evironment variables from .env file
 env_path = Path(".") / ".env"
 load_dotenv(dotenv_path=env_path)
@@ -21,6 +24,10 @@ class Settings(BaseSettings):
     # LLM API keys
     GOOGLE_API_KEY: str = os.getenv("GOOGLE_API_KEY")
 
+    # Optional Gemini endpoint override, e.g. the local stand-in used for load testing
+    GOOGLE_API_ENDPOINT: str = os.getenv("GOOGLE_API_ENDPOINT", "")
+    GOOGLE_API_TRANSPORT: str = os.getenv("GOOGLE_API_TRANSPORT", "")
+
 
     # LangSmith tracing (optional)
     LANGSMITH_TRACING: str = os.getenv("LANGSMITH_TRACING", "false")
@@ -33,9 +40,85 @@ class Settings(BaseSettings):
     DEFAULT_MODEL: str = "gemini-2.5-flash"
     MODEL_TEMPERATURE: float = 0.7
 
+    # Multi-variant SVG generation (one entry per variant, up to 4)
+    SVG_VARIANT_TEMPERATURES: list[float] = [0.0, 0.4, 0.7, 1.0]
+    SVG_VARIANT_STYLE_HINTS: list[str] = [
+        "",
+        "Favor generous whitespace, large headings and a single-column content flow.",
+        "Favor a card-based grid layout with compact, clearly grouped components.",
+        "Favor a sidebar or split-pane structure with prominent primary actions.",
+    ]
+
+    # Per-screen SVG generation: multi-screen plans are generated screen by screen
+    # concurrently and composited locally instead of in one large LLM call
+    SVG_PER_SCREEN_ENABLED: bool = os.getenv("SVG_PER_SCREEN_ENABLED", "true").lower() == "true"
+    SVG_SCREEN_GAP: int = 120
+
+    # Pipelined planning: stream the plan and start each screen's SVG as soon as its
+    # specification is complete (needs SVG_PER_SCREEN_ENABLED)
+    PLANNING_PIPELINE_ENABLED: bool = os.getenv("PLANNING_PIPELINE_ENABLED", "true").lower() == "true"
+    PLANNING_PIPELINE_MAX_WORKERS: int = int(os.getenv("PLANNING_PIPELINE_MAX_WORKERS", "8"))  # concurrent screen generations across all requests
+
+    # "svg": the model emits the SVG markup directly
+    # "layout": opt-in; the model emits the compact layout DSL, compiled locally to SVG.
+    # Several times fewer output tokens, but the drawing is limited to the DSL's grid and components
+    SVG_OUTPUT_FORMAT: str = os.getenv("SVG_OUTPUT_FORMAT", "svg").lower()
+
+    # Rendering-preserving SVG optimization after generation (minify, round, dedupe, <symbol>/<use>)
+    SVG_OPTIMIZE_ENABLED: bool = os.getenv("SVG_OPTIMIZE_ENABLED", "true").lower() == "true"
+    SVG_OPTIMIZE_PRECISION: int = int(os.getenv("SVG_OPTIMIZE_PRECISION", "2"))  # decimal digits kept in coordinates
+
     # Cache settings
     CACHE_ENABLED: bool = os.getenv("CACHE_ENABLED", "true").lower() == "true"
     CACHE_TTL: int = int(os.getenv("CACHE_TTL", "3600"))  # Time to live in seconds
+    CACHE_MAX_ENTRIES: int = int(os.getenv("CACHE_MAX_ENTRIES", "2000"))  # least recently used entries are dropped beyond this
+
+    # Content-addressed artifact store for generated SVGs, requirements and plans
+    ARTIFACT_STORE_ENABLED: bool = os.getenv("ARTIFACT_STORE_ENABLED", "true").lower() == "true"
+    ARTIFACT_STORE_PATH: str = str(BASE_DIR / os.getenv("ARTIFACT_STORE_PATH", "artifacts"))  # relative to the backend root
+    ARTIFACT_MIN_COMPRESS_SIZE: int = int(os.getenv("ARTIFACT_MIN_COMPRESS_SIZE", "256"))  # bytes
+
+    # Server-side PNG/WebP thumbnails of stored SVGs (needs the optional cairosvg package)
+    THUMBNAIL_WORKERS: int = int(os.getenv("THUMBNAIL_WORKERS", "2"))  # rasterizer processes
+    THUMBNAIL_MAX_SIZE: int = int(os.getenv("THUMBNAIL_MAX_SIZE", "1024"))  # pixels per side
+    # requested sizes are rounded up to one of these, so each artifact has a few thumbnails at most
+    THUMBNAIL_SIZES: str = os.getenv("THUMBNAIL_SIZES", "64,128,256,320,512,768,1024")
+    THUMBNAIL_TIMEOUT: float = float(os.getenv("THUMBNAIL_TIMEOUT", "20"))  # seconds per render
+
+    # Image conversion runs in a bounded process pool, off the event loop
+    IMAGE_WORKERS: int = int(os.getenv("IMAGE_WORKERS", "2"))  # converter processes
+    IMAGE_JOB_TIMEOUT: float = float(os.getenv("IMAGE_JOB_TIMEOUT", "30"))  # seconds per image
+    IMAGE_MAX_QUEUE: int = int(os.getenv("IMAGE_MAX_QUEUE", "32"))  # waiting jobs before requests get a 503
+    IMAGE_MAX_UPLOAD_BYTES: int = int(os.getenv("IMAGE_MAX_UPLOAD_BYTES", str(20 * 1024 * 1024)))  # enforced while the body streams in
+    IMAGE_MAX_PIXELS: int = int(os.getenv("IMAGE_MAX_PIXELS", "40000000"))  # larger images are rejected from their header
+    IMAGE_BATCH_MAX_FILES: int = int(os.getenv("IMAGE_BATCH_MAX_FILES", "50"))  # images per batch request, zip members included
+    IMAGE_BATCH_CONCURRENCY: int = int(os.getenv("IMAGE_BATCH_CONCURRENCY", "4"))  # images of one batch converted at once
+    IMAGE_BATCH_MAX_UPLOAD_BYTES: int = int(os.getenv("IMAGE_BATCH_MAX_UPLOAD_BYTES", str(100 * 1024 * 1024)))  # whole batch body
+    IMAGE_TILE_ASPECT: float = float(os.getenv("IMAGE_TILE_ASPECT", "2"))  # height/width from which pages are traced in bands, 0 disables
+    IMAGE_TILE_HEIGHT: int = int(os.getenv("IMAGE_TILE_HEIGHT", "512"))  # rows per band
+    IMAGE_TILE_THREADS: int = int(os.getenv("IMAGE_TILE_THREADS", "1"))  # bands traced concurrently in each converter process
+    IMAGE_PHASH_ENABLED: bool = os.getenv("IMAGE_PHASH_ENABLED", "false").lower() == "true"  # near-duplicate cache hits
+    IMAGE_PHASH_MAX_DISTANCE: int = int(os.getenv("IMAGE_PHASH_MAX_DISTANCE", "8"))  # differing bits out of 256
+    IMAGE_PHASH_MAX_ENTRIES: int = int(os.getenv("IMAGE_PHASH_MAX_ENTRIES", "10000"))
+
+    # Conversation sessions (stored in the cache backend, independent of CACHE_ENABLED)
+    SESSION_TTL: int = int(os.getenv("SESSION_TTL", "86400"))  # Time to live in seconds
+    SESSION_MAX_ENTRIES: int = int(os.getenv("SESSION_MAX_ENTRIES", "10000"))  # least recently used sessions are dropped beyond this
+
+    # Local intent classifier for /conversation: confident "generate" / "ask" turns
+    # skip the LLM, probabilities in between are still sent to the model
+    INTENT_CLASSIFIER_ENABLED: bool = os.getenv("INTENT_CLASSIFIER_ENABLED", "true").lower() == "true"
+    INTENT_GENERATE_THRESHOLD: float = float(os.getenv("INTENT_GENERATE_THRESHOLD", "0.8"))
+    INTENT_ASK_THRESHOLD: float = float(os.getenv("INTENT_ASK_THRESHOLD", "0.3"))
+    INTENT_CONTEXT_MESSAGES: int = int(os.getenv("INTENT_CONTEXT_MESSAGES", "3"))  # previous user messages scored with the new one
+
+    # Speculative pre-generation: run Query_Expansion and Requirement_Gathering in the
+    # background once a conversation is close to generating (opt-in, spends LLM calls)
+    SPECULATION_ENABLED: bool = os.getenv("SPECULATION_ENABLED", "false").lower() == "true"
+    SPECULATION_TURNS_AHEAD: int = int(os.getenv("SPECULATION_TURNS_AHEAD", "1"))
+    SPECULATION_MAX_WORKERS: int = int(os.getenv("SPECULATION_MAX_WORKERS", "4"))
+    SPECULATION_TTL: int = int(os.getenv("SPECULATION_TTL", "600"))
+    SPECULATION_MAX_DRIFT: int = int(os.getenv("SPECULATION_MAX_DRIFT", "40"))  # chars of follow-up text a run tolerates
     
     class Config:
         case_sensitive = True
@@ -5,6 +5,7 @@ import time
 import os
 from app.config import settings
 from app.api import api_router
+from app.api.uploads import UploadSizeLimitMiddleware
 
 # Configure LangSmith if enabled
 if settings.LANGSMITH_TRACING.lower() == "true" and settings.LANGSMITH_API_KEY:
@@ -31,6 +32,12 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_headers=["*"],
     )
 
+# Cap image upload bodies while they stream in
+app.add_middleware(UploadSizeLimitMiddleware, max_bytes=settings.IMAGE_MAX_UPLOAD_BYTES,
+                   path_suffixes=("/image-to-wireframe", "/image-guided"))
+app.add_middleware(UploadSizeLimitMiddleware, max_bytes=settings.IMAGE_BATCH_MAX_UPLOAD_BYTES,
+                   path_suffixes=("/image-to-wireframe/batch",))
+
 # Request timing middleware
 @app.middleware("http")
 async def add_process_time_header(request: Request, call_next):
@@ -1,7 +1,19 @@
 from pydantic import BaseModel, Field
-from typing import Optional, Dict, List, Any, TypedDict
+from typing import Optional, Dict, List, Any, TypedDict, Annotated
 
 
+def merge_svg_variants(existing: list[dict[str, Any]], new: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """ Reducer for parallel variant branches: merge by variant index, keeping them ordered """
+    merged = {variant["index"]: variant for variant in (existing or [])}
+    merged.update({variant["index"]: variant for variant in (new or [])})
+    return [merged[index] for index in sorted(merged)]
+
+def merge_screen_svgs(existing: list[dict[str, Any]], new: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """ Reducer for parallel screen branches: merge by (variant, screen), keeping plan order """
+    merged = {(screen["variant_index"], screen["screen_index"]): screen for screen in (existing or [])}
+    merged.update({(screen["variant_index"], screen["screen_index"]): screen for screen in (new or [])})
+    return [merged[key] for key in sorted(merged)]
+
 # Wireframe State for LangGraph
 class WireframeState(TypedDict):
     user_query: str
@@ -10,10 +22,17 @@ class WireframeState(TypedDict):
     wireframe_plan: Optional[dict[str, Any]]
     svg_code: Optional[str]
     errors: Optional[list[str]]
+    variants: Optional[int]
+    svg_variants: Annotated[list[dict[str, Any]], merge_svg_variants]
+    screen_svgs: Annotated[list[dict[str, Any]], merge_screen_svgs]
+    svg_optimization: Optional[dict[str, Any]]
 
 class WireframeRequest(BaseModel):
     """ Request model for wireframe generation """
     user_query: str = Field(..., description="User description of the desired wireframe")
+    variants: int = Field(default=1, ge=1, le=4, description="Number of alternative SVG layouts to generate from the same plan")
+    session_id: Optional[str] = Field(default=None, description="Conversation session whose speculative upstream stages may be reused")
+    ids_only: bool = Field(default=False, description="Return only artifact ids instead of inlining the SVG, requirements and plan")
 
 
 
@@ -22,11 +41,23 @@ class WireframeErrorResponse(BaseModel):
     error: str
     error_details: Optional[dict[str, Any]]
 
+class WireframeVariant(BaseModel):
+    """ A single alternative SVG layout generated from the shared wireframe plan """
+    index: int
+    temperature: float
+    style_hint: Optional[str] = None
+    svg_code: Optional[str] = None
+    errors: Optional[List[str]] = None
+    artifact_id: Optional[str] = None
+
 class WireframeResponse(BaseModel):
     """ Response model for wireframe generation """
     svg_code: str = Field(default=None, description="Generated wireframe")
     detailed_requirements : Optional[dict[str, Any]] = Field(default=None, description="Detailed requirements generated by the Requirement Getherign Agent for the wireframe")
     wireframe_plan: Optional[dict[str, Any]] = Field(default=None, description="Wireframe plan generated by the Wireframe Planning Agent for the wireframe")
+    svg_variants: Optional[List[WireframeVariant]] = Field(default=None, description="Alternative SVG layouts when more than one variant was requested")
+    svg_optimization: Optional[dict[str, Any]] = Field(default=None, description="Byte sizes of the SVG before and after optimization and the transforms applied")
+    artifacts: Optional[dict[str, str]] = Field(default=None, description="Artifact store ids of the SVG, requirements and plan, served by /artifacts/{id}")
     errors: Optional[List[str]] = None
     status: int
 
@@ -0,0 +1,12 @@
+from app.services.artifacts.store import (
+    MEDIA_TYPES,
+    ArtifactBackend,
+    ArtifactStore,
+    LocalArtifactBackend,
+    etag_for,
+    etag_matches,
+)
+from app.services.artifacts.thumbnails import THUMBNAIL_FORMATS, ThumbnailService, rasterizer_available
+
+__all__ = ["MEDIA_TYPES", "ArtifactBackend", "ArtifactStore", "LocalArtifactBackend", "etag_for", "etag_matches",
+           "THUMBNAIL_FORMATS", "ThumbnailService", "rasterizer_available"]
@@ -0,0 +1,229 @@
+import gzip
+import hashlib
+import json
+import os
+import re
+import tempfile
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # brotli variants are skipped when the package is missing
+    brotli = None
+
+
+HASH_RE = re.compile(r"^[0-9a-f]{64}$")
+
+# artifact kinds and the media type each one is served with
+MEDIA_TYPES = {
+    "svg": "image/svg+xml",
+    "json": "application/json",
+}
+
+# precomputed encodings in order of preference
+ENCODINGS = ["br", "gzip"]
+
+
+def content_hash(data: bytes) -> str:
+    """SHA-256 hex digest used as the artifact id."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def encode_json(value: Any) -> bytes:
+    """Canonical JSON bytes, so equal documents get the same id."""
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def compress(data: bytes, encoding: str) -> Optional[bytes]:
+    """Compress with the given content coding, or None when it is not available."""
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    if encoding == "br" and brotli is not None:
+        return brotli.compress(data, quality=11)
+    return None
+
+
+def accepted_encodings(accept_encoding: str) -> List[str]:
+    """Content codings from an Accept-Encoding header that the client does not refuse."""
+    accepted = []
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = params.strip()
+        if quality.startswith("q="):
+            try:
+                if float(quality[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        if name:
+            accepted.append(name.strip().lower())
+    return accepted
+
+
+class ArtifactBackend(ABC):
+    """
+    Storage interface for artifact blobs.
+
+    Names are relative paths such as `ab/abcdef....svg.gz`. Backends that keep
+    blobs on the local filesystem return a path from `local_path` so they can be
+    served with a file response; other backends are served from `read`.
+    """
+
+    @abstractmethod
+    def exists(self, name: str) -> bool:
+        ...
+
+    @abstractmethod
+    def write(self, name: str, data: bytes) -> None:
+        ...
+
+    @abstractmethod
+    def read(self, name: str) -> Optional[bytes]:
+        ...
+
+    def local_path(self, name: str) -> Optional[str]:
+        return None
+
+
+class LocalArtifactBackend(ArtifactBackend):
+    """Artifact blobs on local disk, fanned out into directories by hash prefix."""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+
+    def _path(self, name: str) -> Path:
+        return self.root / name
+
+    def exists(self, name: str) -> bool:
+        return self._path(name).is_file()
+
+    def write(self, name: str, data: bytes) -> None:
+        path = self._path(name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # write then rename, so readers never see a partial blob
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
+    def read(self, name: str) -> Optional[bytes]:
+        try:
+            return self._path(name).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def local_path(self, name: str) -> Optional[str]:
+        path = self._path(name)
+        return str(path) if path.is_file() else None
+
+
+class ArtifactStore:
+    """
+    Content-addressed store for generated artifacts.
+
+    Every blob is keyed by the SHA-256 of its bytes, so identical results share one
+    entry and an id never changes meaning. Compressed variants are computed once at
+    write time instead of on every download.
+    """
+
+    def __init__(self, backend: ArtifactBackend, min_compress_size: int = 256):
+        self.backend = backend
+        self.min_compress_size = min_compress_size
+
+    @staticmethod
+    def blob_name(artifact_id: str, kind: str, encoding: Optional[str] = None) -> str:
+        name = f"{artifact_id[:2]}/{artifact_id}.{kind}"
+        return f"{name}.{'gz' if encoding == 'gzip' else encoding}" if encoding else name
+
+    def put(self, data: bytes, kind: str) -> str:
+        """
+        Store a blob and its compressed variants unless it is already present.
+
+        Args:
+            data: Raw artifact bytes
+            kind: Artifact kind, a key of MEDIA_TYPES
+
+        Returns:
+            Artifact id (SHA-256 hex digest of the data)
+        """
+        artifact_id = content_hash(data)
+        name = self.blob_name(artifact_id, kind)
+        if self.backend.exists(name):
+            return artifact_id
+
+        # variants go first, so the identity blob marks a complete entry
+        if len(data) >= self.min_compress_size:
+            for encoding in ENCODINGS:
+                compressed = compress(data, encoding)
+                if compressed is not None and len(compressed) < len(data):
+                    self.backend.write(self.blob_name(artifact_id, kind, encoding), compressed)
+        self.backend.write(name, data)
+        return artifact_id
+
+    def put_svg(self, svg_code: str) -> str:
+        return self.put(svg_code.encode("utf-8"), "svg")
+
+    def put_json(self, value: Any) -> str:
+        return self.put(encode_json(value), "json")
+
+    def find(self, artifact_id: str) -> Optional[str]:
+        """Kind of a stored artifact, or None when the id is unknown."""
+        if not HASH_RE.match(artifact_id):
+            return None
+        for kind in MEDIA_TYPES:
+            if self.backend.exists(self.blob_name(artifact_id, kind)):
+                return kind
+        return None
+
+    def select(self, artifact_id: str, kind: str, accept_encoding: str) -> Tuple[str, Optional[str]]:
+        """
+        Pick the stored representation to send for an Accept-Encoding header.
+
+        Returns:
+            Blob name and its content coding (None for the identity representation)
+        """
+        accepted = accepted_encodings(accept_encoding)
+        for encoding in ENCODINGS:
+            if encoding in accepted or "*" in accepted:
+                name = self.blob_name(artifact_id, kind, encoding)
+                if self.backend.exists(name):
+                    return name, encoding
+        return self.blob_name(artifact_id, kind), None
+
+    def store_result(self, result: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Store the artifacts of a generation result.
+
+        Args:
+            result: Final graph state or response fields
+
+        Returns:
+            Artifact id per stored field
+        """
+        ids = {}
+        if result.get("svg_code"):
+            ids["svg_code"] = self.put_svg(result["svg_code"])
+        for field in ("detailed_requirements", "wireframe_plan"):
+            if result.get(field) is not None:
+                ids[field] = self.put_json(result[field])
+        return ids
+
+
+def etag_for(artifact_id: str, encoding: Optional[str]) -> str:
+    """Strong ETag of one representation; encoded variants are distinct representations."""
+    return f'"{artifact_id}-{encoding}"' if encoding else f'"{artifact_id}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match uses the weak comparison, so W/ prefixes are ignored."""
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
@@ -0,0 +1,119 @@
+import asyncio
+import bisect
+import io
+from functools import lru_cache
+from typing import Dict, Optional, Sequence, Tuple
+
+from app.services.artifacts.store import ArtifactStore
+from app.services.imaging.pool import ImageConversionPool
+
+
+THUMBNAIL_FORMATS = {
+    "png": "image/png",
+    "webp": "image/webp",
+}
+
+
+@lru_cache()
+def rasterizer_available() -> bool:
+    """cairosvg is optional: it needs the native cairo library, which fails at import time when missing."""
+    try:
+        import cairosvg  # noqa: F401
+    except (ImportError, OSError):
+        return False
+    return True
+
+
+def snap_size(value: int, sizes: Sequence[int]) -> int:
+    """Smallest allowed size that is at least `value`, or the largest one; sizes must be sorted."""
+    index = bisect.bisect_left(sizes, value)
+    return sizes[min(index, len(sizes) - 1)]
+
+
+def render_thumbnail(svg: bytes, width: int, height: Optional[int], image_format: str) -> bytes:
+    """
+    Rasterize an SVG to a thumbnail. Runs in a worker process.
+
+    Args:
+        svg: SVG document bytes
+        width: Output width in pixels
+        height: Output height in pixels, or None to keep the aspect ratio
+        image_format: "png" or "webp"
+
+    Returns:
+        Encoded image bytes
+    """
+    import cairosvg
+
+    png = cairosvg.svg2png(bytestring=svg, output_width=width, output_height=height)
+    if image_format == "png":
+        return png
+
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.open(io.BytesIO(png)).save(buffer, format="WEBP", quality=80, method=4)
+    return buffer.getvalue()
+
+
+class ThumbnailService:
+    """
+    Renders stored SVG artifacts to PNG/WebP thumbnails in a process pool.
+
+    Rasterizing is CPU-bound, so it runs outside the event loop and outside the
+    GIL, in a bounded pool that replaces crashed workers and gives up on renders
+    that exceed `timeout`. Results are kept in the artifact backend keyed by content
+    hash, size and format, and concurrent requests for the same thumbnail share one
+    render. Requested sizes are snapped to `sizes`, so the stored variants per
+    artifact stay few whatever sizes clients ask for.
+    """
+
+    def __init__(self, store: ArtifactStore, max_workers: int = 2, timeout: float = 20.0,
+                 sizes: Sequence[int] = (64, 128, 256, 320, 512, 768, 1024)):
+        self.store = store
+        self.pool = ImageConversionPool(max_workers=max_workers, timeout=timeout)
+        self.sizes = sorted(sizes)
+        self.in_flight: Dict[str, asyncio.Future] = {}
+
+    def snap(self, width: int, height: Optional[int]) -> Tuple[int, Optional[int]]:
+        """Round a requested size up to the allowed sizes; an omitted height stays omitted."""
+        return snap_size(width, self.sizes), snap_size(height, self.sizes) if height else None
+
+    @staticmethod
+    def blob_name(artifact_id: str, width: int, height: Optional[int], image_format: str) -> str:
+        size = f"{width}x{height}" if height else f"{width}w"
+        return f"thumbnails/{artifact_id[:2]}/{artifact_id}-{size}.{image_format}"
+
+    async def thumbnail(self, artifact_id: str, width: int, height: Optional[int], image_format: str) -> str:
+        """
+        Get the blob name of a thumbnail, rendering it on first use.
+
+        Args:
+            artifact_id: Id of a stored SVG artifact
+            width: Output width in pixels
+            height: Output height in pixels, or None to keep the aspect ratio
+            image_format: "png" or "webp"
+
+        Returns:
+            Name of the thumbnail blob in the artifact backend
+
+        Raises:
+            PoolSaturatedError: If too many renders are waiting
+            asyncio.TimeoutError: If the render did not finish in time
+        """
+        name = self.blob_name(artifact_id, width, height, image_format)
+        if self.store.backend.exists(name):
+            return name
+
+        pending = self.in_flight.get(name)
+        if pending is None:
+            pending = asyncio.ensure_future(self._render(artifact_id, name, width, height, image_format))
+            self.in_flight[name] = pending
+            pending.add_done_callback(lambda _: self.in_flight.pop(name, None))
+        return await asyncio.shield(pending)
+
+    async def _render(self, artifact_id: str, name: str, width: int, height: Optional[int], image_format: str) -> str:
+        svg = self.store.backend.read(self.store.blob_name(artifact_id, "svg"))
+        image = await self.pool.run(render_thumbnail, svg, width, height, image_format)
+        await asyncio.get_running_loop().run_in_executor(None, self.store.backend.write, name, image)
+        return name
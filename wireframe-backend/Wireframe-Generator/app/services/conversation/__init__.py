@@ -0,0 +1,4 @@
+from app.services.conversation.sessions import ConversationSession, SessionStore, has_common_pattern
+from app.services.conversation.intent import IntentDecision, get_intent_classifier
+
+__all__ = ["ConversationSession", "SessionStore", "has_common_pattern", "IntentDecision", "get_intent_classifier"]
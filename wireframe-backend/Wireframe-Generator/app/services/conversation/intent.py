@@ -0,0 +1,152 @@
+import json
+import math
+import re
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from pydantic import BaseModel
+
+
+DATASET_PATH = Path(__file__).parent / "data" / "intent_examples.jsonl"
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9'+-]*")
+
+# What a request has to cover before a wireframe can be generated without asking.
+# Each dimension lists the words that satisfy it and the question asked when it is missing.
+DIMENSIONS: Dict[str, Tuple[re.Pattern, str]] = {
+    "interface_type": (
+        re.compile(r"\b(website|web ?site|site|web app|webapp|app|application|mobile|ios|android|dashboard|admin panel|"
+                   r"control panel|portal|landing page|homepage|page|screen|platform|tool|system|store|shop|marketplace|blog|forum)s?\b"),
+        "What type of interface are you looking to create - a website, a mobile app, or a dashboard?",
+    ),
+    "purpose": (
+        re.compile(r"\b(e-?commerce|shop|store|restaurant|cafe|coffee|food|fitness|gym|yoga|health|medical|clinic|dental|patient|"
+                   r"bank|banking|finance|wallet|crypto|payment|booking|reservation|appointment|hotel|travel|airline|education|"
+                   r"course|school|university|learning|language|blog|news|portfolio|photographer|real estate|property|job|"
+                   r"event|ticket|music|podcast|recipe|pet|car|rental|dealership|wedding|nonprofit|donation|hr|employee|"
+                   r"inventory|library|project|task|todo|chat|messaging|social|forum|support|saas|weather|smart home|"
+                   r"freelanc\w*|coworking|delivery|fashion|shoe|book|meal)s?\b"),
+        "What is it for - which kind of business or product, and who will use it?",
+    ),
+    "features": (
+        re.compile(r"\b(login|log in|sign ?up|signup|register|checkout|cart|payment|profile|settings|search|filter|list|"
+                   r"table|chart|form|gallery|menu|map|calendar|schedule|feed|post|comment|message|thread|detail|details|"
+                   r"pricing|plan|hero|section|sidebar|navigation|nav|footer|header|card|cards|tab|tabs|modal|flow|"
+                   r"onboarding|history|overview|tracking|tracker|player|board|booking form|contact|about|faq|"
+                   r"reviews?|orders?|products?|catalog|listing|listings|upload)s?\b"),
+        "Which key screens or features should it include - for example login, search, checkout or a profile page?",
+    ),
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Word unigrams and bigrams of the lower-cased text."""
+    words = TOKEN_RE.findall(text.lower())
+    return words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+
+
+def missing_dimensions(text: str) -> List[str]:
+    """Dimensions of a wireframe request that the text does not cover yet, in asking order."""
+    lowered = text.lower()
+    return [name for name, (pattern, _) in DIMENSIONS.items() if not pattern.search(lowered)]
+
+
+class IntentDecision(BaseModel):
+    """ Outcome of the local intent classifier for one conversation turn """
+    action: str  # "generate", "ask" or "llm"
+    probability: float
+    missing: List[str]
+    question: Optional[str] = None
+
+
+class IntentClassifier:
+    """
+    TF-IDF over word n-grams plus dimension-coverage features, scored by a small
+    logistic regression trained on the bundled examples.
+
+    Training takes a few milliseconds on the bundled dataset and happens once per process.
+    """
+
+    def __init__(self, examples: List[Tuple[str, int]], epochs: int = 400, learning_rate: float = 0.5, l2: float = 1e-3):
+        documents = [Counter(tokenize(text)) for text, _ in examples]
+        document_frequency = Counter(token for document in documents for token in document)
+
+        self.vocabulary = {token: index for index, token in enumerate(sorted(document_frequency))}
+        count = len(documents)
+        self.idf = np.array(
+            [math.log((1 + count) / (1 + document_frequency[token])) + 1 for token in sorted(document_frequency)],
+            dtype=np.float64,
+        )
+
+        features = np.vstack([self.features(text) for text, _ in examples])
+        labels = np.array([label for _, label in examples], dtype=np.float64)
+
+        self.weights = np.zeros(features.shape[1])
+        self.bias = 0.0
+        for _ in range(epochs):
+            predictions = 1.0 / (1.0 + np.exp(-(features @ self.weights + self.bias)))
+            error = predictions - labels
+            self.weights -= learning_rate * (features.T @ error / count + l2 * self.weights)
+            self.bias -= learning_rate * float(error.mean())
+
+    def features(self, text: str) -> np.ndarray:
+        vector = np.zeros(len(self.vocabulary) + len(DIMENSIONS) + 1)
+        for token, frequency in Counter(tokenize(text)).items():
+            index = self.vocabulary.get(token)
+            if index is not None:
+                vector[index] = (1 + math.log(frequency)) * self.idf[index]
+        norm = np.linalg.norm(vector[:len(self.vocabulary)])
+        if norm:
+            vector[:len(self.vocabulary)] /= norm
+
+        missing = missing_dimensions(text)
+        for offset, name in enumerate(DIMENSIONS):
+            vector[len(self.vocabulary) + offset] = 0.0 if name in missing else 1.0
+        # longer descriptions tend to be more specific, saturating around 20 words
+        vector[-1] = min(len(TOKEN_RE.findall(text)), 20) / 20
+        return vector
+
+    def probability(self, text: str) -> float:
+        """Probability that the text is specific enough to generate right away."""
+        return float(1.0 / (1.0 + np.exp(-(self.features(text) @ self.weights + self.bias))))
+
+    def decide(self, text: str, generate_threshold: float = 0.8, ask_threshold: float = 0.3) -> IntentDecision:
+        """
+        Decide between generating now, asking a templated question or deferring to the LLM.
+
+        Args:
+            text: The user's latest message, after a few of their previous ones for context
+            generate_threshold: Minimum probability to generate without asking
+            ask_threshold: Maximum probability to ask a templated question without the LLM
+
+        Returns:
+            IntentDecision for this turn
+        """
+        probability = self.probability(text)
+        missing = missing_dimensions(text)
+
+        if probability >= generate_threshold and len(missing) <= 1:
+            return IntentDecision(action="generate", probability=probability, missing=missing)
+        if probability <= ask_threshold and missing:
+            return IntentDecision(action="ask", probability=probability, missing=missing, question=DIMENSIONS[missing[0]][1])
+        return IntentDecision(action="llm", probability=probability, missing=missing)
+
+
+def load_examples(path: Path = DATASET_PATH) -> List[Tuple[str, int]]:
+    """Read the bundled labelled examples as (text, 1 for generate / 0 for ask) pairs."""
+    examples = []
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            if line.strip():
+                record = json.loads(line)
+                examples.append((record["text"], 1 if record["label"] == "generate" else 0))
+    return examples
+
+
+@lru_cache()
+def get_intent_classifier() -> IntentClassifier:
+    """Train the classifier on the bundled dataset once per process."""
+    return IntentClassifier(load_examples())
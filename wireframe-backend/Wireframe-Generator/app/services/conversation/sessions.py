@@ -0,0 +1,110 @@
+import re
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+
+# Knowledge-based immediate generation for common patterns
+COMMON_PATTERNS = [
+    'website', 'homepage', 'landing page', 'site',
+    'dashboard', 'admin panel', 'control panel',
+    'e-commerce', 'shop', 'store', 'marketplace',
+    'app', 'mobile app', 'application',
+    'blog', 'news', 'article', 'content',
+    'portfolio', 'profile', 'resume',
+    'login', 'signup', 'authentication',
+    'contact', 'about', 'services',
+    'restaurant', 'cafe', 'food', 'menu',
+    'booking', 'reservation', 'appointment',
+    'fitness', 'gym', 'health', 'workout',
+    'social', 'chat', 'messaging', 'forum',
+    'education', 'learning', 'course', 'school',
+    'finance', 'banking', 'payment', 'wallet'
+]
+
+# one alternation scans a text once instead of once per pattern
+COMMON_PATTERNS_RE = re.compile("|".join(re.escape(pattern) for pattern in sorted(COMMON_PATTERNS, key=len, reverse=True)))
+
+WIREFRAME_CREATED_PREFIX = "perfect! i've created your wireframe"
+
+
+def has_common_pattern(text: str) -> bool:
+    """Check whether the text mentions any interface type we have knowledge about."""
+    return COMMON_PATTERNS_RE.search(text.lower()) is not None
+
+
+class ConversationSession(BaseModel):
+    """
+    Server-side conversation state.
+
+    The flags the conversation endpoint needs are maintained incrementally as
+    messages are appended, so each turn only costs the size of the new text. The
+    transcript is kept as a list of lines and only joined when it is read.
+    """
+    session_id: str = Field(default_factory=lambda: uuid.uuid4().hex)
+    messages: List[Dict[str, str]] = Field(default_factory=list)
+    history_lines: List[str] = Field(default_factory=list)
+    user_messages: List[str] = Field(default_factory=list)
+    pattern_in_history: bool = False
+    question_count: int = 0
+    wireframe_created: bool = False
+    updated_at: float = Field(default_factory=time.time)
+
+    def append(self, role: str, content: str) -> None:
+        """Append one message and update the derived flags from that message only."""
+        self.messages.append({"role": role, "content": content})
+        self.history_lines.append(f"{role}: {content}")
+        if role == "user":
+            self.user_messages.append(content)
+
+        # only the user's own words count, the assistant's questions name patterns too
+        if role == "user" and not self.pattern_in_history and has_common_pattern(content):
+            self.pattern_in_history = True
+        if role == "assistant":
+            self.question_count += 1
+            if content.lower().startswith(WIREFRAME_CREATED_PREFIX):
+                self.wireframe_created = True
+        self.updated_at = time.time()
+
+    @classmethod
+    def from_messages(cls, messages: List[Any]) -> "ConversationSession":
+        """Seed a session from a full client-side message history."""
+        session = cls()
+        for message in messages:
+            session.append(message.role, message.content)
+        return session
+
+    def turns_until_generation(self) -> int:
+        """Assistant turns left before the conversation endpoint forces generation."""
+        threshold = 2 if self.pattern_in_history else 3
+        return max(0, threshold - self.question_count)
+
+    @property
+    def history_text(self) -> str:
+        """The whole conversation as "role: content" lines."""
+        return "\n".join(self.history_lines)
+
+    def user_description(self) -> str:
+        """Everything the user said so far, in order."""
+        return "\n".join(self.user_messages)
+
+    def recent_user_text(self, count: int) -> str:
+        """The user's last `count` messages, in order."""
+        return "\n".join(self.user_messages[-count:]) if count > 0 else ""
+
+
+class SessionStore:
+    """Conversation sessions kept in the configured cache backend."""
+
+    KEY_PREFIX = "conversation-session:"
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def get(self, session_id: str) -> Optional[ConversationSession]:
+        return self.cache.get(self.KEY_PREFIX + session_id)
+
+    def save(self, session: ConversationSession) -> None:
+        self.cache.set(self.KEY_PREFIX + session.session_id, session)
@@ -0,0 +1,4 @@
+from app.services.imaging.cache import ImageResultCache, PerceptualHashIndex
+from app.services.imaging.pool import ImageConversionPool, PoolSaturatedError
+
+__all__ = ["ImageConversionPool", "ImageResultCache", "PerceptualHashIndex", "PoolSaturatedError"]
@@ -0,0 +1,118 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Tuple
+
+from app.services.imaging.pool import ImageConversionPool
+from app.utils.image_processor import fingerprint_image
+
+
+class PerceptualHashIndex:
+    """
+    Nearest-neighbour index of perceptual hashes, one bucket per conversion.
+
+    Each entry maps a perceptual hash and the working size of the decoded image to
+    the cache key of a stored result. A lookup returns the closest key within
+    `max_distance` bits whose working size is the same, since results hold pixel
+    coordinates: a half-size copy never gets the coordinates of the full-size one.
+    Entries beyond `max_entries` are dropped oldest first.
+    """
+
+    def __init__(self, max_distance: int = 8, max_entries: int = 10000):
+        self.max_distance = max_distance
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.lock = threading.Lock()
+
+    def add(self, key: str, params: str, phash: int, size: Tuple[int, int]) -> None:
+        with self.lock:
+            self.entries[key] = (params, phash, size)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def discard(self, key: str) -> None:
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def nearest(self, params: str, phash: int, size: Tuple[int, int]) -> Optional[str]:
+        """Cache key of the closest indexed image of the same working size for the same conversion, or None."""
+        best_key, best_distance = None, self.max_distance + 1
+        with self.lock:
+            for key, (entry_params, entry_hash, entry_size) in self.entries.items():
+                if entry_params != params or entry_size != size:
+                    continue
+                distance = (entry_hash ^ phash).bit_count()
+                if distance < best_distance:
+                    best_key, best_distance = key, distance
+        return best_key
+
+
+class ImageResultCache:
+    """
+    Caches image conversion results by what the image shows, not by its filename.
+
+    Results are keyed on the conversion (function and arguments) plus the SHA-256 of
+    the decoded, working-size pixels, so re-encoding an image or renaming the file
+    still hits. Only the fingerprint comes back from the pool; on a miss the
+    conversion job decodes the upload again rather than shipping the bitmap both ways. The upload bytes are hashed too, and an identical upload is served
+    without decoding it again. With a perceptual hash index, near-identical uploads
+    of the same working size, such as re-compressed copies or larger copies that
+    are downscaled to it, reuse the closest stored result.
+    """
+
+    def __init__(self, cache: Any, phash_index: Optional[PerceptualHashIndex] = None):
+        self.cache = cache
+        self.phash_index = phash_index
+        self.stats = {"hits": 0, "near_hits": 0, "misses": 0}
+
+    @staticmethod
+    def params_key(func: Callable[..., Any], args: tuple) -> str:
+        return ":".join([func.__name__, *map(str, args)])
+
+    async def convert(self, pool: ImageConversionPool, func: Callable[..., Any], content: bytes, *args: Any) -> Any:
+        """
+        Get the result of func(content, *args), converting in the pool only on a miss.
+
+        Args:
+            pool: Process pool to decode and convert in
+            func: Conversion function of the encoded bytes
+            content: Encoded image bytes of the upload
+            *args: Further conversion arguments, part of the cache key
+
+        Returns:
+            The (possibly cached) conversion result
+        """
+        if self.cache is None:
+            return await pool.run(func, content, *args)
+
+        params = self.params_key(func, args)
+        upload_key = f"image-upload:{params}:{hashlib.sha256(content).hexdigest()}"
+        result = self.cache.get(upload_key)
+        if result is not None:
+            self.stats["hits"] += 1
+            return result
+
+        digest, phash, size = await pool.run(fingerprint_image, content)
+        key = f"image:{params}:{digest}"
+        result = self.cache.get(key)
+        if result is not None:
+            self.stats["hits"] += 1
+        elif self.phash_index is not None:
+            near_key = self.phash_index.nearest(params, phash, size)
+            result = self.cache.get(near_key) if near_key else None
+            if result is not None:
+                self.stats["near_hits"] += 1
+            elif near_key:
+                # the stored result expired
+                self.phash_index.discard(near_key)
+
+        if result is None:
+            self.stats["misses"] += 1
+            result = await pool.run(func, content, *args)
+            self.cache.set(key, result)
+            if self.phash_index is not None:
+                self.phash_index.add(key, params, phash, size)
+
+        self.cache.set(upload_key, result)
+        return result
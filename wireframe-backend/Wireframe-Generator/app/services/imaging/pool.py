@@ -0,0 +1,106 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+
+class PoolSaturatedError(Exception):
+    """Raised when more image jobs are waiting than the pool accepts."""
+
+
+class ImageConversionPool:
+    """
+    Bounded process pool for CPU-bound image conversion.
+
+    Decoding, edge detection and vectorizing hold the GIL, so on the event loop one
+    large upload would stall every other request. Jobs run in worker processes
+    instead and get the image bytes, never a file path. At most `max_workers` jobs
+    run at once and at most `max_queue` wait behind them; further jobs are rejected
+    so the backlog stays bounded. A job that exceeds its timeout is answered right
+    away, but it keeps its worker until it finishes, since a process pool cannot
+    interrupt a single job.
+    """
+
+    def __init__(self, max_workers: int = 2, timeout: float = 30.0, max_queue: int = 32):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.max_queue = max_queue
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.stats = {"completed": 0, "failed": 0, "timed_out": 0, "rejected": 0}
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self.lock:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self.executor
+
+    def _submit(self, func: Callable[..., Any], args: tuple) -> Future:
+        try:
+            return self._executor().submit(func, *args)
+        except BrokenProcessPool:
+            # a worker died (e.g. killed for memory); start a fresh pool for this and later jobs
+            with self.lock:
+                self.executor = None
+            return self._executor().submit(func, *args)
+
+    def _finished(self, _) -> None:
+        with self.lock:
+            self.in_flight -= 1
+
+    def queue_depth(self) -> int:
+        """Jobs submitted but still waiting for a free worker."""
+        return max(0, self.in_flight - self.max_workers)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current load and counters of the pool."""
+        with self.lock:
+            return {
+                "workers": self.max_workers,
+                "running": min(self.in_flight, self.max_workers),
+                "queued": self.queue_depth(),
+                "max_queue": self.max_queue,
+                **self.stats,
+            }
+
+    async def run(self, func: Callable[..., Any], *args: Any, timeout: Optional[float] = None) -> Any:
+        """
+        Run a picklable function in a worker process.
+
+        Args:
+            func: Module-level function to call
+            *args: Its arguments, e.g. the image bytes
+            timeout: Seconds to wait for the result, defaults to the pool timeout
+
+        Returns:
+            The function's result
+
+        Raises:
+            PoolSaturatedError: If the queue of waiting jobs is full
+            asyncio.TimeoutError: If the job did not finish in time
+        """
+        with self.lock:
+            if self.queue_depth() >= self.max_queue:
+                self.stats["rejected"] += 1
+                raise PoolSaturatedError(f"{self.queue_depth()} image jobs are already waiting")
+            self.in_flight += 1
+
+        try:
+            future = self._submit(func, args)
+        except Exception:
+            self._finished(None)
+            raise
+        future.add_done_callback(self._finished)
+
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), timeout or self.timeout)
+        except asyncio.TimeoutError:
+            self.stats["timed_out"] += 1
+            raise
+        except Exception:
+            self.stats["failed"] += 1
+            raise
+        self.stats["completed"] += 1
+        return result
@@ -1,16 +1,28 @@
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import List, Dict, Any, Optional
+from app.utils.json_scanner import IncrementalJsonParser
 from app.utils.text_processing import clean_svg, extract_json_from_text, extract_svg_from_text, parse_json_safely
+from app.utils.svg_optimizer import optimize_svg
+from app.utils.svg_validator import validate_svg
 from app.config import Settings
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langsmith import traceable
 import json
+import logging
 import re
 
 from app.models.wireframe import WireframeState
+from app.services.wireframe.compositor import SHARED_PLAN_KEYS, composite_screens, extract_screen_flows, screen_canvas_size, split_plan_by_screen
+from app.services.wireframe.image_plan import is_traced_plan, traced_components, traced_layout
+from app.services.wireframe.layout_dsl import LAYOUT_DSL_SPEC, compile_layout
 
 from app.config import settings 
 
 
+logger = logging.getLogger(__name__)
+
+# screen generations started while the plan is streamed, shared by all requests
+SCREEN_EXECUTOR = ThreadPoolExecutor(max_workers=settings.PLANNING_PIPELINE_MAX_WORKERS, thread_name_prefix="svg-screen")
 
 
 def get_llm_model(TEMPERATURE: float = 0):
@@ -23,9 +35,20 @@ def get_llm_model(TEMPERATURE: float = 0):
         max_tokens=None,
         timeout=None,
         max_retries=3,
+        **llm_client_options(),
     )
 
 
+def llm_client_options() -> dict:
+    """ Client overrides pointing the Gemini client at a custom endpoint when configured """
+    options = {}
+    if settings.GOOGLE_API_ENDPOINT:
+        options["client_options"] = {"api_endpoint": settings.GOOGLE_API_ENDPOINT}
+    if settings.GOOGLE_API_TRANSPORT:
+        options["transport"] = settings.GOOGLE_API_TRANSPORT
+    return options
+
+
 @traceable
 def query_expansion_agent(state: WireframeState) -> WireframeState:
     """
@@ -332,21 +355,18 @@ Before finalizing, review your output and ensure:
         }
 
 
-# wireframe planning agent
-@traceable
-def wireframe_planning_agent(state: WireframeState) -> WireframeState:
+# wireframe planning prompt
+def planning_prompt(detailed_requirements: Dict[str, Any]) -> str:
     """
-        Agent for translating detailed requirements into a wireframe plan.
-    
+        Prompt of the Wireframe Planning Agent.
+
         Args:
-            state: The current state containing detailed_requirements
-        
+            detailed_requirements: Output of the Requirement Gathering Agent
+
         Returns:
-            Updated state with wireframe_plan
+            The planning prompt
     """
 
-    detailed_requirements = state['detailed_requirements']
-    
     # Convert requirements to JSON string for the prompt (for model better readability)
     requirements_json = json.dumps(detailed_requirements, indent=2)
 
@@ -491,6 +511,7 @@ Include specifications on wireframe fidelity using this framework:
 - Output a valid JSON object only. Do NOT include comments like this '//' or trailing commas. Wrap your response in a ```json code block.
 - Use descriptive keys and nested structures to clearly organize the wireframe plan.
 - Include a "reasoning" field for each major decision to document your chain of thought.
+- Keep the key order of the structure guide below: "metadata", "component_library" and "design_system" come before "screens".
 
       ### JSON Structure Guide:
       ``` json
@@ -515,6 +536,8 @@ Include specifications on wireframe fidelity using this framework:
          "reasoning": ""
       }},
       "user_journeys": [],
+      "component_library": [],
+      "design_system": {{}},
       "screens": [
          {{
             "id": "",
@@ -528,8 +551,6 @@ Include specifications on wireframe fidelity using this framework:
             "reasoning": ""
          }}
       ],
-      "component_library": [],
-      "design_system": {{}},
       "technical_considerations": {{}},
       "annotations": {{}}
       }} 
@@ -554,6 +575,23 @@ Before finalizing, validate your plan against these criteria:
 
 Remember to justify and document your thinking at each step, making your chain of thought explicit in the JSON output.
 """
+    return prompt
+
+
+# wireframe planning agent
+@traceable
+def wireframe_planning_agent(state: WireframeState) -> WireframeState:
+    """
+        Agent for translating detailed requirements into a wireframe plan.
+    
+        Args:
+            state: The current state containing detailed_requirements
+        
+        Returns:
+            Updated state with wireframe_plan
+    """
+
+    prompt = planning_prompt(state['detailed_requirements'])
 
 #     prompt = f"""  ### Introduction:
 # You are an expert wireframe planning agent for translating project requirements into detailed wireframe specifications. Your expertise spans UX design principles, user flow optimization, and information architecture.
@@ -794,14 +832,136 @@ Remember to justify and document your thinking at each step, making your chain o
         }
 
 
+def extract_valid_svg(content: str, default_size: tuple[int, int] = (1200, 800)) -> str:
+    """
+    Extract, clean and validate the SVG code from a model response.
+
+    Args:
+        content: The raw text of the model response
+        default_size: Canvas size used for the viewBox when the root has none
+
+    Returns:
+        Well-formed SVG code with the required root attributes
+
+    Raises:
+        ValueError: If no valid SVG could be extracted
+    """
+
+    # Extract SVG code from the response
+    unstructured_svg_code = extract_svg_from_text(content)
+    if not unstructured_svg_code:
+        raise ValueError("Failed to extract SVG code from the model response")
+
+    # Clean, then check well-formedness and repair what can be repaired in one pass
+    svg_code = clean_svg(unstructured_svg_code)
+    result = validate_svg(svg_code, default_size=default_size)
+    if not result.valid:
+        errors = [diagnostic.message for diagnostic in result.diagnostics if diagnostic.level == "error"]
+        raise ValueError(f"Invalid SVG code structure: {'; '.join(errors)}")
+
+    return result.svg_code
+
+
+def extract_wireframe_svg(content: str, default_size: tuple[int, int] = (1200, 800)) -> str:
+    """
+    Turn a model response into SVG code, compiling the layout DSL when it was requested.
+
+    Responses that contain raw SVG anyway are still accepted through extract_valid_svg.
+
+    Args:
+        content: The raw text of the model response
+        default_size: Canvas size for layout screens that do not declare one
+
+    Returns:
+        SVG code with the required root attributes
+    """
+
+    if settings.SVG_OUTPUT_FORMAT == "layout" and "<svg" not in content:
+        layout = parse_json_safely(extract_json_from_text(content))
+        return compile_layout(layout, default_size=default_size, gap=settings.SVG_SCREEN_GAP)
+
+    return extract_valid_svg(content, default_size=default_size)
+
+
+def layout_prompt(plan_json: str, width: int, height: int, single_screen: bool = False) -> str:
+    """ Prompt asking for the compact layout DSL instead of raw SVG markup """
+
+    scope = (
+        "You are laying out ONE screen of a multi-screen wireframe. Return exactly one screen and no flows."
+        if single_screen else
+        "Lay out every screen of the plan and the navigation flows between them."
+    )
+
+    return f""" ### Introduction:
+You are an expert wireframe layout designer translating wireframe plans into precise grid layouts.
+{scope}
+
+### Context:
+Based on this wireframe plan:
+{plan_json}
+
+### Instructions:
+1. Use a {width}x{height} canvas per screen unless the plan specifies other dimensions.
+2. Implement each screen methodically: navigation and headers first, then content blocks, forms, actions and footers.
+3. Use ONLY ONE visual representation per element and never overlap items.
+4. Use short, realistic placeholder labels that indicate the content purpose.
+
+### Output Format:
+{LAYOUT_DSL_SPEC}
+"""
+
+
+def traced_labels_prompt(wireframe_plan: Dict[str, Any]) -> str:
+    """ Prompt asking only for the labels of the components traced from a screenshot """
+
+    screen = wireframe_plan["screens"][0]
+    components = [
+        [index, component["type"], *component["box"], component["parent"]]
+        for index, component in enumerate(traced_components(wireframe_plan))
+    ]
+
+    return f""" ### Introduction:
+You are an expert UX writer labelling a wireframe traced from a screenshot.
+
+### Context:
+Screen: {screen["name"]}
+Purpose: {screen["purpose"]}
+Canvas: {screen["layout"]["size"][0]}x{screen["layout"]["size"][1]} px
+
+Components, each as [index, type, x, y, width, height, index of the containing component or null]:
+{json.dumps(components)}
+
+### Instructions:
+1. The positions are measured and final: do not move, add or remove components.
+2. Give each component a short, realistic placeholder label that fits its type, position and the screen's purpose.
+3. Use "" for components without text of their own: images, icons, dividers, and containers whose children carry the content.
+
+### Output Format:
+Return only a JSON object in a ```json code block with one label per component, in index order:
+{{"labels": ["Brand", "", "Sign in"]}}
+"""
+
+
+def parse_traced_labels(content: str) -> List[str]:
+    """ Labels of the traced components from the model response, by component index """
+    labels = parse_json_safely(extract_json_from_text(content))
+    if isinstance(labels, dict):
+        labels = labels.get("labels")
+    if not isinstance(labels, list):
+        raise ValueError("Failed to extract component labels from the model response")
+    return ["" if label is None else str(label) for label in labels]
+
+
 # svg generation agent
 @traceable
-def svg_generator_agent(state: WireframeState) -> WireframeState:
+def svg_generator_agent(state: WireframeState, temperature: float = 0, style_hint: str = "") -> WireframeState:
     """
         Agent for generating SVG wireframe based on wireframe plan.
     
         Args:
             state: The current state containing wireframe_plan
+            temperature: Sampling temperature for the SVG model
+            style_hint: Optional layout direction appended to the prompt
         
         Returns:
             Updated state with svg_code
@@ -819,8 +979,15 @@ def svg_generator_agent(state: WireframeState) -> WireframeState:
     # Convert requirements to JSON string for the prompt (for model better readability)
    #  requirements_json = json.dumps(detailed_requirements, indent=2)
 
-
-    prompt = f""" ### Introduction:
+    canvas_size = screen_canvas_size(wireframe_plan)
+    # a traced screenshot is compiled as measured; the model only writes its labels
+    traced = settings.SVG_OUTPUT_FORMAT == "layout" and is_traced_plan(wireframe_plan)
+    if traced:
+        prompt = traced_labels_prompt(wireframe_plan)
+    elif settings.SVG_OUTPUT_FORMAT == "layout":
+        prompt = layout_prompt(plan_json, *canvas_size)
+    else:
+        prompt = f""" ### Introduction:
 You are an expert SVG wireframe generator specializing in translating wireframe plans into clean, semantic SVG code. Your expertise covers visual design principles, SVG optimization, and creating wireframes at various fidelity levels (low, medium, high).
 
 ### Context:
@@ -1301,8 +1468,14 @@ Add these CSS rules to the style section of your SVG:
 # Return the complete SVG code (including all style definitions) that can be directly rendered in a browser. Include brief annotations explaining key design decisions and how the wireframe supports the user goals identified in the requirements.
 
 #    """
+
+    if style_hint and not traced:
+        prompt += f"""
+### Variant Direction:
+{style_hint}
+"""
     
-    model = get_llm_model()
+    model = get_llm_model(TEMPERATURE=temperature)
 
     response = model.invoke(prompt)
 
@@ -1313,43 +1486,377 @@ Add these CSS rules to the style section of your SVG:
         if not state.get("wireframe_plan"):
             raise ValueError("Missing wireframe plan in state")
 
-        # Extract SVG code from the response
-        unstructured_svg_code = extract_svg_from_text(response.content)
-        if not unstructured_svg_code:
-            raise ValueError("Failed to extract SVG code from the model response")
+        if traced:
+            svg_code = compile_layout(traced_layout(wireframe_plan, parse_traced_labels(response.content)), default_size=canvas_size)
+        else:
+            svg_code = extract_wireframe_svg(response.content, default_size=canvas_size)
+
+        return {
+            **state,
+            "svg_code": svg_code,
+        }
+    except Exception as e:
+        return {
+            **state,
+            "errors": (state.get("errors") or []) + [f"Error in SVG generation: {str(e)}"]
+        }
+    
+
+
+def variant_settings(index: int) -> tuple[float, str]:
+    """ Temperature and layout direction used for the variant at `index` """
+    temperature = settings.SVG_VARIANT_TEMPERATURES[index % len(settings.SVG_VARIANT_TEMPERATURES)]
+    style_hint = settings.SVG_VARIANT_STYLE_HINTS[index % len(settings.SVG_VARIANT_STYLE_HINTS)]
+    return temperature, style_hint
 
-        # Clean and validate SVG code
-        svg_code = clean_svg(unstructured_svg_code)
-        if not svg_code or ("<svg" not in svg_code and "<!DOCTYPE" not in svg_code):
-            raise ValueError("Invalid SVG code structure")
 
-        # Validate basic SVG structure
-        if not re.search(r'<svg[^>]*>', svg_code):
-            raise ValueError("Missing SVG root element")
-        if not svg_code.strip().endswith('</svg>'):
-            raise ValueError("Missing SVG closing tag")
+# svg variant agent
+@traceable
+def svg_variant_agent(state: WireframeState) -> dict:
+    """
+        Agent for generating one alternative SVG layout from the shared wireframe plan.
+
+        Runs as a parallel branch of the graph; the branch payload carries
+        `variant_index` on top of the planning state.
+
+        Args:
+            state: The planning state plus the variant_index of this branch
+
+        Returns:
+            Update appending this variant to svg_variants
+    """
+
+    index = state["variant_index"]
+    temperature, style_hint = variant_settings(index)
+
+    try:
+        result = svg_generator_agent({**state, "errors": []}, temperature=temperature, style_hint=style_hint)
+        errors = result.get("errors") or None
+        svg_code = result.get("svg_code")
+    except Exception as e:
+        errors = [f"Error in SVG generation: {str(e)}"]
+        svg_code = None
+
+    return {
+        "svg_variants": [{
+            "index": index,
+            "temperature": temperature,
+            "style_hint": style_hint or None,
+            "svg_code": svg_code,
+            "errors": errors,
+        }]
+    }
 
-        # Ensure required SVG attributes
-        if 'viewBox' not in svg_code:
-            # Add default viewBox if missing
-            svg_code = svg_code.replace('<svg', '<svg viewBox="0 0 1200 800"')
 
-        if 'xmlns' not in svg_code:
-            # Add SVG namespace if missing
-            svg_code = svg_code.replace('<svg', '<svg xmlns="http://www.w3.org/2000/svg"')
+# variant selection agent
+def select_variant_agent(state: WireframeState) -> WireframeState:
+    """
+        Promote the first successful variant to svg_code.
+
+        Args:
+            state: The current state containing svg_variants
+
+        Returns:
+            Updated state with svg_code
+    """
 
+    variants = state.get("svg_variants") or []
+    successful = [variant for variant in variants if variant.get("svg_code") and not variant.get("errors")]
+
+    if not successful:
+        variant_errors = [error for variant in variants for error in (variant.get("errors") or [])]
         return {
             **state,
-            "svg_code": svg_code,
+            "errors": (state.get("errors") or []) + (variant_errors or ["Error in SVG generation: no variant produced an SVG"]),
         }
+
+    return {
+        **state,
+        "svg_code": successful[0]["svg_code"],
+    }
+
+
+# per-screen svg generation agent
+@traceable
+def svg_screen_agent(state: WireframeState) -> dict:
+    """
+        Agent for generating the SVG of a single screen of the wireframe plan.
+
+        Runs as a parallel branch of the graph; the branch payload carries the
+        `screen_plan` sub-plan, its `screen_index` and the `variant_index`.
+
+        Args:
+            state: The planning state plus the screen sub-plan of this branch
+
+        Returns:
+            Update appending this screen to screen_svgs
+    """
+
+    screen_plan = state["screen_plan"]
+    screen_index = state["screen_index"]
+    variant_index = state.get("variant_index", 0)
+    temperature, style_hint = variant_settings(variant_index) if (state.get("variants") or 1) > 1 else (0, "")
+    width, height = screen_canvas_size(state["wireframe_plan"])
+
+    # Convert the screen sub-plan to JSON string for the prompt (for model better readability)
+    screen_json = json.dumps(screen_plan, indent=2)
+
+    if settings.SVG_OUTPUT_FORMAT == "layout":
+        prompt = layout_prompt(screen_json, width, height, single_screen=True)
+    else:
+        prompt = f""" ### Introduction:
+You are an expert SVG wireframe generator specializing in translating wireframe plans into clean, semantic SVG code.
+You are generating ONE screen of a multi-screen wireframe. The other screens are generated separately and composited next to this one.
+
+### Context:
+Based on this screen specification and the shared design context:
+{screen_json}
+
+### Instructions:
+1. Draw only this screen, with its top left corner at (0,0), on a `viewBox="0 0 {width} {height}"` canvas.
+2. Implement the screen methodically: container and layout elements first, then content blocks, interactive elements, text and navigation.
+3. Use ONLY ONE visual representation per element (text OR icon OR symbol) and keep at least 5px between adjacent elements.
+4. Do NOT draw arrows or flow connections to other screens, they are added when the screens are composited.
+5. Group related elements using `<g>` tags with descriptive ids.
+
+### Styling:
+Define a `<style>` section using these class names so all screens share one style sheet:
+`.screen`, `.screen-header`, `.screen-title`, `.form-field`, `.form-label`, `.button`, `.button-label`,
+`.notification`, `.navbar`, `.footer`, `.content-block`, `.link-text`.
+
+### Output:
+Return the complete SVG code for this screen (including its style definitions) that can be directly rendered in a browser.
+"""
+
+    if style_hint:
+        prompt += f"""
+### Variant Direction:
+{style_hint}
+"""
+
+    model = get_llm_model(TEMPERATURE=temperature)
+
+    try:
+        response = model.invoke(prompt)
+        svg_code = extract_wireframe_svg(response.content, default_size=(width, height))
+        errors = None
+    except Exception as e:
+        svg_code = None
+        errors = [f"Error in SVG generation for screen '{screen_plan['screen_id']}': {str(e)}"]
+
+    return {
+        "screen_svgs": [{
+            "variant_index": variant_index,
+            "screen_index": screen_index,
+            "screen_id": screen_plan["screen_id"],
+            "svg_code": svg_code,
+            "errors": errors,
+        }]
+    }
+
+
+# pipelined planning agent
+@traceable
+def pipelined_planning_agent(state: WireframeState) -> WireframeState:
+    """
+        Wireframe planning overlapped with per-screen SVG generation.
+
+        The planning response is streamed and parsed incrementally. Every screen is
+        handed to the SVG Screen Agent as soon as its specification object is
+        complete, so screens are drawn while the rest of the plan is still being
+        written. Dispatch starts once a second screen appears and the shared sections
+        (metadata, design system, component library) have all been written before
+        the screens, so every screen is drawn with them. Single-screen plans, and
+        plans that leave a shared section out or write it after the screens, are
+        generated from the final plan instead.
+
+        Args:
+            state: The current state containing detailed_requirements
+
+        Returns:
+            Updated state with wireframe_plan, plus screen_svgs for multi-screen plans
+    """
+
+    variants = state.get("variants") or 1
+    parser = IncrementalJsonParser(watch=("screens",))
+    screens: List[Dict[str, Any]] = []
+    plan_head: Optional[Dict[str, Any]] = None
+    futures: Dict[tuple, Future] = {}
+
+    def dispatch(plan: Dict[str, Any]) -> int:
+        screen_plans = split_plan_by_screen(plan)
+        for screen_index, screen_plan in enumerate(screen_plans):
+            for variant_index in range(variants):
+                if (variant_index, screen_index) not in futures:
+                    futures[(variant_index, screen_index)] = SCREEN_EXECUTOR.submit(svg_screen_agent, {
+                        **state,
+                        "wireframe_plan": plan,
+                        "variant_index": variant_index,
+                        "screen_index": screen_index,
+                        "screen_plan": screen_plan,
+                    })
+        return len(screen_plans)
+
+    try:
+        model = get_llm_model()
+        for chunk in model.stream(planning_prompt(state['detailed_requirements'])):
+            completed = parser.feed(chunk.content if isinstance(chunk.content, str) else "")
+            if not completed:
+                continue
+            if plan_head is None:
+                # sections written before the screens are complete by now; any written after them are not
+                head = parse_json_safely(extract_json_from_text(parser.text()))
+                plan_head = {key: value for key, value in head.items() if key != "screens"}
+            screens.extend(completed)
+            if len(screens) > 1 and all(key in plan_head for key in SHARED_PLAN_KEYS):
+                dispatch({**plan_head, "screens": screens})
+
+        wireframe_plan = parser.close()
+        if futures and any(plan_head.get(key) != wireframe_plan.get(key) for key in SHARED_PLAN_KEYS):
+            # a shared section was written twice and the later copy won the final parse
+            discard_screen_futures(futures, "the final plan changed its shared sections")
+        # screens that only the final, repaired parse recovers are generated now
+        screen_count = dispatch(wireframe_plan) if len(split_plan_by_screen(wireframe_plan)) > 1 else 0
+        extra = {key: future for key, future in futures.items() if key[1] >= screen_count}
+        if extra:
+            discard_screen_futures(extra, "the final plan has fewer screens than were streamed")
+        screen_svgs = [
+            update
+            for key in sorted(futures) if key[1] < screen_count
+            for update in futures[key].result()["screen_svgs"]
+        ]
     except Exception as e:
+        discard_screen_futures(futures, "planning failed")
         return {
             **state,
-            "errors": (state.get("errors") or []) + [f"Error in SVG generation: {str(e)}"]
+            "errors": (state.get("errors") or []) + [f"Error in wireframe planning: {str(e)}"]
         }
-    
 
+    return {
+        **state,
+        "wireframe_plan": wireframe_plan,
+        "screen_svgs": screen_svgs,
+    }
+
+
+def discard_screen_futures(futures: Dict[tuple, Future], reason: str) -> None:
+    """
+    Drop screen generations whose result will not be used.
+
+    Queued ones are cancelled. Running ones cannot be stopped: their LLM call
+    finishes on the shared executor, so they are logged along with when they end.
+
+    Args:
+        futures: Screen generations keyed by (variant index, screen index), emptied in place
+        reason: Why the generations are discarded, for the log
+    """
+    discarded = len(futures)
+    # queued generations cost nothing once cancelled, the others made their LLM call for nothing
+    spent = {key: future for key, future in futures.items() if not future.cancel()}
+    futures.clear()
+    if not spent:
+        return
+
+    running = sorted(key for key, future in spent.items() if not future.done())
+    logger.warning(
+        "Discarding %d screen generations (%s): %d already finished, %d still running",
+        discarded, reason, len(spent) - len(running), len(running),
+    )
+    for variant_index, screen_index in running:
+        spent[(variant_index, screen_index)].add_done_callback(lambda _, v=variant_index, s=screen_index: logger.info(
+            "Discarded screen generation finished (variant %d, screen %d)", v, s
+        ))
+
+
+# screen compositing agent
+def composite_screens_agent(state: WireframeState) -> WireframeState:
+    """
+        Composite the per-screen SVGs of each variant into complete wireframes.
+
+        A variant fails when any of its screens is missing, either because its
+        generation failed or because its SVG does not parse, with one error per screen.
+
+        Args:
+            state: The current state containing screen_svgs
+
+        Returns:
+            Updated state with svg_code, and svg_variants when several variants were requested
+    """
+
+    flows = extract_screen_flows(state["wireframe_plan"])
+    screen_ids = [sub_plan["screen_id"] for sub_plan in split_plan_by_screen(state["wireframe_plan"])]
+    variant_count = state.get("variants") or 1
+
+    variants = []
+    for variant_index in range(variant_count):
+        screens = [screen for screen in state.get("screen_svgs") or [] if screen["variant_index"] == variant_index]
+        temperature, style_hint = variant_settings(variant_index) if variant_count > 1 else (0, "")
+        errors = []
+        for screen in screens:
+            if not screen.get("svg_code"):
+                errors.extend(screen.get("errors") or [f"Error in SVG generation for screen '{screen['screen_id']}': no SVG was produced"])
+        generated = {screen["screen_id"] for screen in screens}
+        errors.extend(f"Error in SVG generation for screen '{sid}': the screen was never generated" for sid in screen_ids if sid not in generated)
+
+        svg_code = None
+        if not errors:
+            try:
+                svg_code = composite_screens(screens, flows, gap=settings.SVG_SCREEN_GAP)
+            except Exception as e:
+                errors.append(f"Error in SVG compositing: {str(e)}")
+
+        variants.append({
+            "index": variant_index,
+            "temperature": temperature,
+            "style_hint": style_hint or None,
+            "svg_code": svg_code,
+            "errors": errors or None,
+        })
+
+    if variant_count > 1:
+        return select_variant_agent({**state, "svg_variants": variants})
+
+    if not variants[0]["svg_code"]:
+        return {
+            **state,
+            "errors": (state.get("errors") or []) + variants[0]["errors"],
+        }
+
+    return {
+        **state,
+        "svg_code": variants[0]["svg_code"],
+    }
+
+
+# svg optimization agent
+def svg_optimization_agent(state: WireframeState) -> WireframeState:
+    """
+        Shrink the final SVG and every variant without changing how they render.
+
+        Runs after generation and compositing, so repeated markup across screens
+        can be shared. Byte sizes before and after are reported in svg_optimization.
+
+        Args:
+            state: The current state containing svg_code and svg_variants
+
+        Returns:
+            Updated state with the optimized SVGs and the size report
+    """
 
+    if not settings.SVG_OPTIMIZE_ENABLED or state.get("errors") or not state.get("svg_code"):
+        return state
 
+    svg_code, report = optimize_svg(state["svg_code"], precision=settings.SVG_OPTIMIZE_PRECISION)
 
+    variants = []
+    for variant in state.get("svg_variants") or []:
+        if variant.get("svg_code"):
+            variant = {**variant, "svg_code": optimize_svg(variant["svg_code"], precision=settings.SVG_OPTIMIZE_PRECISION)[0]}
+        variants.append(variant)
 
+    return {
+        **state,
+        "svg_code": svg_code,
+        "svg_variants": variants,
+        "svg_optimization": report,
+    }
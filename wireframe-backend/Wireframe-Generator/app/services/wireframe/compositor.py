@@ -0,0 +1,417 @@
+import re
+import xml.etree.ElementTree as ET
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+
+SVG_NS = "http://www.w3.org/2000/svg"
+XLINK_NS = "http://www.w3.org/1999/xlink"
+
+ET.register_namespace("", SVG_NS)
+ET.register_namespace("xlink", XLINK_NS)
+
+# plan sections every screen needs to stay visually consistent with the others
+SHARED_PLAN_KEYS = ["metadata", "design_system", "component_library"]
+
+DEFAULT_SCREEN_SIZE = (1200, 800)
+MOBILE_SCREEN_SIZE = (360, 800)
+
+CSS_COMMENT_RE = re.compile(r"/\*[\s\S]*?\*/")
+ID_SELECTOR_RE = re.compile(r"#([A-Za-z_][\w-]*)")
+URL_REFERENCE_RE = re.compile(r"url\(\s*['\"]?#([^)'\"]+)['\"]?\s*\)")
+# selectors of the screen's own <svg> root, which becomes the screen's group when composited
+ROOT_SELECTOR_RE = re.compile(r"^(?:svg|:root)(?=$|[\s>+~])")
+# at-rules whose block holds further style rules rather than declarations or keyframes
+NESTED_AT_RULES = {"media", "supports", "container", "layer", "document"}
+
+ARROW_STYLE = """
+.arrow { stroke: #555; stroke-width: 2; fill: none; stroke-linecap: round; stroke-linejoin: round; }
+.arrow-label { font-size: 12px; fill: #555; text-anchor: middle; font-family: Arial, sans-serif; }
+"""
+
+
+def split_plan_by_screen(wireframe_plan: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Split a multi-screen wireframe plan into one sub-plan per screen.
+
+    Args:
+        wireframe_plan: The plan produced by the Wireframe Planning Agent
+
+    Returns:
+        List of sub-plans holding the shared plan sections plus a single screen
+    """
+    screens = (wireframe_plan or {}).get("screens")
+    if not isinstance(screens, list):
+        return []
+
+    shared = {key: wireframe_plan[key] for key in SHARED_PLAN_KEYS if key in wireframe_plan}
+    screens = [screen if isinstance(screen, dict) else {"name": str(screen)} for screen in screens]
+    return [
+        {**shared, "screen": screen, "screen_id": sid}
+        for screen, sid in zip(screens, unique_screen_ids(screens))
+    ]
+
+
+def screen_id(screen: Dict[str, Any], index: int) -> str:
+    """Stable, id-safe identifier for a screen of the plan."""
+    raw = str(screen.get("id") or screen.get("name") or f"screen-{index + 1}")
+    return re.sub(r"[^A-Za-z0-9_-]+", "-", raw).strip("-").lower() or f"screen-{index + 1}"
+
+
+def unique_screen_ids(screens: List[Dict[str, Any]]) -> List[str]:
+    """
+    Id-safe identifiers for a list of screens, one per screen and all distinct.
+
+    A screen whose id repeats an earlier one, e.g. two "Home" screens or two ids that
+    sanitize to the same text, gets its 1-based position appended.
+    """
+    ids: List[str] = []
+    seen: Set[str] = set()
+    for index, screen in enumerate(screens):
+        base = sid = screen_id(screen, index)
+        suffix = index + 1
+        while sid in seen:
+            sid = f"{base}-{suffix}"
+            suffix += 1
+        seen.add(sid)
+        ids.append(sid)
+    return ids
+
+
+def screen_canvas_size(wireframe_plan: Dict[str, Any]) -> Tuple[int, int]:
+    """Suggested per-screen canvas size based on the plan's target devices."""
+    metadata = (wireframe_plan or {}).get("metadata") or {}
+    devices = " ".join(str(device) for device in (metadata.get("target_devices") or [])).lower()
+    if "mobile" in devices and "desktop" not in devices:
+        return MOBILE_SCREEN_SIZE
+    return DEFAULT_SCREEN_SIZE
+
+
+def extract_screen_flows(wireframe_plan: Dict[str, Any]) -> List[Tuple[str, str, str]]:
+    """
+    Derive the navigation flows between screens from the plan.
+
+    User journeys are read as ordered lists of steps referencing screens by id or name.
+    Screens may also declare their own `transitions` / `flows` with a target screen.
+    Plans without any recognizable flow fall back to connecting the screens in order.
+
+    Args:
+        wireframe_plan: The plan produced by the Wireframe Planning Agent
+
+    Returns:
+        De-duplicated list of (source screen id, target screen id, label) tuples
+    """
+    screens = [screen if isinstance(screen, dict) else {"name": str(screen)} for screen in (wireframe_plan or {}).get("screens") or []]
+    ids = unique_screen_ids(screens)
+    lookup = {sid: sid for sid in ids}
+    for screen, sid in zip(screens, ids):
+        # a name shared by several screens refers to the first of them
+        for alias in (screen.get("id"), screen.get("name")):
+            if alias:
+                lookup.setdefault(str(alias).strip().lower(), sid)
+
+    def resolve(reference: Any) -> Optional[str]:
+        if isinstance(reference, dict):
+            reference = reference.get("screen_id") or reference.get("screen") or reference.get("id") or reference.get("name")
+        if reference is None:
+            return None
+        return lookup.get(str(reference).strip().lower())
+
+    flows = []
+    for journey in (wireframe_plan or {}).get("user_journeys") or []:
+        if not isinstance(journey, dict):
+            continue
+        steps = journey.get("steps") or journey.get("screens") or journey.get("flow") or []
+        label = str(journey.get("name") or "")
+        resolved = [sid for sid in (resolve(step) for step in steps if step is not None) if sid]
+        for source, target in zip(resolved, resolved[1:]):
+            if source != target:
+                flows.append((source, target, label))
+
+    for screen, source in zip(screens, ids):
+        for transition in screen.get("transitions") or screen.get("flows") or []:
+            if not isinstance(transition, dict):
+                continue
+            target = resolve(transition.get("to") or transition.get("target"))
+            if target and target != source:
+                flows.append((source, target, str(transition.get("trigger") or transition.get("label") or "")))
+
+    if not flows:
+        flows = [(source, target, "") for source, target in zip(ids, ids[1:])]
+
+    unique = {}
+    for source, target, label in flows:
+        unique.setdefault((source, target), label)
+    return [(source, target, label) for (source, target), label in unique.items()]
+
+
+def _parse_viewbox(root: ET.Element) -> Tuple[float, float, float, float]:
+    viewbox = root.get("viewBox")
+    if viewbox:
+        parts = [float(part) for part in re.split(r"[\s,]+", viewbox.strip()) if part]
+        if len(parts) == 4:
+            return parts[0], parts[1], parts[2], parts[3]
+
+    def length(value: Optional[str], default: int) -> float:
+        match = re.match(r"\s*([\d.]+)\s*(px)?\s*$", value or "")
+        return float(match.group(1)) if match else float(default)
+
+    return 0.0, 0.0, length(root.get("width"), DEFAULT_SCREEN_SIZE[0]), length(root.get("height"), DEFAULT_SCREEN_SIZE[1])
+
+
+def _local_name(tag: Any) -> str:
+    return tag.rsplit("}", 1)[-1] if isinstance(tag, str) else ""
+
+
+def _rewrite_references(value: str, ids: Set[str], prefix: str) -> str:
+    """Point `url(#id)` and `#id` references to ids of the screen at their prefixed form."""
+    value = URL_REFERENCE_RE.sub(lambda m: f"url(#{prefix}-{m.group(1)})" if m.group(1) in ids else m.group(0), value)
+    if value.startswith("#") and value[1:] in ids:
+        value = f"#{prefix}-{value[1:]}"
+    return value
+
+
+def _prefix_ids(element: ET.Element, prefix: str) -> Set[str]:
+    """Namespace element ids per screen so that fragments can share one document; returns the original ids."""
+    ids = {node.get("id") for node in element.iter() if node.get("id")}
+    if not ids:
+        return ids
+
+    for node in element.iter():
+        for attribute, value in list(node.attrib.items()):
+            if attribute == "id":
+                node.set(attribute, f"{prefix}-{value}")
+            elif "#" in value:
+                node.set(attribute, _rewrite_references(value, ids, prefix))
+    return ids
+
+
+def _css_statements(css: str) -> List[Tuple[str, Optional[str]]]:
+    """
+    Top-level statements of a style sheet, with nested blocks kept intact.
+
+    Returns:
+        (prelude, block) pairs; block is None for statements without one, such as `@import`
+    """
+    statements = []
+    start = depth = 0
+    quote = None
+    prelude = ""
+    for index, char in enumerate(css):
+        if quote:
+            if char == quote and css[index - 1] != "\\":
+                quote = None
+        elif char in "\"'":
+            quote = char
+        elif char == "{":
+            if depth == 0:
+                prelude, start = css[start:index], index + 1
+            depth += 1
+        elif char == "}" and depth:
+            depth -= 1
+            if depth == 0:
+                statements.append((" ".join(prelude.split()), css[start:index]))
+                start = index + 1
+        elif char == ";" and depth == 0:
+            if css[start:index].strip():
+                statements.append((" ".join(css[start:index].split()), None))
+            start = index + 1
+    return [(prelude, block) for prelude, block in statements if prelude]
+
+
+def _split_selectors(selectors: str) -> List[str]:
+    """Split a selector list on the commas that are not inside parentheses or brackets."""
+    parts, depth, start = [], 0, 0
+    for index, char in enumerate(selectors):
+        if char in "([":
+            depth += 1
+        elif char in ")]":
+            depth -= 1
+        elif char == "," and depth == 0:
+            parts.append(selectors[start:index].strip())
+            start = index + 1
+    parts.append(selectors[start:].strip())
+    return [part for part in parts if part]
+
+
+def _scope_css(css: str, scope: str, ids: Set[str], prefix: str) -> str:
+    """
+    Restrict a screen's style sheet to its group, so it cannot style the other screens.
+
+    Args:
+        css: Style sheet of the screen, without comments
+        scope: Selector of the screen's group, e.g. `#screen-login`; empty to only normalize
+        ids: Original ids of the screen's elements
+        prefix: Prefix the screen's ids were given
+
+    Returns:
+        The style sheet with every rule, also inside @media and similar blocks, scoped
+    """
+    rules = []
+    for prelude, block in _css_statements(css):
+        if block is None:
+            rules.append(f"{prelude};")
+        elif prelude.startswith("@"):
+            name = prelude[1:].split(None, 1)[0].lower() if len(prelude) > 1 else ""
+            inner = _scope_css(block, scope, ids, prefix) if name in NESTED_AT_RULES else " ".join(block.split())
+            rules.append(f"{prelude} {{ {inner} }}")
+        else:
+            selectors = []
+            for selector in _split_selectors(prelude):
+                selector = ID_SELECTOR_RE.sub(lambda m: f"#{prefix}-{m.group(1)}" if m.group(1) in ids else m.group(0), selector)
+                root = ROOT_SELECTOR_RE.match(selector)
+                if not scope:
+                    selectors.append(selector)
+                else:
+                    selectors.append(scope + selector[root.end():] if root else f"{scope} {selector}")
+            body = _rewrite_references(" ".join(block.split()), ids, prefix)
+            rules.append(f"{', '.join(selectors)} {{ {body} }}")
+    return "\n".join(rules)
+
+
+def _merge_styles(sheets: List[Tuple[str, str, Set[str]]]) -> str:
+    """
+    Merge the screens' style sheets into one.
+
+    Screens that all carry the same style sheet share it as it is. Otherwise each
+    sheet is scoped to its screen's group, so a rule of one screen never restyles
+    another, whatever selectors and at-rules it uses.
+
+    Args:
+        sheets: (screen id, style sheet, original element ids) for each screen
+
+    Returns:
+        The merged style sheet
+    """
+    sheets = [(sid, CSS_COMMENT_RE.sub("", css), ids) for sid, css, ids in sheets]
+    distinct = {_scope_css(css, "", set(), "") for _, css, _ in sheets}
+    references = any(match.group(1) in ids for _, css, ids in sheets for match in ID_SELECTOR_RE.finditer(css))
+    if len(distinct) == 1 and not references:
+        return distinct.pop()
+    return "\n".join(_scope_css(css, f"#screen-{sid}", ids, sid) for sid, css, ids in sheets if css.strip())
+
+
+def composite_screens(
+    screen_svgs: List[Dict[str, Any]],
+    flows: Optional[List[Tuple[str, str, str]]] = None,
+    gap: int = 120,
+) -> str:
+    """
+    Composite independently generated screen SVGs into one wireframe SVG.
+
+    Screens are laid out left to right in plan order, each translated into its own
+    slot of a shared viewBox. Their style sheets are merged into a single `<style>`,
+    scoped per screen unless all screens share one, ids are namespaced per screen,
+    and the flow arrows between screens are drawn locally.
+
+    Args:
+        screen_svgs: Ordered dicts with `screen_id` and `svg_code` for each screen
+        flows: (source screen id, target screen id, label) tuples to draw as arrows
+        gap: Horizontal spacing between screens, leaves room for arrows and labels
+
+    Returns:
+        The composited SVG document
+
+    Raises:
+        ValueError: If any screen's SVG cannot be parsed, naming every such screen
+    """
+    root = ET.Element(f"{{{SVG_NS}}}svg")
+    defs = ET.SubElement(root, f"{{{SVG_NS}}}defs")
+    style = ET.SubElement(root, f"{{{SVG_NS}}}style")
+
+    marker = ET.SubElement(defs, f"{{{SVG_NS}}}marker", {
+        "id": "arrowhead", "markerWidth": "10", "markerHeight": "7",
+        "refX": "9", "refY": "3.5", "orient": "auto",
+    })
+    ET.SubElement(marker, f"{{{SVG_NS}}}polygon", {"points": "0 0, 10 3.5, 0 7", "fill": "#555"})
+
+    sheets = []
+    failures = []
+    slots = {}
+    x = 0.0
+    max_height = 0.0
+
+    for screen in screen_svgs:
+        sid = screen["screen_id"]
+        try:
+            fragment = ET.fromstring(screen["svg_code"])
+        except ET.ParseError as e:
+            failures.append(f"screen '{sid}': {e}")
+            continue
+
+        if not fragment.tag.startswith("{"):
+            # fragments without xmlns parse as un-namespaced elements
+            for node in fragment.iter():
+                if isinstance(node.tag, str) and not node.tag.startswith("{"):
+                    node.tag = f"{{{SVG_NS}}}{node.tag}"
+
+        min_x, min_y, width, height = _parse_viewbox(fragment)
+        ids = _prefix_ids(fragment, sid)
+        style_blocks = []
+
+        group = ET.SubElement(root, f"{{{SVG_NS}}}g", {
+            "id": f"screen-{sid}",
+            "transform": f"translate({x - min_x:g},{0.0 - min_y:g})",
+        })
+        for child in list(fragment):
+            name = _local_name(child.tag)
+            if name == "style":
+                style_blocks.append(child.text or "")
+            elif name == "defs":
+                for definition in list(child):
+                    if _local_name(definition.tag) == "style":
+                        style_blocks.append(definition.text or "")
+                    else:
+                        defs.append(definition)
+            elif name in ("title", "metadata"):
+                continue
+            else:
+                group.append(child)
+
+        sheets.append((sid, "\n".join(style_blocks), ids))
+        slots[sid] = (x, width, height)
+        x += width + gap
+        max_height = max(max_height, height)
+
+    if failures:
+        raise ValueError(f"Unparsable screen SVG for {'; '.join(failures)}")
+    if not slots:
+        raise ValueError("No screen produced a parsable SVG")
+
+    total_width = x - gap
+    arrow_space = 80
+    for index, (source, target, label) in enumerate(flows or []):
+        if source not in slots or target not in slots:
+            continue
+        source_x, source_width, source_height = slots[source]
+        target_x, _, target_height = slots[target]
+
+        if target_x > source_x:
+            # forward flow: right edge of the source to the left edge of the target
+            start = (source_x + source_width, source_height / 2)
+            end = (target_x, target_height / 2)
+            control = ((start[0] + end[0]) / 2, min(start[1], end[1]) - 40 - 20 * (index % 3))
+        else:
+            # backward flow: loop under both screens
+            start = (source_x + source_width / 2, source_height)
+            end = (target_x + slots[target][1] / 2, target_height)
+            control = ((start[0] + end[0]) / 2, max_height + arrow_space * 0.8)
+
+        ET.SubElement(root, f"{{{SVG_NS}}}path", {
+            "d": f"M{start[0]:g},{start[1]:g} Q{control[0]:g},{control[1]:g} {end[0]:g},{end[1]:g}",
+            "class": "arrow",
+            "marker-end": "url(#arrowhead)",
+        })
+        if label:
+            text = ET.SubElement(root, f"{{{SVG_NS}}}text", {
+                "x": f"{control[0]:g}",
+                "y": f"{(start[1] + control[1]) / 2 - 6:g}",
+                "class": "arrow-label",
+            })
+            text.text = label
+
+    style.text = "\n" + _merge_styles(sheets) + "\n" + _scope_css(ARROW_STYLE, "", set(), "") + "\n"
+    root.set("viewBox", f"0 0 {total_width:g} {max_height + arrow_space:g}")
+    root.set("width", "100%")
+    root.set("height", "100%")
+
+    return ET.tostring(root, encoding="unicode")
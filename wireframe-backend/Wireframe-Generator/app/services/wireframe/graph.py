@@ -1,11 +1,68 @@
 from typing import Dict, Any, Optional, List
-from app.services.wireframe.agents import query_expansion_agent, requirement_gathering_agent, svg_generator_agent, wireframe_planning_agent
+from app.services.wireframe.agents import query_expansion_agent, requirement_gathering_agent, svg_generator_agent, wireframe_planning_agent, pipelined_planning_agent, svg_variant_agent, select_variant_agent, svg_screen_agent, composite_screens_agent, svg_optimization_agent
+from app.services.wireframe.compositor import split_plan_by_screen
+from app.config import settings
 from pydantic import BaseModel
 
 from langgraph.graph import StateGraph, START, END
+from langgraph.types import Send
 
 from app.models.wireframe import WireframeState
 
+
+def route_svg_generation(state: WireframeState):
+    """
+    Route the planned state to a single SVG generation or fan out into parallel branches.
+
+    Multi-screen plans fan out one branch per screen (and per variant) when per-screen
+    generation is enabled; otherwise each variant generates the whole plan in one call.
+    Screens already generated by pipelined planning go straight to compositing.
+
+    Args:
+        state: The current state after wireframe planning
+
+    Returns:
+        Name of the next node, or a list of Send packets for the parallel branches
+    """
+    if state.get("screen_svgs"):
+        return "Composite_Screens"
+
+    variants = state.get("variants") or 1
+
+    screen_plans = split_plan_by_screen(state.get("wireframe_plan")) if settings.SVG_PER_SCREEN_ENABLED else []
+    if len(screen_plans) > 1:
+        return [
+            Send("SVG_Screen", {**state, "variant_index": variant_index, "screen_index": screen_index, "screen_plan": screen_plan})
+            for variant_index in range(variants)
+            for screen_index, screen_plan in enumerate(screen_plans)
+        ]
+
+    if variants <= 1:
+        return "SVG_Generation"
+
+    return [Send("SVG_Variant", {**state, "variant_index": index}) for index in range(variants)]
+
+
+def route_entry(state: WireframeState) -> str:
+    """
+    Skip the upstream stages when their output is already part of the initial state.
+
+    A state that already holds a wireframe plan (e.g. one built from a screenshot)
+    goes straight to SVG generation.
+
+    Args:
+        state: The initial state of the graph
+
+    Returns:
+        Name of the first node to run, or Send packets for parallel SVG branches
+    """
+    if state.get("wireframe_plan"):
+        return route_svg_generation(state)
+    if state.get("detailed_requirements"):
+        return "Wireframe_Planning"
+    return "Query_Expansion"
+
+
 def create_wireframe_graph():
     """
 
@@ -21,26 +78,39 @@ def create_wireframe_graph():
     # add nodes to the graph
     workflow.add_node("Query_Expansion", query_expansion_agent)    
     workflow.add_node("Requirement_Gathering", requirement_gathering_agent)
-    workflow.add_node("Wireframe_Planning", wireframe_planning_agent)
+    pipelined = settings.PLANNING_PIPELINE_ENABLED and settings.SVG_PER_SCREEN_ENABLED
+    workflow.add_node("Wireframe_Planning", pipelined_planning_agent if pipelined else wireframe_planning_agent)
     workflow.add_node("SVG_Generation", svg_generator_agent)
+    workflow.add_node("SVG_Variant", svg_variant_agent)
+    workflow.add_node("Select_Variant", select_variant_agent)
+    workflow.add_node("SVG_Screen", svg_screen_agent)
+    workflow.add_node("Composite_Screens", composite_screens_agent)
+    workflow.add_node("SVG_Optimization", svg_optimization_agent)
 
     # add edges to the graph
-    workflow.add_edge(START, "Query_Expansion")
+    workflow.add_conditional_edges(START, route_entry, ["Query_Expansion", "Wireframe_Planning", "SVG_Generation", "SVG_Variant", "SVG_Screen"])
     workflow.add_edge("Query_Expansion", "Requirement_Gathering")
     workflow.add_edge("Requirement_Gathering", "Wireframe_Planning")
-    workflow.add_edge("Wireframe_Planning", "SVG_Generation")
-    workflow.add_edge("SVG_Generation", END)
+    workflow.add_conditional_edges("Wireframe_Planning", route_svg_generation, ["SVG_Generation", "SVG_Variant", "SVG_Screen", "Composite_Screens"])
+    workflow.add_edge("SVG_Generation", "SVG_Optimization")
+    workflow.add_edge("SVG_Variant", "Select_Variant")
+    workflow.add_edge("Select_Variant", "SVG_Optimization")
+    workflow.add_edge("SVG_Screen", "Composite_Screens")
+    workflow.add_edge("Composite_Screens", "SVG_Optimization")
+    workflow.add_edge("SVG_Optimization", END)
 
     # compile the graph 
     return workflow.compile()
 
 
-def generate_wireframe(user_query: str) -> Optional[Dict[str, Any]]:
+def generate_wireframe(user_query: str, variants: int = 1, partial_state: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
     """
     Generate a wireframe from a user query.
     
     Args:
         user_query: The user's description of the desired wireframe
+        variants: Number of alternative SVG layouts to generate from the shared plan
+        partial_state: Output of already completed upstream stages to resume from, e.g. a speculative run or a plan built from a screenshot
         
     Returns:
         State containing the generated wireframe and intermediary data
@@ -55,8 +125,18 @@ def generate_wireframe(user_query: str) -> Optional[Dict[str, Any]]:
         "detailed_requirements": None,
         "wireframe_plan": None,
         "svg_code": None,
-        "errors": []
+        "errors": [],
+        "variants": variants,
+        "svg_variants": [],
+        "screen_svgs": [],
+        "svg_optimization": None,
     }
+    if partial_state:
+        initial_state.update({
+            key: partial_state[key]
+            for key in ("user_query", "original_query", "detailed_requirements", "wireframe_plan")
+            if partial_state.get(key) is not None
+        })
 
     # run the graph
     try:
@@ -67,4 +147,4 @@ def generate_wireframe(user_query: str) -> Optional[Dict[str, Any]]:
         return {
             **initial_state,
             "errors": [f"Failed to generate wireframe: {str(e)}"]
-        }
\ No newline at end of file
+        }
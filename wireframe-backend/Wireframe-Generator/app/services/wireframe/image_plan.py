@@ -0,0 +1,174 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.services.wireframe.compositor import DEFAULT_SCREEN_SIZE, MOBILE_SCREEN_SIZE
+
+
+# detector element types as the plan's component vocabulary (see LAYOUT_DSL_SPEC)
+COMPONENT_TYPES = {
+    "navbar": "navbar",
+    "footer": "footer",
+    "section": "block",
+    "card": "card",
+    "input": "field",
+    "button": "button",
+    "image": "image",
+    "icon": "icon",
+    "divider": "divider",
+    "text": "text",
+}
+
+# containers first, then the most visible elements, when a screenshot has more elements than the plan keeps
+TYPE_PRIORITY = ["navbar", "footer", "section", "card", "image", "input", "button", "icon", "divider", "text"]
+
+# annotations.source of plans traced from a screenshot
+TRACED_SOURCE = "image-detection"
+
+
+def screenshot_canvas(width: int, height: int) -> Tuple[Tuple[int, int], bool]:
+    """Canvas of the generated screen: mobile or desktop width, keeping the screenshot's aspect ratio."""
+    mobile = width <= 2 * MOBILE_SCREEN_SIZE[0] and height > width
+    canvas_width = MOBILE_SCREEN_SIZE[0] if mobile else DEFAULT_SCREEN_SIZE[0]
+    return (canvas_width, max(1, round(height * canvas_width / width))), mobile
+
+
+def component_tree(elements: List[Dict[str, Any]], scale: float, max_components: int) -> List[Dict[str, Any]]:
+    """
+    Nest the detected elements under their containers, in reading order, with boxes in canvas pixels.
+
+    Args:
+        elements: Output of detect_elements
+        scale: Canvas pixels per screenshot pixel
+        max_components: Most elements kept, by type priority and size
+
+    Returns:
+        Top-level components, each with its `children`
+    """
+    ranked = sorted(elements, key=lambda e: (TYPE_PRIORITY.index(e["type"]), -e["width"] * e["height"]))
+    kept = {element["id"] for element in ranked[:max_components]}
+
+    nodes = {}
+    for element in sorted(elements, key=lambda e: (e["y"], e["x"])):
+        if element["id"] not in kept:
+            continue
+        nodes[element["id"]] = {
+            "type": COMPONENT_TYPES.get(element["type"], "block"),
+            "box": [round(element[key] * scale) for key in ("x", "y", "width", "height")],
+            "children": [],
+        }
+
+    roots = []
+    for element in sorted(elements, key=lambda e: (e["y"], e["x"])):
+        node = nodes.get(element["id"])
+        if node is None:
+            continue
+        parent = nodes.get(element["parent"])
+        (parent["children"] if parent else roots).append(node)
+
+    for node in nodes.values():
+        if not node["children"]:
+            del node["children"]
+    return roots
+
+
+def image_wireframe_plan(layout: Dict[str, Any], hint: str = "", max_components: int = 120) -> Dict[str, Any]:
+    """
+    Build a wireframe plan from the layout detected on a screenshot, in place of the planning agent's.
+
+    The plan follows the planning agent's structure with one screen, whose components
+    are the detected elements at their measured positions. The detector does not read
+    text, so labels are left to the SVG generator, guided by the optional hint. With the
+    layout output format the components are compiled as measured (see traced_layout)
+    and the model only writes their labels; with raw SVG output it draws them itself.
+
+    Args:
+        layout: Output of detect_layout: screenshot `width`, `height` and `elements`
+        hint: Short description of the screen, e.g. "checkout page of a bike shop"
+        max_components: Most detected elements passed on to the SVG generator
+
+    Returns:
+        Wireframe plan for svg_generator_agent
+    """
+    (canvas_width, canvas_height), mobile = screenshot_canvas(layout["width"], layout["height"])
+    scale = canvas_width / layout["width"]
+    components = component_tree(layout["elements"], scale, max_components)
+    used_types = sorted({COMPONENT_TYPES.get(element["type"], "block") for element in layout["elements"]})
+    purpose = hint or "Recreate the layout of the uploaded screenshot"
+
+    return {
+        "metadata": {
+            "project_name": hint or "Screenshot wireframe",
+            "fidelity_level": "medium",
+            "target_devices": ["mobile"] if mobile else ["desktop"],
+            "design_approach": "Traced from an uploaded screenshot: keep every component at its measured position and size",
+        },
+        "component_library": used_types,
+        "design_system": {
+            "canvas": [canvas_width, canvas_height],
+            "units": "px; box is [x, y, width, height] on the canvas",
+        },
+        "screens": [
+            {
+                "id": "screenshot",
+                "name": hint or "Screenshot",
+                "purpose": purpose,
+                "layout": {"size": [canvas_width, canvas_height]},
+                "components": components,
+                "reasoning": (
+                    "Components were detected on the screenshot and carry no text. "
+                    "Give each one a short, realistic placeholder label that fits the screen's purpose."
+                ),
+            }
+        ],
+        "annotations": {"source": TRACED_SOURCE, "detected_elements": len(layout["elements"])},
+    }
+
+
+def is_traced_plan(wireframe_plan: Dict[str, Any]) -> bool:
+    """Whether the plan was built by image_wireframe_plan from a screenshot."""
+    return ((wireframe_plan or {}).get("annotations") or {}).get("source") == TRACED_SOURCE
+
+
+def traced_components(wireframe_plan: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    The traced screen's components as a flat list, each container before its children.
+
+    Returns:
+        Components with their `type`, `box` and the list index of their `parent` (or None)
+    """
+    flat: List[Dict[str, Any]] = []
+
+    def visit(components: List[Dict[str, Any]], parent: Optional[int]) -> None:
+        for component in components:
+            flat.append({"type": component["type"], "box": component["box"], "parent": parent})
+            visit(component.get("children") or [], len(flat) - 1)
+
+    visit(wireframe_plan["screens"][0]["components"], None)
+    return flat
+
+
+def traced_layout(wireframe_plan: Dict[str, Any], labels: List[str]) -> Dict[str, Any]:
+    """
+    Layout DSL document drawing the traced components at their measured boxes.
+
+    Args:
+        wireframe_plan: Output of image_wireframe_plan
+        labels: Label of each component of traced_components, by index; missing ones stay empty
+
+    Returns:
+        Single-screen layout in canvas pixels, for compile_layout
+    """
+    screen = wireframe_plan["screens"][0]
+    items = [
+        [component["type"], *component["box"], labels[index] if index < len(labels) else ""]
+        for index, component in enumerate(traced_components(wireframe_plan))
+    ]
+    return {"screens": [{"id": screen["id"], "size": screen["layout"]["size"], "units": "px", "items": items}]}
+
+
+def image_requirements(layout: Dict[str, Any], hint: str = "") -> Dict[str, Any]:
+    """Stand-in for the requirement gathering output of an image-guided run."""
+    return {
+        "source": "image-guided",
+        "description": hint or "Wireframe of an uploaded screenshot",
+        "screenshot_size": [layout["width"], layout["height"]],
+    }
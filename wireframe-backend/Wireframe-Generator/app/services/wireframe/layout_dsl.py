@@ -0,0 +1,246 @@
+from typing import Any, Dict, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from app.services.wireframe.compositor import composite_screens, unique_screen_ids
+
+
+# Compact layout description the model emits instead of raw SVG markup.
+# Every item is a positional array on a column grid, which keeps the output a
+# small fraction of the equivalent SVG while the compiler below restores the
+# classed markup (`.screen`, `.button`, `.form-label`, ...) deterministically.
+LAYOUT_DSL_SPEC = """
+Return a JSON object in a ```json code block, using this compact layout format:
+{
+  "screens": [
+    {
+      "id": "login",
+      "size": [360, 800],
+      "cols": 4,
+      "items": [
+        ["navbar", 0, 0, 4, 1, "Brand"],
+        ["title", 0, 2, 4, 1, "Welcome back"],
+        ["label", 0, 3, 4, 1, "Email *"],
+        ["field", 0, 4, 4, 1, "you@example.com"],
+        ["button", 0, 6, 4, 1, "Sign in"],
+        ["link", 0, 7, 4, 1, "Forgot password?"]
+      ]
+    }
+  ],
+  "flows": [["login", "home", "Sign in"]]
+}
+
+- `size` is the screen canvas in px, `cols` the number of grid columns (default 12, 4 for mobile). Rows are 40px high.
+- Each item is [type, col, row, col_span, row_span, label]. Spans default to 1 and the label to "".
+- Item types: navbar, header, footer, title, text, label, field, textarea, button, link,
+  block, card, image, icon, notification, divider.
+- `flows` lists navigation between screens as [from screen id, to screen id, action label].
+- Place items so they do not overlap and leave empty rows between sections.
+- Output only the JSON, no SVG and no commentary.
+"""
+
+DEFAULT_COLUMNS = 12
+MOBILE_COLUMNS = 4
+ROW_HEIGHT = 40
+MARGIN = 16
+GUTTER = 8
+
+LAYOUT_STYLE = """
+.screen { fill: #ffffff; stroke: #999999; stroke-width: 1; }
+.screen-header, .navbar { fill: #eeeeee; stroke: #999999; stroke-width: 1; }
+.footer { fill: #f2f2f2; stroke: #999999; stroke-width: 1; }
+.screen-title { font-family: Arial, sans-serif; font-size: 20px; font-weight: bold; fill: #333333; }
+.body-text { font-family: Arial, sans-serif; font-size: 13px; fill: #555555; }
+.form-field { fill: #ffffff; stroke: #888888; stroke-width: 1; }
+.form-label { font-family: Arial, sans-serif; font-size: 13px; fill: #333333; }
+.placeholder { font-family: Arial, sans-serif; font-size: 13px; fill: #aaaaaa; }
+.button { fill: #dddddd; stroke: #666666; stroke-width: 1.5; }
+.button-label { font-family: Arial, sans-serif; font-size: 14px; font-weight: bold; fill: #333333; text-anchor: middle; }
+.notification { fill: #f5f5f5; stroke: #777777; stroke-width: 1; stroke-dasharray: 4,2; }
+.content-block { fill: #fafafa; stroke: #bbbbbb; stroke-width: 1; }
+.placeholder-line { stroke: #cccccc; stroke-width: 1; }
+.link-text { font-family: Arial, sans-serif; font-size: 13px; fill: #3366cc; text-decoration: underline; }
+.icon { fill: none; stroke: #777777; stroke-width: 1.5; }
+.divider { stroke: #cccccc; stroke-width: 1; }
+"""
+
+# item type -> (rect class, text class, centered label)
+BOX_TYPES = {
+    "navbar": ("navbar", "form-label", False),
+    "header": ("screen-header", "screen-title", False),
+    "footer": ("footer", "body-text", True),
+    "field": ("form-field", "placeholder", False),
+    "textarea": ("form-field", "placeholder", False),
+    "button": ("button", "button-label", True),
+    "block": ("content-block", "body-text", False),
+    "card": ("content-block", "form-label", False),
+    "notification": ("notification", "body-text", False),
+}
+
+TEXT_TYPES = {
+    "title": "screen-title",
+    "text": "body-text",
+    "label": "form-label",
+    "link": "link-text",
+}
+
+
+def _fmt(value: float) -> str:
+    return f"{value:.1f}".rstrip("0").rstrip(".")
+
+
+def _normalize_item(item: Any) -> Optional[Tuple[str, float, float, float, float, str]]:
+    """Accept the positional array form and a tolerant dict form of a layout item."""
+    if isinstance(item, dict):
+        item = [
+            item.get("type") or item.get("t"),
+            item.get("col", item.get("x", 0)),
+            item.get("row", item.get("y", 0)),
+            item.get("col_span", item.get("w", 1)),
+            item.get("row_span", item.get("h", 1)),
+            item.get("label", item.get("l", "")),
+        ]
+    if not isinstance(item, (list, tuple)) or not item or not isinstance(item[0], str):
+        return None
+
+    values = list(item) + [None] * (6 - len(item))
+    try:
+        col, row = float(values[1] or 0), float(values[2] or 0)
+        col_span, row_span = float(values[3] or 1), float(values[4] or 1)
+    except (TypeError, ValueError):
+        return None
+    label = "" if values[5] is None else str(values[5])
+    return values[0].strip().lower(), col, row, max(col_span, 0.25), max(row_span, 0.25), label
+
+
+def compile_screen(screen: Dict[str, Any], default_size: Tuple[int, int] = (1200, 800)) -> str:
+    """
+    Compile one screen of the layout DSL into a classed SVG document.
+
+    Items are placed on the column grid, except on screens with `"units": "px"`
+    (built from a traced screenshot, never by the model), whose items give their
+    x, y, width and height in canvas pixels instead of grid cells.
+
+    Args:
+        screen: Screen description with `size`, optional `cols` or `units` and positional `items`
+        default_size: Canvas size used when the screen does not declare one
+
+    Returns:
+        SVG code for the screen
+    """
+    size = screen.get("size") or default_size
+    try:
+        width, height = float(size[0]), float(size[1])
+    except (TypeError, ValueError, IndexError):
+        width, height = map(float, default_size)
+
+    pixels = screen.get("units") == "px"
+    columns = int(screen.get("cols") or (MOBILE_COLUMNS if width < 600 else DEFAULT_COLUMNS))
+    column_width = (width - 2 * MARGIN) / max(columns, 1)
+    screen_id = escape(str(screen.get("id") or "screen"), {'"': "&quot;"})
+
+    parts: List[str] = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {_fmt(width)} {_fmt(height)}" width="100%" height="100%">',
+        f"<style>{LAYOUT_STYLE}</style>",
+        f'<g id="{screen_id}">',
+        f'<rect class="screen" x="0" y="0" width="{_fmt(width)}" height="{_fmt(height)}"/>',
+    ]
+
+    for raw_item in screen.get("items") or []:
+        item = _normalize_item(raw_item)
+        if item is None:
+            continue
+        kind, col, row, col_span, row_span, label = item
+
+        if pixels:
+            x, y, w, h = col, row, max(col_span, 1), max(row_span, 1)
+            single_line = h <= ROW_HEIGHT
+        else:
+            x = MARGIN + col * column_width + GUTTER / 2
+            y = MARGIN + row * ROW_HEIGHT + GUTTER / 2
+            w = max(col_span * column_width - GUTTER, 1)
+            h = max(row_span * ROW_HEIGHT - GUTTER, 1)
+            single_line = row_span <= 1
+        text = escape(label)
+
+        if kind in BOX_TYPES:
+            rect_class, text_class, centered = BOX_TYPES[kind]
+            rx = 6 if kind == "button" else 2
+            parts.append(f'<rect class="{rect_class}" x="{_fmt(x)}" y="{_fmt(y)}" width="{_fmt(w)}" height="{_fmt(h)}" rx="{rx}"/>')
+            if text:
+                text_x = x + w / 2 if centered else x + 10
+                anchor = ' text-anchor="middle"' if centered and text_class != "button-label" else ""
+                # first text line sits in the vertical middle of a single-row box, at the top of taller ones
+                text_y = y + h / 2 + 5 if single_line else y + 22
+                parts.append(f'<text class="{text_class}" x="{_fmt(text_x)}" y="{_fmt(text_y)}"{anchor}>{text}</text>')
+        elif kind in TEXT_TYPES:
+            parts.append(f'<text class="{TEXT_TYPES[kind]}" x="{_fmt(x)}" y="{_fmt(y + h / 2 + 5)}">{text}</text>')
+        elif kind == "image":
+            parts.append(f'<rect class="content-block" x="{_fmt(x)}" y="{_fmt(y)}" width="{_fmt(w)}" height="{_fmt(h)}"/>')
+            parts.append(f'<path class="placeholder-line" d="M{_fmt(x)},{_fmt(y)} L{_fmt(x + w)},{_fmt(y + h)} M{_fmt(x + w)},{_fmt(y)} L{_fmt(x)},{_fmt(y + h)}"/>')
+        elif kind == "icon":
+            radius = min(w, h) / 2
+            parts.append(f'<circle class="icon" cx="{_fmt(x + w / 2)}" cy="{_fmt(y + h / 2)}" r="{_fmt(radius)}"/>')
+        elif kind == "divider":
+            parts.append(f'<line class="divider" x1="{_fmt(x)}" y1="{_fmt(y + h / 2)}" x2="{_fmt(x + w)}" y2="{_fmt(y + h / 2)}"/>')
+        else:
+            # unknown component types degrade to a labelled content block
+            parts.append(f'<rect class="content-block" x="{_fmt(x)}" y="{_fmt(y)}" width="{_fmt(w)}" height="{_fmt(h)}"/>')
+            if text:
+                parts.append(f'<text class="body-text" x="{_fmt(x + 10)}" y="{_fmt(y + 22)}">{text}</text>')
+
+    parts.append("</g></svg>")
+    return "".join(parts)
+
+
+def compile_layout(layout: Dict[str, Any], default_size: Tuple[int, int] = (1200, 800), gap: int = 120) -> str:
+    """
+    Compile a layout DSL document into the final wireframe SVG.
+
+    Single-screen layouts compile directly; multi-screen layouts are compiled per
+    screen and composited side by side with their flow arrows.
+
+    Args:
+        layout: Parsed layout DSL, either `{"screens": [...], "flows": [...]}` or a single screen
+        default_size: Canvas size used for screens that do not declare one
+        gap: Horizontal spacing between composited screens
+
+    Returns:
+        SVG code for the whole layout
+
+    Raises:
+        ValueError: If the layout contains no screens
+    """
+    if not isinstance(layout, dict):
+        raise ValueError("Layout must be a JSON object")
+
+    screens = layout.get("screens")
+    if screens is None and "items" in layout:
+        screens = [layout]
+    screens = [screen for screen in screens or [] if isinstance(screen, dict)]
+    if not screens:
+        raise ValueError("Layout does not contain any screens")
+
+    if len(screens) == 1:
+        return compile_screen(screens[0], default_size)
+
+    # screens become groups of one document, so their ids are sanitized and made distinct;
+    # flows name screens as the model wrote them, a repeated id pointing at its first screen
+    ids = unique_screen_ids(screens)
+    lookup = {sid: sid for sid in ids}
+    for screen, sid in zip(screens, ids):
+        if screen.get("id"):
+            lookup.setdefault(str(screen["id"]).strip().lower(), sid)
+
+    compiled = [
+        {"screen_id": sid, "svg_code": compile_screen({**screen, "id": sid}, default_size)}
+        for screen, sid in zip(screens, ids)
+    ]
+
+    flows = []
+    for flow in layout.get("flows") or []:
+        if not isinstance(flow, (list, tuple)) or len(flow) < 2:
+            continue
+        source, target = (lookup.get(str(end).strip().lower()) for end in flow[:2])
+        if source and target:
+            flows.append((source, target, str(flow[2]) if len(flow) > 2 else ""))
+    return composite_screens(compiled, flows, gap=gap)
@@ -0,0 +1,142 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from app.services.conversation import has_common_pattern
+from app.services.wireframe.agents import query_expansion_agent, requirement_gathering_agent
+
+
+# LLM calls made by one speculative run (Query_Expansion + Requirement_Gathering)
+SPECULATED_LLM_CALLS = 2
+
+
+def run_upstream_stages(description: str) -> Dict[str, Any]:
+    """
+    Run the stages of the graph that only depend on the description.
+
+    Args:
+        description: Accumulated user description of the wireframe
+
+    Returns:
+        Partial graph state with the expanded query and detailed requirements
+    """
+    state = {
+        "user_query": description,
+        "original_query": None,
+        "detailed_requirements": None,
+        "wireframe_plan": None,
+        "svg_code": None,
+        "errors": [],
+    }
+    state = query_expansion_agent(state)
+    state = requirement_gathering_agent(state)
+    return state
+
+
+def covers(speculated: str, current: str, max_drift: int) -> bool:
+    """
+    Check whether a run on `speculated` is still valid for `current`.
+
+    The description may only have grown by a short reply that names no new
+    interface pattern, such as "yes" or "that's all".
+    """
+    if speculated == current:
+        return True
+    if not current.startswith(speculated):
+        return False
+    added = current[len(speculated):].strip()
+    return len(added) <= max_drift and not has_common_pattern(added)
+
+
+class SpeculationManager:
+    """
+    Starts the upstream stages in the background while a conversation is still running.
+
+    One speculative run is tied to each conversation session. A later /generate for
+    that session claims it: the partial state is reused when the session description
+    has not meaningfully changed since the run started, and discarded otherwise.
+    """
+
+    def __init__(self, max_workers: int = 4, ttl: int = 600, max_drift: int = 40):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="speculation")
+        self.ttl = ttl
+        self.max_drift = max_drift
+        self.lock = threading.Lock()
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.stats = {"started": 0, "hits": 0, "discarded": 0, "misses": 0, "wasted_llm_calls": 0}
+
+    def _discard(self, entry: Dict[str, Any]) -> None:
+        # a run that already started still spends its calls even if cancelled now
+        if not entry["future"].cancel():
+            self.stats["wasted_llm_calls"] += SPECULATED_LLM_CALLS
+        self.stats["discarded"] += 1
+
+    def _prune(self) -> None:
+        now = time.time()
+        for session_id, entry in list(self.entries.items()):
+            if now - entry["started_at"] > self.ttl:
+                self._discard(self.entries.pop(session_id))
+
+    def start(self, session_id: str, description: str) -> bool:
+        """
+        Start speculating on a session description, replacing a stale run.
+
+        Args:
+            session_id: Conversation session the run belongs to
+            description: Accumulated user description to run the upstream stages on
+
+        Returns:
+            True if a new run was started, False if the current run still covers the description
+        """
+        with self.lock:
+            self._prune()
+            existing = self.entries.get(session_id)
+            if existing and covers(existing["description"], description, self.max_drift):
+                return False
+            if existing:
+                self._discard(existing)
+
+            future: Future = self.executor.submit(run_upstream_stages, description)
+            self.entries[session_id] = {"description": description, "future": future, "started_at": time.time()}
+            self.stats["started"] += 1
+            return True
+
+    def claim(self, session_id: str, description: str) -> Optional[Future]:
+        """
+        Take the speculative run of a session for a generation request.
+
+        Args:
+            session_id: Conversation session the generation belongs to
+            description: Current accumulated user description of that session
+
+        Returns:
+            Future of the partial state when it can be reused, otherwise None
+        """
+        with self.lock:
+            self._prune()
+            entry = self.entries.pop(session_id, None)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            if not covers(entry["description"], description, self.max_drift):
+                self._discard(entry)
+                return None
+            self.stats["hits"] += 1
+            return entry["future"]
+
+    def unusable(self) -> None:
+        """Count a claimed run that failed: its calls were spent for nothing and it is no hit."""
+        with self.lock:
+            self.stats["hits"] -= 1
+            self.stats["discarded"] += 1
+            self.stats["wasted_llm_calls"] += SPECULATED_LLM_CALLS
+
+    def report(self) -> Dict[str, Any]:
+        """Speculation counters plus the share of started runs that were reused."""
+        with self.lock:
+            return {
+                **self.stats,
+                "pending": len(self.entries),
+                "hit_rate": self.stats["hits"] / self.stats["started"] if self.stats["started"] else 0.0,
+            }
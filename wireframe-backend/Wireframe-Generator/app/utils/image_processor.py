@@ -2,71 +2,834 @@ from PIL import Image, ImageOps, ImageFilter, ImageDraw
 from io import BytesIO
 import asyncio
 import base64
-from typing import List, Tuple
+import hashlib
+import math
+import struct
+import zlib
+from collections import deque
+from itertools import chain
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
-def get_edge_points(img: Image.Image, threshold: int = 128) -> List[Tuple[int, int]]:
-    """Extract edge points from the image using Sobel edge detection."""
+import cv2
+import numpy as np
+
+from app.config import settings
+
+def get_edge_points(img: Image.Image, threshold: int = 128) -> np.ndarray:
+    """
+    Extract edge points from the image using Sobel edge detection.
+
+    Thresholds the FIND_EDGES output as an array, so no pixel is visited in Python.
+
+    Returns:
+        (N, 2) integer array of (x, y) coordinates in row-scan order
+    """
     # Convert to grayscale and apply edge detection
     img = ImageOps.grayscale(img)
-    edges = img.filter(ImageFilter.FIND_EDGES)
-    
-    # Get edge points
-    width, height = edges.size
-    edge_points = []
-    pixels = edges.load()
-    
-    for y in range(height):
-        for x in range(width):
-            if pixels[x, y] > threshold:
-                edge_points.append((x, y))
-                
-    return edge_points
-
-def points_to_path(points: List[Tuple[int, int]], simplify_distance: int = 5) -> str:
+    edges = np.asarray(img.filter(ImageFilter.FIND_EDGES))
+
+    # Get edge points (nonzero walks the mask in row-major order, same as a y/x scan)
+    ys, xs = np.nonzero(edges > threshold)
+    return np.column_stack((xs, ys))
+
+def points_to_path(points: Union[np.ndarray, List[Tuple[int, int]]], simplify_distance: int = 5) -> str:
     """Convert points to SVG path data with simplification."""
-    if not points:
+    points = np.asarray(points, dtype=np.int64).reshape(-1, 2)
+    if len(points) == 0:
         return ""
-        
-    # Simple point reduction
-    simplified = [points[0]]
-    for point in points[1:]:
-        last = simplified[-1]
-        if abs(point[0] - last[0]) > simplify_distance or abs(point[1] - last[1]) > simplify_distance:
-            simplified.append(point)
-            
+
+    # Simple point reduction: each point is compared with the last kept one, which is
+    # inherently sequential, so only this loop runs over plain ints
+    xs, ys = points[:, 0].tolist(), points[:, 1].tolist()
+    last_x, last_y = xs[0], ys[0]
+    path = [f"M {last_x} {last_y}"]
+    for x, y in zip(xs, ys):
+        if abs(x - last_x) > simplify_distance or abs(y - last_y) > simplify_distance:
+            path.append(f"L {x} {y}")
+            last_x, last_y = x, y
+
     # Create path data
-    path = f"M {simplified[0][0]} {simplified[0][1]}"
-    for x, y in simplified[1:]:
-        path += f" L {x} {y}"
-    
-    return path
-
-async def image_to_svg(image_path: str) -> str:
-    """
-    Convert an image to a wireframe SVG representation using PIL.
-    """
-    # Open and process image
-    img = Image.open(image_path)
-    
-    # Resize if image is too large
-    max_size = 800
-    if max(img.size) > max_size:
-        ratio = max_size / max(img.size)
-        img = img.resize((int(img.size[0] * ratio), int(img.size[1] * ratio)))
-    
-    # Get edge points
-    edge_points = get_edge_points(img)
-    
-    # Create SVG
+    return " ".join(path)
+
+def get_edge_mask(img: Image.Image, threshold: int = 128) -> np.ndarray:
+    """Binary uint8 mask of the FIND_EDGES pixels above the threshold."""
+    edges = np.asarray(ImageOps.grayscale(img).filter(ImageFilter.FIND_EDGES))
+    return (edges > threshold).astype(np.uint8)
+
+def get_contours(img: Image.Image, threshold: int = 128, epsilon: float = 1.5, min_length: float = 8) -> List[np.ndarray]:
+    """
+    Trace the edges of the image as simplified polylines.
+
+    Each connected edge stroke is traced once along its outer boundary (the holes
+    of closed strokes would only repeat it) and simplified with Douglas-Peucker.
+
+    Args:
+        img: Source image
+        threshold: Edge strength above which a pixel counts as an edge
+        epsilon: Maximum distance in pixels between a contour and its simplification
+        min_length: Contours with a shorter perimeter are dropped as noise
+
+    Returns:
+        One (N, 2) integer array of (x, y) vertices per contour
+    """
+    contours, hierarchy = cv2.findContours(get_edge_mask(img, threshold), cv2.RETR_CCOMP, cv2.CHAIN_APPROX_SIMPLE)
+    if hierarchy is None:
+        return []
+
+    polylines = []
+    for contour, (_, _, _, parent) in zip(contours, hierarchy[0]):
+        if parent != -1 or cv2.arcLength(contour, True) < min_length:
+            continue
+        polylines.append(cv2.approxPolyDP(contour, epsilon, True).reshape(-1, 2))
+    return polylines
+
+def contour_to_path(contour: np.ndarray, closed: bool = True) -> str:
+    """Compact SVG path for one contour: absolute start, then integer relative steps."""
+    x, y = contour[0].tolist()
+    steps = np.diff(contour, axis=0).ravel().tolist()
+    data = f"M{x} {y}l" + " ".join(map(str, steps)) if steps else f"M{x} {y}"
+    if closed:
+        data += "z"
+    # a minus sign already separates two numbers
+    return data.replace(" -", "-")
+
+def contours_to_paths(contours: List[np.ndarray]) -> List[str]:
+    """Path data for every contour, one compact path each."""
+    return [contour_to_path(contour) for contour in contours]
+
+# Tiled tracing of tall images
+
+def trace_band(band: Image.Image, cut_top: int, top: int, bottom: int, threshold: int = 128,
+               epsilon: float = 1.5, min_length: float = 8) -> Tuple[List[np.ndarray], List[np.ndarray]]:
+    """
+    Trace the edges of the rows [top, bottom) of an image.
+
+    The band holds the image rows from `cut_top`, with a few rows of context above
+    `top` and below `bottom` (see image_bands), so its edge mask matches the whole
+    image's. Contours that stay inside the band's rows are final and simplified
+    right away. Contours that leave them are clipped to the band and returned as
+    raw runs, each starting and ending with the pixel step that crosses a seam, to
+    be joined with the neighbouring bands' runs by stitch_runs.
+
+    Returns:
+        Simplified closed contours and unsimplified seam-crossing runs, in image coordinates
+    """
+    contours, hierarchy = cv2.findContours(get_edge_mask(band, threshold), cv2.RETR_CCOMP, cv2.CHAIN_APPROX_NONE)
+    if hierarchy is None:
+        return [], []
+
+    closed, runs = [], []
+    for contour, (_, _, _, parent) in zip(contours, hierarchy[0]):
+        points = contour.reshape(-1, 2)
+        points[:, 1] += cut_top
+        inside = (points[:, 1] >= top) & (points[:, 1] < bottom)
+        if inside.all():
+            # same outline as on the whole image: keep outer boundaries only, like get_contours
+            if parent == -1 and cv2.arcLength(contour, True) >= min_length:
+                closed.append(cv2.approxPolyDP(contour, epsilon, True).reshape(-1, 2))
+            continue
+        if not inside.any():
+            continue
+
+        # rotate so the ring starts outside, right before it enters the band, then cut it into runs
+        entry = int(np.flatnonzero(inside & ~np.roll(inside, 1))[0])
+        points, inside = np.roll(points, 1 - entry, axis=0), np.roll(inside, 1 - entry)
+        starts = np.flatnonzero(inside[1:] & ~inside[:-1]) + 1
+        ends = np.flatnonzero(inside & ~np.roll(inside, -1))
+        for start, end in zip(starts, ends):
+            runs.append(compress_run(points.take(range(start - 1, end + 2), axis=0, mode="wrap")))
+    return closed, runs
+
+def compress_run(points: np.ndarray) -> np.ndarray:
+    """
+    Drop the points of a run that lie inside a straight stretch of equal pixel steps.
+
+    The first and last steps, which stitch_runs matches runs on, are kept, and so is
+    every turn, so the run traces the same line with as many points as it has turns.
+    """
+    if len(points) <= 4:
+        return points
+    steps = np.diff(points, axis=0)
+    keep = np.ones(len(points), dtype=bool)
+    keep[2:-2] = (steps[1:-2] != steps[2:-1]).any(axis=1)
+    return points[keep]
+
+def stitch_runs(runs: List[np.ndarray], epsilon: float = 1.5, min_length: float = 8) -> List[Tuple[np.ndarray, bool]]:
+    """
+    Join the seam-crossing runs of all bands into whole outlines.
+
+    A run ends with the same two pixels the run continuing it in the next band
+    starts with, so runs are chained on that crossing step. A chain that comes back
+    to its first run is closed; one with a missing neighbour stays open. Closed
+    chains that wind like a hole boundary are dropped.
+
+    Returns:
+        Simplified (vertices, closed) outlines
+    """
+    step = lambda run, i: (*run[i].tolist(), *run[i + 1].tolist())
+    by_start = {step(run, 0): index for index, run in enumerate(runs)}
+    successor = [by_start.get(step(run, -2)) for run in runs]
+    has_predecessor = {index for index in successor if index is not None}
+
+    outlines, visited = [], [False] * len(runs)
+    # open chains first (from runs nothing leads to), then the remaining cycles
+    heads = [index for index in range(len(runs)) if index not in has_predecessor] + list(range(len(runs)))
+    for head in heads:
+        if visited[head]:
+            continue
+        pieces, index, closed = [runs[head]], successor[head], False
+        visited[head] = True
+        while index is not None:
+            if index == head:
+                closed = True
+                break
+            if visited[index]:
+                break
+            visited[index] = True
+            pieces.append(runs[index][2:])
+            index = successor[index]
+
+        chain = np.concatenate(pieces).astype(np.int32)
+        if closed:
+            # the head's first step is repeated at the end of the cycle
+            chain = chain[1:-1]
+            # findContours winds hole boundaries the other way round; drop them like get_contours does
+            if cv2.contourArea(chain, True) > 0:
+                continue
+        if cv2.arcLength(chain, closed) >= min_length:
+            outlines.append((cv2.approxPolyDP(chain, epsilon, closed).reshape(-1, 2), closed))
+    return outlines
+
+def image_bands(img: Image.Image, band_height: int = 512, overlap: int = 4) -> Iterator[Tuple[Image.Image, int, int, int]]:
+    """
+    Cut a decoded image into bands for trace_band.
+
+    Yields:
+        The band with `overlap` rows of context on both sides, the image row it starts
+        at, and the first and past-the-end rows it traces
+    """
     width, height = img.size
+    for top in range(0, height, band_height):
+        bottom = min(top + band_height, height)
+        cut_top = max(0, top - overlap)
+        yield img.crop((0, cut_top, width, min(height, bottom + overlap))), cut_top, top, bottom
+
+def strip_bands(strips: Iterable[Image.Image], height: int, band_height: int = 512,
+                overlap: int = 4) -> Iterator[Tuple[Image.Image, int, int, int]]:
+    """
+    Regroup consecutive horizontal strips of an image into bands for trace_band.
+
+    Only the rows of the band being cut and of the strip being read are held, so
+    strips decoded one at a time (see png_strips) are traced without the whole image.
+
+    Args:
+        strips: The image's rows, top to bottom, in strips of any height
+        height: Total rows of the strips
+
+    Yields:
+        Bands as image_bands yields them
+    """
+    buffer, buffer_top, top = None, 0, 0
+    for strip in strips:
+        rows = np.asarray(strip)
+        buffer = rows if buffer is None else np.concatenate([buffer, rows])
+        while top < height:
+            bottom = min(top + band_height, height)
+            cut_top, cut_bottom = max(0, top - overlap), min(height, bottom + overlap)
+            if buffer_top + len(buffer) < cut_bottom:
+                break
+            yield Image.fromarray(buffer[cut_top - buffer_top:cut_bottom - buffer_top]), cut_top, top, bottom
+            top = bottom
+            # keep only the context rows the next band starts with
+            drop = max(0, top - overlap) - buffer_top
+            buffer, buffer_top = buffer[drop:], buffer_top + drop
+
+def trace_bands(bands: Iterable[Tuple[Image.Image, int, int, int]], threads: int = 1, threshold: int = 128,
+                epsilon: float = 1.5, min_length: float = 8) -> List[Tuple[np.ndarray, bool]]:
+    """
+    Trace bands one after the other and stitch the outlines across their seams.
+
+    Bands are taken from the iterable as they are traced, with at most `threads`
+    in flight, so a lazily decoded image is never held whole.
+
+    Returns:
+        (vertices, closed) outlines
+    """
+    trace = lambda band: trace_band(*band, threshold=threshold, epsilon=epsilon, min_length=min_length)
+    if threads > 1:
+        traced = []
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            pending = deque()
+            for band in bands:
+                pending.append(executor.submit(trace, band))
+                if len(pending) >= threads:
+                    traced.append(pending.popleft().result())
+            traced.extend(future.result() for future in pending)
+    else:
+        traced = map(trace, bands)
+
+    outlines, runs = [], []
+    for closed, band_runs in traced:
+        outlines.extend((contour, True) for contour in closed)
+        runs.extend(band_runs)
+    return outlines + stitch_runs(runs, epsilon, min_length)
+
+def get_contours_tiled(img: Image.Image, band_height: int = 512, overlap: int = 4, threads: int = 1,
+                       threshold: int = 128, epsilon: float = 1.5, min_length: float = 8) -> List[Tuple[np.ndarray, bool]]:
+    """
+    Trace the edges of a tall image band by band and stitch the outlines across seams.
+
+    Only `threads` bands are cut and edge-detected at a time, so the working memory
+    beyond the image itself stays the same however tall the image is; to trace
+    without the decoded image, see trace_bands over png_strips. Outlines that fit in
+    a band come out as get_contours traces them. Outlines crossing a seam are
+    joined back together.
+
+    Args:
+        img: Source image
+        band_height: Rows per band
+        overlap: Rows of context above and below each band (at least 2)
+        threads: Bands traced concurrently; OpenCV and PIL release the GIL
+
+    Returns:
+        (vertices, closed) outlines
+    """
+    return trace_bands(image_bands(img, band_height, overlap), threads, threshold, epsilon, min_length)
+
+# pixel count above which an upload is treated as a decompression bomb (PIL's own error limit is ~179M)
+MAX_IMAGE_PIXELS = settings.IMAGE_MAX_PIXELS
+# pages at least this many times taller than wide keep their width and are traced in bands
+TILE_ASPECT = settings.IMAGE_TILE_ASPECT
+
+def open_image(content: bytes, max_pixels: int = MAX_IMAGE_PIXELS) -> Image.Image:
+    """Open an encoded image lazily, reading only its header, and enforce the pixel limit."""
+    img = Image.open(BytesIO(content))
+    width, height = img.size
+    if width * height > max_pixels:
+        raise Image.DecompressionBombError(
+            f"Image has {width * height} pixels ({width}x{height}), the limit is {max_pixels}"
+        )
+    return img
+
+def probe_image(content: bytes, max_pixels: int = MAX_IMAGE_PIXELS) -> Tuple[str, int, int]:
+    """
+    Read only the image header and reject decompression bombs before any pixel is decoded.
+
+    Args:
+        content: Encoded image (PNG, JPEG, ...)
+        max_pixels: Largest accepted width * height
+
+    Returns:
+        Format, width and height of the image
+
+    Raises:
+        PIL.UnidentifiedImageError: If the bytes are not a supported image
+        PIL.Image.DecompressionBombError: If the image has more than max_pixels pixels
+    """
+    img = open_image(content, max_pixels)
+    return (img.format, *img.size)
+
+def is_tall(width: int, height: int, tall_aspect: float = TILE_ASPECT) -> bool:
+    """Whether a page is tall enough to be processed at full width, in bands."""
+    return bool(tall_aspect) and height >= tall_aspect * width
+
+def load_image(content: Union[bytes, Image.Image], max_size: int = 800, max_pixels: int = MAX_IMAGE_PIXELS,
+               tall_aspect: float = TILE_ASPECT) -> Image.Image:
+    """
+    Decode uploaded image bytes to RGB, downscaled so the longer side is at most max_size.
+    Tall pages (see is_tall) are only downscaled to max_size wide, so long captures keep their detail.
+
+    An image that is already decoded is returned as is.
+
+    Large JPEGs are decoded at a reduced scale (draft mode) and never held at full
+    size. Other formats (PNG, WebP, GIF, ...) are decoded at full size first, then
+    box-reduced by an integer factor before resampling; the pixel limit is what bounds
+    their memory. Tall PNG pages can be read without a full decode, see working_strips.
+
+    Raises:
+        PIL.Image.DecompressionBombError: If the image has more than max_pixels pixels
+    """
+    if isinstance(content, Image.Image):
+        return content
+    img = open_image(content, max_pixels)
+    width, height = img.size
+    side = width if is_tall(width, height, tall_aspect) else max(width, height)
+    if side <= max_size:
+        return img.convert("RGB")
+
+    ratio = max_size / side
+    size = (max(1, int(width * ratio)), max(1, int(height * ratio)))
+    # JPEG: let the decoder scale down by 1/2, 1/4 or 1/8 while staying above the target size
+    img.draft("RGB", size)
+    if img.mode not in ("RGB", "RGBA", "L", "LA"):
+        # palette and bilevel images resample badly; convert them first
+        img = img.convert("RGB")
+    img = img.resize(size, reducing_gap=2.0)
+    return img.convert("RGB")
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# samples per pixel of the 8-bit PNG color types: gray, RGB, palette, gray + alpha, RGBA
+PNG_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+# compressed bytes inflated per step, so no step copies or produces more than a strip's worth
+PNG_INFLATE_STEP = 16384
+
+def png_chunks(content: bytes) -> Iterator[Tuple[bytes, memoryview]]:
+    """Type and data of each chunk of a PNG, without copying the data."""
+    view, position = memoryview(content), len(PNG_SIGNATURE)
+    while position + 8 <= len(content):
+        length, kind = struct.unpack(">I4s", content[position:position + 8])
+        yield kind, view[position + 8:position + 8 + length]
+        if kind == b"IEND":
+            return
+        position += 12 + length
+
+def png_header(content: bytes) -> Optional[Tuple[int, int, int]]:
+    """Width, height and color type of a PNG that png_strips can decode, otherwise None."""
+    if not content.startswith(PNG_SIGNATURE) or content[12:16] != b"IHDR" or len(content) < 29:
+        return None
+    width, height, depth, color_type, _, _, interlace = struct.unpack(">IIBBBBB", content[16:29])
+    if depth != 8 or interlace or color_type not in PNG_CHANNELS:
+        return None
+    return width, height, color_type
+
+def _png_chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+def png_strips(content: bytes, rows: int = 256) -> Iterator[Image.Image]:
+    """
+    Decode a non-interlaced 8-bit PNG (see png_header) to RGB, `rows` scanlines at a time.
+
+    The compressed stream is inflated incrementally. Each strip's filtered scanlines
+    are decoded by PIL as a small PNG of their own, after the previous strip's last
+    row, stored unfiltered, which the first scanline's filter refers to. Only one
+    strip of pixels is held at a time, however tall the image is.
+
+    Raises:
+        OSError: If the image data ends before the last row
+    """
+    width, height, color_type = png_header(content)
+    row_size = 1 + width * PNG_CHANNELS[color_type]
+    palette = b"".join(_png_chunk(kind, bytes(data)) for kind, data in png_chunks(content) if kind in (b"PLTE", b"tRNS"))
+    inflater = zlib.decompressobj()
+    pending = bytearray()
+    # PNG filters read the row above the first one as zeros
+    previous = bytes(row_size)
+    decoded = 0
+
+    def strip(count: int) -> Image.Image:
+        nonlocal previous
+        data = previous + pending[:count * row_size]
+        del pending[:count * row_size]
+        header = struct.pack(">IIBBBBB", width, count + 1, 8, color_type, 0, 0, 0)
+        png = b"".join([PNG_SIGNATURE, _png_chunk(b"IHDR", header), palette,
+                        _png_chunk(b"IDAT", zlib.compress(bytes(data), 0)), _png_chunk(b"IEND", b"")])
+        img = Image.open(BytesIO(png))
+        img.load()
+        previous = b"\x00" + img.crop((0, count, width, count + 1)).tobytes()
+        return img.crop((0, 1, width, count + 1)).convert("RGB")
+
+    for kind, data in png_chunks(content):
+        if kind != b"IDAT":
+            continue
+        for offset in range(0, len(data), PNG_INFLATE_STEP):
+            piece = data[offset:offset + PNG_INFLATE_STEP]
+            while piece:
+                pending += inflater.decompress(piece, rows * row_size)
+                piece = inflater.unconsumed_tail
+                while len(pending) >= rows * row_size and decoded < height:
+                    count = min(rows, height - decoded)
+                    yield strip(count)
+                    decoded += count
+    pending += inflater.flush()
+    while decoded < height and len(pending) >= row_size:
+        count = min(rows, height - decoded, len(pending) // row_size)
+        yield strip(count)
+        decoded += count
+    if decoded < height:
+        raise OSError(f"image file is truncated ({height - decoded} rows not read)")
+
+def working_strips(content: Union[bytes, Image.Image], max_size: int = 800, max_pixels: int = MAX_IMAGE_PIXELS,
+                   tall_aspect: float = TILE_ASPECT) -> Optional[Tuple[Tuple[int, int], Iterator[Image.Image]]]:
+    """
+    Decode a tall page strip by strip at the working size load_image would give it.
+
+    Only tall pages (see is_tall) in a PNG format png_strips reads are streamed; for
+    anything else this returns None and the image is decoded whole by load_image.
+
+    Returns:
+        The working size and an iterator over its strips, top to bottom, or None
+
+    Raises:
+        PIL.Image.DecompressionBombError: If the image has more than max_pixels pixels
+    """
+    if not isinstance(content, bytes):
+        return None
+    header = png_header(content)
+    if header is None or not is_tall(header[0], header[1], tall_aspect):
+        return None
+    open_image(content, max_pixels)
+
+    width, height, _ = header
+    ratio = min(1.0, max_size / width)
+    size = (max(1, int(width * ratio)), max(1, int(height * ratio)))
+    if ratio == 1:
+        return size, png_strips(content)
+    return size, resized_strips(png_strips(content), (width, height), size)
+
+def resized_strips(strips: Iterable[Image.Image], source_size: Tuple[int, int], size: Tuple[int, int],
+                   resample: int = Image.BICUBIC) -> Iterator[Image.Image]:
+    """
+    Resize an image given as horizontal strips, strip by strip, as resizing it whole would.
+
+    Each output strip is resampled from a window of source rows that includes the
+    filter's support above and below it, so there are no seams between strips.
+    """
+    width, height = source_size
+    scale = height / size[1]
+    # source rows the resampling filter reaches beyond an output row's own (bicubic: 2 output rows)
+    support = math.ceil(2 * max(scale, 1)) + 1
+    window, window_top, emitted = None, 0, 0
+    for strip in chain(strips, [None]):
+        if strip is not None:
+            rows = np.asarray(strip)
+            window = rows if window is None else np.concatenate([window, rows])
+            end = min(size[1], int((window_top + len(window) - support) / scale))
+        else:
+            end = size[1]
+        if window is None or end <= emitted:
+            continue
+        box = (0, emitted * scale - window_top, width, end * scale - window_top)
+        yield Image.fromarray(window).resize((size[0], end - emitted), resample, box=box)
+        emitted = end
+        drop = max(0, int(emitted * scale) - support - window_top)
+        window, window_top = window[drop:], window_top + drop
+
+def perceptual_hash(img: Image.Image, hash_size: int = 16) -> int:
+    """
+    DCT perceptual hash: one bit per low-frequency coefficient of a 4 * hash_size
+    square grayscale thumbnail, set where it is above the median coefficient.
+
+    Re-compressed or re-scaled copies of an image differ in only a few of the
+    hash_size ** 2 bits, while added or moved elements flip dozens.
+    """
+    side = 4 * hash_size
+    small = np.asarray(ImageOps.grayscale(img).resize((side, side), Image.BOX), dtype=np.float32)
+    low = cv2.dct(small)[:hash_size, :hash_size].ravel()
+    # the DC term only encodes overall brightness
+    bits = low > np.median(low[1:])
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+def fingerprint_image(content: bytes) -> Tuple[str, int, Tuple[int, int]]:
+    """
+    Decode an upload to its working size and fingerprint the decoded pixels.
+
+    Only the fingerprint leaves the worker: the decoded bitmap of a tall page runs to
+    tens of MB, more than decoding the upload again in the conversion job costs.
+    Tall PNG pages are read strip by strip (see working_strips) and never held whole.
+
+    Args:
+        content: Encoded image (PNG, JPEG, ...)
+
+    Returns:
+        The SHA-256 of the decoded size and pixels, their perceptual hash, and the working size
+    """
+    streamed = working_strips(content)
+    if streamed is None:
+        img = load_image(content)
+        digest = hashlib.sha256(f"{img.size[0]}x{img.size[1]}:".encode())
+        digest.update(img.tobytes())
+        return digest.hexdigest(), perceptual_hash(img), img.size
+
+    (width, height), strips = streamed
+    digest = hashlib.sha256(f"{width}x{height}:".encode())
+
+    def hashed(strips: Iterable[Image.Image]) -> Iterator[Image.Image]:
+        for strip in strips:
+            digest.update(strip.tobytes())
+            yield ImageOps.grayscale(strip)
+
+    # a thumbnail as wide as the perceptual hash's, built strip by strip at the same scale in
+    # both directions, so the rows each strip needs do not grow with the page height
+    side = 4 * 16
+    size = (side, max(side, round(height * side / width)))
+    thumbnail = np.concatenate([np.asarray(rows) for rows in resized_strips(hashed(strips), (width, height), size, Image.BOX)])
+    return digest.hexdigest(), perceptual_hash(Image.fromarray(thumbnail)), (width, height)
+
+def image_bytes_to_svg(content: Union[bytes, Image.Image], vectorizer: str = "contours", tiled: Optional[bool] = None) -> str:
+    """
+    Convert an encoded image to a wireframe SVG representation.
+
+    CPU-bound: the API runs it in the image conversion process pool.
+
+    Args:
+        content: Encoded image (PNG, JPEG, ...), or an already decoded image
+        vectorizer: "contours" traces simplified contours into compact paths,
+                    "points" connects every edge point into one path in row-scan order
+        tiled: Trace contours in bands (get_contours_tiled); by default only tall pages are
+    """
+    # tall PNG pages traced in bands are decoded strip by strip, never whole
+    streamed = working_strips(content) if vectorizer != "points" and tiled is not False else None
+    if streamed is not None:
+        (width, height), strips = streamed
+        bands = strip_bands(strips, height, band_height=settings.IMAGE_TILE_HEIGHT)
+        outlines = trace_bands(bands, threads=settings.IMAGE_TILE_THREADS)
+    else:
+        # Decode, resizing if the image is too large
+        img = load_image(content)
+        width, height = img.size
+
+    # Create SVG
     svg = f'<svg width="{width}" height="{height}" xmlns="http://www.w3.org/2000/svg">'
     svg += '<rect width="100%" height="100%" fill="white"/>'
-    
-    # Add edges as path
-    path_data = points_to_path(edge_points)
-    if path_data:
-        svg += f'<path d="{path_data}" stroke="black" fill="none" stroke-width="1"/>'
-    
+
+    if vectorizer == "points":
+        # Add edges as path
+        path_data = points_to_path(get_edge_points(img))
+        if path_data:
+            svg += f'<path d="{path_data}" stroke="black" fill="none" stroke-width="1"/>'
+    else:
+        if streamed is None:
+            if tiled is None:
+                tiled = is_tall(width, height)
+            if tiled:
+                outlines = get_contours_tiled(img, band_height=settings.IMAGE_TILE_HEIGHT, threads=settings.IMAGE_TILE_THREADS)
+            else:
+                outlines = [(contour, True) for contour in get_contours(img)]
+        paths = [contour_to_path(contour, closed) for contour, closed in outlines]
+        if paths:
+            svg += '<g stroke="black" fill="none" stroke-width="1">'
+            svg += "".join(f'<path d="{path_data}"/>' for path_data in paths)
+            svg += '</g>'
+
     svg += '</svg>'
-    
+
     return svg
+
+async def image_to_svg(image_path: str, vectorizer: str = "contours") -> str:
+    """
+    Convert an image file to a wireframe SVG representation.
+
+    Runs in the calling thread; request handlers use image_bytes_to_svg through the process pool.
+    """
+    with open(image_path, "rb") as image_file:
+        return image_bytes_to_svg(image_file.read(), vectorizer)
+
+# UI element detection
+
+# element types drawn as containers of other elements
+CONTAINER_TYPES = {"navbar", "footer", "section", "card", "image"}
+
+WIREFRAME_STYLE = (
+    ".page{fill:#fff}"
+    ".navbar,.footer{fill:#e0e0e0;stroke:#999}"
+    ".section{fill:#f4f4f4;stroke:#bbb}"
+    ".card{fill:#fff;stroke:#999}"
+    ".input{fill:#fff;stroke:#777}"
+    ".button{fill:#d0d0d0;stroke:#666}"
+    ".image{fill:#eee;stroke:#999}"
+    ".image-cross{stroke:#bbb;fill:none}"
+    ".text{fill:#c8c8c8}"
+    ".icon{fill:#bbb}"
+    ".divider{fill:#ccc}"
+)
+
+def background_color(rgb: np.ndarray) -> np.ndarray:
+    """Mean color of the most frequent color bin (32 levels per channel), sampled on a 4px grid."""
+    pixels = rgb[::4, ::4].reshape(-1, 3).astype(np.int32)
+    quantized = pixels >> 3
+    keys = (quantized[:, 0] << 10) | (quantized[:, 1] << 5) | quantized[:, 2]
+    key = np.bincount(keys, minlength=1 << 15).argmax()
+    return pixels[keys == key].mean(axis=0).round().astype(np.int32)
+
+def classify_elements(stats: np.ndarray, outline: np.ndarray, width: int, height: int) -> np.ndarray:
+    """
+    Element type of every component, decided on the stats arrays at once.
+
+    Outlined rectangles become cards or inputs, filled rectangles bars, buttons,
+    images or icons, thin strokes dividers and everything else text.
+    """
+    x, y, w, h, area = (stats[:, column].astype(np.float64) for column in range(5))
+    fill = area / np.maximum(w * h, 1)
+    aspect = w / np.maximum(h, 1)
+    outlined = (outline > 0.8) & (fill < 0.5) & (w >= 24) & (h >= 16)
+    filled = fill > 0.85
+    full_width = w >= 0.9 * width
+
+    return np.select(
+        [
+            outlined & (h <= 64) & (aspect >= 3),
+            outlined,
+            filled & (h <= 4),
+            filled & full_width & (y < 0.2 * height),
+            filled & full_width & (y + h > 0.8 * height),
+            filled & full_width,
+            filled & (h <= 80) & (aspect >= 1.5) & (aspect <= 12),
+            filled & (w <= 48) & (h <= 48),
+            filled | ((h > 40) & (fill > 0.5)),
+        ],
+        ["input", "card", "divider", "navbar", "footer", "section", "button", "icon", "image"],
+        default="text",
+    )
+
+def detect_elements(img: Image.Image, tolerance: int = 16, min_size: int = 6, max_elements: int = 500) -> List[dict]:
+    """
+    Detect rectangular UI regions (bars, cards, inputs, buttons, images, text) in a screenshot.
+
+    Pixels that differ from the background color are grouped into connected
+    components, after a small horizontal closing that joins the glyphs of a text
+    line. Each component is fitted with its bounding rectangle and classified from
+    how much of the rectangle it fills and how much of the rectangle's outline it
+    covers. All of it runs on arrays; no pixel is visited in Python.
+
+    Args:
+        img: Screenshot or mockup
+        tolerance: Per-channel difference from the background counted as foreground
+        min_size: Components smaller than this on both sides are dropped as noise
+        max_elements: Only the largest components are kept beyond this count
+
+    Returns:
+        Elements ordered top to bottom, each with id, type, x, y, width, height and
+        the id of the smallest container around it (or None)
+    """
+    rgb = np.asarray(img.convert("RGB"))
+    height, width = rgb.shape[:2]
+    background = background_color(rgb)
+    lower = tuple(int(value) for value in np.clip(background - tolerance, 0, 255))
+    upper = tuple(int(value) for value in np.clip(background + tolerance, 0, 255))
+    foreground = 1 - cv2.inRange(rgb, lower, upper) // 255
+    foreground = cv2.morphologyEx(foreground, cv2.MORPH_CLOSE, np.ones((1, 4), np.uint8))
+
+    count, labels, stats, _ = cv2.connectedComponentsWithStats(foreground, connectivity=8)
+    stats = stats[1:]  # label 0 is the background
+    if len(stats) == 0:
+        return []
+
+    # share of each bounding rectangle's outline covered by the component itself; only
+    # boundary pixels can lie on the rectangle, so the interiors are skipped
+    boundary = foreground - cv2.erode(foreground, np.ones((3, 3), np.uint8), borderType=cv2.BORDER_CONSTANT, borderValue=0)
+    ys, xs = np.nonzero(boundary)
+    component = labels[ys, xs] - 1
+    left, top = stats[component, 0], stats[component, 1]
+    right, bottom = left + stats[component, 2] - 1, top + stats[component, 3] - 1
+    on_outline = (xs == left) | (xs == right) | (ys == top) | (ys == bottom)
+    perimeter = np.maximum(2 * (stats[:, 2] + stats[:, 3]) - 4, 1)
+    outline = np.bincount(component, weights=on_outline, minlength=len(stats)) / perimeter
+
+    keep = ((stats[:, 2] >= min_size) | (stats[:, 3] >= min_size)) & (stats[:, 4] >= 12)
+    keep &= ~((stats[:, 2] >= width - 1) & (stats[:, 3] >= height - 1))  # the page frame itself
+    indices = np.flatnonzero(keep)
+    indices = indices[np.argsort(-stats[indices, 4], kind="stable")][:max_elements]
+    stats, outline = stats[indices], outline[indices]
+    types = classify_elements(stats, outline, width, height)
+
+    # parent: the smallest container whose rectangle holds the element (2px tolerance)
+    x0, y0 = stats[:, 0], stats[:, 1]
+    x1, y1 = x0 + stats[:, 2], y0 + stats[:, 3]
+    inside = (
+        (x0[:, None] >= x0[None, :] - 2) & (y0[:, None] >= y0[None, :] - 2)
+        & (x1[:, None] <= x1[None, :] + 2) & (y1[:, None] <= y1[None, :] + 2)
+    )
+    box_area = (stats[:, 2] * stats[:, 3]).astype(np.float64)
+    inside &= np.isin(types, list(CONTAINER_TYPES))[None, :] & (box_area[None, :] > box_area[:, None])
+    parent_area = np.where(inside, box_area[None, :], np.inf)
+    parents = np.where(inside.any(axis=1), parent_area.argmin(axis=1), -1)
+
+    order = np.lexsort((x0, y0))
+    ids = {int(index): f"el-{rank + 1}" for rank, index in enumerate(order)}
+    return [
+        {
+            "id": ids[int(index)],
+            "type": str(types[index]),
+            "x": int(x0[index]),
+            "y": int(y0[index]),
+            "width": int(stats[index, 2]),
+            "height": int(stats[index, 3]),
+            "parent": ids.get(int(parents[index])),
+        }
+        for index in order
+    ]
+
+def elements_to_svg(elements: List[dict], width: int, height: int) -> str:
+    """
+    Box-based wireframe SVG of detected elements.
+
+    Containers are drawn before what they hold, text becomes placeholder bars and
+    images a crossed box, so the result reads as a wireframe rather than a tracing.
+    """
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {width} {height}" width="{width}" height="{height}">',
+        f"<style>{WIREFRAME_STYLE}</style>",
+        f'<rect class="page" width="{width}" height="{height}"/>',
+    ]
+    for element in sorted(elements, key=lambda element: -element["width"] * element["height"]):
+        kind, x, y, w, h = element["type"], element["x"], element["y"], element["width"], element["height"]
+        if kind == "text":
+            bar = max(2, h // 2)
+            parts.append(f'<rect class="text" x="{x}" y="{y + (h - bar) // 2}" width="{w}" height="{bar}" rx="{min(bar // 2, 3)}"/>')
+        elif kind == "image":
+            parts.append(f'<rect class="image" x="{x}" y="{y}" width="{w}" height="{h}"/>')
+            parts.append(f'<path class="image-cross" d="M{x} {y}l{w} {h}m0-{h}l-{w} {h}"/>')
+        else:
+            radius = {"button": 6, "input": 3, "card": 4, "icon": 4}.get(kind, 0)
+            corner = f' rx="{radius}"' if radius else ""
+            parts.append(f'<rect class="{kind}" id="{element["id"]}" x="{x}" y="{y}" width="{w}" height="{h}"{corner}/>')
+    parts.append("</svg>")
+    return "".join(parts)
+
+def detect_ui_elements(content: bytes) -> List[dict]:
+    """
+    Detect UI elements in uploaded image bytes.
+
+    Args:
+        content: Encoded image (PNG, JPEG, ...)
+
+    Returns:
+        Detected elements, in coordinates of the image downscaled to at most 800px
+    """
+    return detect_elements(load_image(content))
+
+def analyze_image(content: Union[bytes, Image.Image], detect: bool = True) -> Tuple[str, Optional[List[dict]]]:
+    """
+    Box-based wireframe SVG and detected elements of an encoded image, decoding it once.
+
+    CPU-bound: the API runs it in the image conversion process pool.
+
+    Args:
+        content: Encoded image (PNG, JPEG, ...), or an already decoded image
+        detect: Also return the element list
+
+    Returns:
+        The SVG and the elements, or None when detect is False
+    """
+    img = load_image(content)
+    elements = detect_elements(img)
+    return elements_to_svg(elements, *img.size), (elements if detect else None)
+
+def detect_layout(content: Union[bytes, Image.Image]) -> Dict[str, Any]:
+    """
+    Detected UI elements of an encoded image together with the size they were measured at.
+
+    CPU-bound: the API runs it in the image conversion process pool.
+
+    Args:
+        content: Encoded image (PNG, JPEG, ...), or an already decoded image
+
+    Returns:
+        Dict with the image `width`, `height` and its `elements`
+    """
+    img = load_image(content)
+    return {"width": img.size[0], "height": img.size[1], "elements": detect_elements(img)}
+
+def process_image_to_wireframe(content: bytes) -> str:
+    """
+    Convert uploaded image bytes to a box-based wireframe SVG.
+
+    Args:
+        content: Encoded image (PNG, JPEG, ...)
+
+    Returns:
+        SVG with one shape per detected element
+    """
+    img = load_image(content)
+    return elements_to_svg(detect_elements(img), *img.size)
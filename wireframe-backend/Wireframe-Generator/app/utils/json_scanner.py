@@ -0,0 +1,482 @@
+import json
+import re
+from typing import Any, List, Optional, Tuple
+
+
+FENCE_RE = re.compile(r"```(?:json|JSON)?[ \t]*\n?")
+# strings (possibly unterminated at the end of the text) and brackets; everything else is skipped
+STRUCTURE_RE = re.compile(r'"(?:[^"\\]|\\.)*(?:"|\Z)|[{}\[\]]', re.S)
+STRING_BODY_RE = re.compile(r'(?:[^"\\]|\\.)*', re.S)
+WHITESPACE_RE = re.compile(r"\s*")
+BARE_RE = re.compile(r'[^\s"{}\[\],:]+')
+COMMENT_RE = re.compile(r"//[^\n]*|/\*.*?(?:\*/|\Z)", re.S)
+NUMBER_RE = re.compile(r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][-+]?\d+)?$")
+# a backslash starting an invalid escape, after any escaped backslashes (group 1) before it
+INVALID_ESCAPE_RE = re.compile(r'(?<!\\)((?:\\\\)*)\\(?=u(?![0-9a-fA-F]{4})|[^"\\/bfnrtu]|\Z)', re.S)
+SINGLE_QUOTED_RE = re.compile(r"'((?:[^'\\]|\\.)*)'", re.S)
+SINGLE_QUOTED_ESCAPE_RE = re.compile(r'\\(.)|"', re.S)
+CONTROL_CHARS = {"\n": "\\n", "\r": "\\r", "\t": "\\t"}
+BARE_LITERALS = {"true": "true", "false": "false", "null": "null", "True": "true", "False": "false", "None": "null",
+                 "NaN": "null", "Infinity": "null", "-Infinity": "null", "undefined": "null"}
+CLOSERS = {"{": "}", "[": "]"}
+DECODER = json.JSONDecoder()
+# failed decodes of containers holding known damage may cover the text this many times over
+DECODE_RETRY_PASSES = 4
+# complete strings in one match; a lone quote opens a string that continues in the next chunk
+DOCUMENT_TOKEN_RE = re.compile(r'"(?:[^"\\]|\\.)*"|[{}\[\]":,]', re.S)
+ELEMENT_SKIP_RE = re.compile(r'(?:[^"{}\[\]]+|"(?:[^"\\]|\\.)*")*', re.S)
+
+
+def find_json_start(text: str) -> int:
+    """
+    Index of the first `{` or `[` of the JSON document in a model response, or -1.
+
+    A fenced ```json block wins over bare JSON elsewhere in the text.
+    """
+    fence = FENCE_RE.search(text)
+    if fence:
+        start = _first_bracket(text, fence.end())
+        if start != -1:
+            return start
+    return _first_bracket(text, 0)
+
+
+def _first_bracket(text: str, position: int) -> int:
+    brace, bracket = text.find("{", position), text.find("[", position)
+    if brace == -1 or bracket == -1:
+        return max(brace, bracket)
+    return min(brace, bracket)
+
+
+def scan_json_end(text: str, start: int) -> Tuple[int, bool]:
+    """
+    Find where the JSON value starting at `start` ends, in one linear pass.
+
+    Brackets inside strings are ignored and escapes are honored.
+
+    Returns:
+        End index (exclusive) and whether the value was complete; an unbalanced
+        value ends at the end of the text
+    """
+    depth = 0
+    for match in STRUCTURE_RE.finditer(text, start):
+        char = match.group(0)[0]
+        if char in "{[":
+            depth += 1
+        elif char in "}]":
+            depth -= 1
+            if depth <= 0:
+                return match.end(), True
+    return len(text), False
+
+
+def extract_json(text: str) -> str:
+    """The JSON document of a model response, possibly truncated, or the text itself if there is none."""
+    start = find_json_start(text)
+    if start == -1:
+        return text
+    try:
+        # well-formed JSON: the C decoder finds the end fastest
+        end = DECODER.raw_decode(text, start)[1]
+    except ValueError:
+        end, _ = scan_json_end(text, start)
+    return text[start:end]
+
+
+def _fix_string(token: str) -> str:
+    """Make a scanned string token valid JSON: escape control characters and the backslash of invalid escapes."""
+    body = token[1:-1]
+    if "\\" in body:
+        # "\d+" is meant literally: keep the backslash rather than the escape
+        body = INVALID_ESCAPE_RE.sub(r"\1\\\\", body)
+    if any(char in body for char in CONTROL_CHARS):
+        body = "".join(CONTROL_CHARS.get(char, char) for char in body)
+    return f'"{body}"'
+
+
+def _double_quoted(body: str) -> str:
+    """Turn the body of a single-quoted string into a double-quoted string token."""
+    return '"' + SINGLE_QUOTED_ESCAPE_RE.sub(
+        lambda match: '\\"' if match.group(1) is None else ("'" if match.group(1) == "'" else match.group(0)), body
+    ) + '"'
+
+
+class _Repairer:
+    """
+    Token-level repair of almost-JSON in one left-to-right pass.
+
+    Containers that are already valid are copied after one C-level decode. A
+    failed decode marks the damage; containers opened before it mostly hold the
+    same damage, so they are only retried within a budget of a few passes over
+    the text, which keeps the pass linear however deep the damage is nested.
+
+    The Python walk tracks what each open container expects next, so punctuation
+    is only added or removed outside strings: missing commas are inserted,
+    trailing and doubled commas dropped, bare and single-quoted keys and Python
+    literals normalized, stray quotes inside strings escaped, a closer of the
+    wrong kind taken to close the innermost container, and truncated output
+    closed after dropping a dangling member.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.out: List[str] = []
+        # frame: [opener, expecting, index in out where the current member starts]
+        self.stack: List[list] = []
+        self.done = False
+        # where the last failed decode stopped, and how much text retries before it may still decode
+        self.damage = -1
+        self.retry_budget = DECODE_RETRY_PASSES * len(text)
+
+    def scan_string(self, position: int) -> Tuple[str, int, bool]:
+        """String starting at `position`; quotes not followed by a delimiter are treated as content."""
+        text = self.text
+        parts = []
+        cursor = position + 1
+        while True:
+            body_end = STRING_BODY_RE.match(text, cursor).end()
+            parts.append(text[cursor:body_end])
+            if body_end >= len(text):
+                return '"' + "".join(parts) + '"', len(text), False
+            after = WHITESPACE_RE.match(text, body_end + 1).end()
+            if after >= len(text) or text[after] in ',:}]"' or (text[after] in "{[" and self.expecting() == "comma"):
+                return '"' + "".join(parts) + '"', body_end + 1, True
+            # an unescaped quote inside the value
+            parts.append('\\"')
+            cursor = body_end + 1
+
+    def expecting(self) -> Optional[str]:
+        return self.stack[-1][1] if self.stack else None
+
+    def begin_value(self) -> bool:
+        """Prepare to emit a value; returns False when no value fits here."""
+        if not self.stack:
+            return not self.out
+        frame = self.stack[-1]
+        if frame[1] == "comma":
+            # missing comma between two members
+            self.out.append(",")
+            frame[2] = len(self.out) - 1
+            frame[1] = "key" if frame[0] == "{" else "value"
+        if frame[0] == "{" and frame[1] == "key":
+            return False
+        return frame[1] == "value"
+
+    def end_value(self) -> None:
+        if self.stack:
+            self.stack[-1][1] = "comma"
+        else:
+            self.done = True
+
+    def emit_key(self, key: str) -> None:
+        frame = self.stack[-1]
+        if frame[1] == "comma":
+            self.out.append(",")
+            frame[2] = len(self.out) - 1
+        elif frame[1] != "key":
+            return
+        elif self.out[-1] != ",":
+            frame[2] = len(self.out)
+        self.out.append(key)
+        frame[1] = "colon"
+
+    def drop_dangling(self, frame: list) -> None:
+        """Remove a member that never got its value, or a trailing comma."""
+        if frame[0] == "{" and frame[1] in ("colon", "value") and frame[2] is not None:
+            del self.out[frame[2]:]
+        elif self.out and self.out[-1] == ",":
+            self.out.pop()
+
+    def close(self) -> None:
+        """Close the innermost container; a closer of the other kind still closes it, e.g. `[1, 2}`."""
+        if not self.stack:
+            return  # stray closer
+        frame = self.stack.pop()
+        self.drop_dangling(frame)
+        self.out.append(CLOSERS[frame[0]])
+        self.end_value()
+
+    def run(self, start: int) -> str:
+        text, position, length = self.text, start, len(self.text)
+        while position < length and not self.done:
+            char = text[position]
+            if char.isspace():
+                position = WHITESPACE_RE.match(text, position).end()
+            elif char in "{[":
+                if self.stack and self.stack[-1][0] == "{" and self.expecting() in ("key", "colon"):
+                    # object as a key: give up on this member
+                    position += 1
+                    continue
+                if not self.begin_value():
+                    position += 1
+                    continue
+                end = None
+                retry = position < self.damage
+                if not retry or self.retry_budget > 0:
+                    try:
+                        # containers that are already valid are copied as they are; only damaged ones are walked
+                        end = DECODER.raw_decode(text, position)[1]
+                    except json.JSONDecodeError as e:
+                        if retry:
+                            self.retry_budget -= e.pos - position
+                        self.damage = max(self.damage, e.pos)
+                if end is None:
+                    self.out.append(char)
+                    self.stack.append([char, "key" if char == "{" else "value", None])
+                    position += 1
+                else:
+                    self.out.append(text[position:end])
+                    self.end_value()
+                    position = end
+            elif char in "}]":
+                self.close()
+                position += 1
+            elif char == ",":
+                frame = self.stack[-1] if self.stack else None
+                if frame and frame[1] == "comma":
+                    self.out.append(",")
+                    frame[1] = "key" if frame[0] == "{" else "value"
+                    frame[2] = len(self.out) - 1
+                position += 1
+            elif char == ":":
+                frame = self.stack[-1] if self.stack else None
+                if frame and frame[0] == "{" and frame[1] == "colon":
+                    self.out.append(":")
+                    frame[1] = "value"
+                position += 1
+            elif char == '"':
+                token, position, _ = self.scan_string(position)
+                self.emit_token(_fix_string(token), is_string=True)
+            elif char == "'" and (quoted := self.single_quoted(position)):
+                position = quoted.end()
+                self.emit_token(_fix_string(_double_quoted(quoted.group(1))), is_string=True)
+            elif char == "/" and COMMENT_RE.match(text, position):
+                position = COMMENT_RE.match(text, position).end()
+            else:
+                match = BARE_RE.match(text, position)
+                word = match.group(0)
+                position = match.end()
+                at_end = WHITESPACE_RE.match(text, position).end() >= length
+                if word in BARE_LITERALS:
+                    self.emit_token(BARE_LITERALS[word], is_string=False, bare=word)
+                elif NUMBER_RE.match(word):
+                    self.emit_token(word, is_string=False, bare=word)
+                elif at_end and self.stack:
+                    continue  # truncated literal, the member is dropped below
+                else:
+                    self.emit_token(json.dumps(word), is_string=True, bare=word)
+
+        while self.stack:
+            self.close()
+        return "".join(self.out)
+
+    def single_quoted(self, position: int) -> Optional[re.Match]:
+        """The single-quoted string starting at `position`, or None for a word with an apostrophe."""
+        match = SINGLE_QUOTED_RE.match(self.text, position)
+        if match is None:
+            return None
+        after = WHITESPACE_RE.match(self.text, match.end()).end()
+        return match if after >= len(self.text) or self.text[after] in ",:}]" else None
+
+    def emit_token(self, token: str, is_string: bool, bare: Optional[str] = None) -> None:
+        frame = self.stack[-1] if self.stack else None
+        if frame and frame[0] == "{" and frame[1] in ("key", "comma"):
+            # member name; bare words are quoted
+            self.emit_key(token if is_string and bare is None else json.dumps(bare if bare is not None else token))
+            return
+        if frame and frame[0] == "{" and frame[1] == "colon":
+            # key followed by a value without a colon
+            self.out.append(":")
+            frame[1] = "value"
+        if self.begin_value():
+            self.out.append(token)
+            self.end_value()
+
+
+def repair_json(text: str) -> str:
+    """
+    Rewrite almost-JSON into valid JSON in a single pass.
+
+    Args:
+        text: JSON document, possibly with trailing commas, bare keys, stray quotes,
+              comments or truncated at any point
+
+    Returns:
+        Repaired JSON text
+    """
+    start = _first_bracket(text, 0)
+    if start == -1:
+        return text
+    return _Repairer(text).run(start)
+
+
+def parse_json(text: str) -> Any:
+    """
+    Parse JSON, repairing it in one linear pass when the strict parser fails.
+
+    Raises:
+        ValueError: If the text cannot be parsed even after repair
+    """
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError as e:
+        try:
+            return json.loads(repair_json(text))
+        except json.JSONDecodeError:
+            raise ValueError(f"Failed to parse JSON: {str(e)}")
+
+
+class IncrementalJsonParser:
+    """
+    Parse a JSON document while it streams in.
+
+    Each chunk is scanned once with the string and escape state carried over, so
+    brackets inside strings never count. Elements of the array at `watch` (a path
+    of object keys, e.g. ("screens",)) are returned by `feed` as soon as they are
+    complete, while the rest of the document is still being generated. Only object
+    and array elements are reported early.
+
+    Like extract_json, a ```json fence wins over brackets in the prose before it: the
+    text is buffered until a document start is found, and a bracketed value that
+    closes without reporting anything (e.g. "Here [is] the plan:") is skipped.
+    """
+
+    def __init__(self, watch: Tuple[str, ...] = ()):
+        self.watch = tuple(watch)
+        self.chunks: List[str] = []
+        # text seen before the document starts, kept until a start is found
+        self.pending = ""
+        self.started = False
+        self.done = False
+        self.in_string = False
+        self.escape = False
+        # frame: [opener, current key, expecting a key]
+        self.stack: List[list] = []
+        self.key_parts: Optional[List[str]] = None
+        self.capture: Optional[List[str]] = None
+        self.capture_depth = 0
+        self.emitted = 0
+
+    def path(self) -> Tuple[str, ...]:
+        return tuple(frame[1] for frame in self.stack if frame[0] == "{")
+
+    def watching(self) -> bool:
+        return bool(self.stack) and self.stack[-1][0] == "[" and self.path() == self.watch
+
+    def feed(self, chunk: str) -> List[Any]:
+        """
+        Consume the next piece of the document.
+
+        Args:
+            chunk: Any slice of the streamed text, including leading prose or fences
+
+        Returns:
+            Watched array elements completed by this chunk, parsed
+        """
+        self.chunks.append(chunk)
+        completed: List[Any] = []
+        while chunk and not self.done:
+            if not self.started:
+                self.pending += chunk
+                start = find_json_start(self.pending)
+                if start == -1:
+                    break
+                chunk, self.pending = self.pending[start:], ""
+                self.started = True
+            chunk = self._scan(chunk, completed)
+        return completed
+
+    def _scan(self, chunk: str, completed: List[Any]) -> str:
+        """Scan a chunk of the started document; returns the text left over after a skipped value."""
+        position = 0
+        capture_from = 0 if self.capture is not None else None
+        length = len(chunk)
+        while position < length:
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                    position += 1
+                    continue
+                end = STRING_BODY_RE.match(chunk, position).end()
+                if self.key_parts is not None:
+                    self.key_parts.append(chunk[position:end])
+                if end < length and chunk[end] == "\\":
+                    self.escape = True
+                    position = end + 1
+                    continue
+                if end >= length:
+                    break  # the string continues in the next chunk
+                self.in_string = False
+                if self.key_parts is not None:
+                    self.stack[-1][1] = json.loads('"' + "".join(self.key_parts) + '"') if self.key_parts else ""
+                    self.key_parts = None
+                position = end + 1
+                continue
+
+            if self.capture is not None:
+                # inside a captured element only brackets count: skip everything else, strings included
+                position = ELEMENT_SKIP_RE.match(chunk, position).end()
+                if position >= length:
+                    break
+                char = chunk[position]
+                position += 1
+                if char == '"':
+                    self.in_string = True  # the string continues past this chunk
+                    continue
+            else:
+                match = DOCUMENT_TOKEN_RE.search(chunk, position)
+                if match is None:
+                    break
+                token = match.group(0)
+                char = token[0]
+                position = match.end()
+            if char == '"':
+                frame = self.stack[-1] if self.stack else None
+                is_key = frame is not None and frame[0] == "{" and frame[2]
+                if len(token) > 1:
+                    if is_key:
+                        frame[1] = parse_json(token)
+                else:
+                    self.in_string = True
+                    if is_key:
+                        self.key_parts = []
+            elif char == ":":
+                if self.stack and self.stack[-1][0] == "{":
+                    self.stack[-1][2] = False
+            elif char == ",":
+                if self.stack and self.stack[-1][0] == "{":
+                    self.stack[-1][2] = True
+            elif char in "{[":
+                if self.capture is None and self.watching():
+                    self.capture = []
+                    self.capture_depth = len(self.stack) + 1
+                    capture_from = position - 1
+                self.stack.append([char, None, char == "{"])
+            else:
+                if self.stack:
+                    self.stack.pop()
+                if self.capture is not None and len(self.stack) < self.capture_depth:
+                    self.capture.append(chunk[capture_from:position])
+                    completed.append(parse_json("".join(self.capture)))
+                    self.capture = None
+                    capture_from = None
+                    self.emitted += 1
+                if not self.stack:
+                    if self.emitted:
+                        self.done = True
+                        return ""
+                    # a bracketed aside in the prose, not the document: look for the start again
+                    self.started = False
+                    return chunk[position:]
+
+        if self.capture is not None and capture_from is not None:
+            self.capture.append(chunk[capture_from:])
+        return ""
+
+    def text(self) -> str:
+        return "".join(self.chunks)
+
+    def close(self) -> Any:
+        """Parse the whole document, repairing it if the stream was cut off."""
+        return parse_json(extract_json(self.text()))
+
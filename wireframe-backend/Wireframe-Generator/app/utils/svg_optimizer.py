@@ -0,0 +1,259 @@
+import re
+import xml.etree.ElementTree as ET
+from typing import Any, Dict, List, Optional, Tuple
+
+
+SVG_NS = "http://www.w3.org/2000/svg"
+XLINK_NS = "http://www.w3.org/1999/xlink"
+
+ET.register_namespace("", SVG_NS)
+ET.register_namespace("xlink", XLINK_NS)
+
+# attributes whose numbers are coordinates or lengths and can be rounded
+NUMERIC_ATTRS = {
+    "x", "y", "x1", "y1", "x2", "y2", "cx", "cy", "r", "rx", "ry", "width", "height",
+    "d", "points", "transform", "viewBox", "stroke-width", "font-size", "dx", "dy",
+}
+
+# elements whose text and whitespace are rendered
+TEXT_ELEMENTS = {"text", "tspan", "textPath", "title", "desc", "style"}
+
+NUMBER_RE = re.compile(r"-?(?:\d+\.\d*|\.\d+)(?:[eE][-+]?\d+)?|-?\d+[eE][-+]?\d+")
+CSS_COMMENT_RE = re.compile(r"/\*.*?\*/", re.DOTALL)
+CSS_RULE_RE = re.compile(r"([^{}]+)\{([^{}]*)\}")
+# selectors that match an element regardless of its ancestors and with at most class specificity
+SIMPLE_SELECTOR_RE = re.compile(r"^(?:\*|[A-Za-z][\w-]*|\.[A-Za-z_][\w-]*)$")
+# selectors that still match the same elements once a group is replaced by <use> of a <symbol>
+CLASS_SELECTOR_RE = re.compile(r"^(?:\*|\.[A-Za-z_][\w-]*)$")
+
+# repeated groups smaller than this are cheaper inline than as <symbol> + <use>
+MIN_SYMBOL_BYTES = 80
+
+
+def _local_name(tag: Any) -> str:
+    return tag.rsplit("}", 1)[-1] if isinstance(tag, str) else ""
+
+
+def format_number(value: float, precision: int) -> str:
+    """Shortest decimal form of a number rounded to `precision` digits."""
+    text = f"{round(value, precision):.{precision}f}".rstrip("0").rstrip(".")
+    return "0" if text in ("-0", "") else text
+
+
+def round_numbers(value: str, precision: int) -> str:
+    """Round every fractional number in an attribute value."""
+    return NUMBER_RE.sub(lambda match: format_number(float(match.group(0)), precision), value)
+
+
+def minify_css(css: str) -> str:
+    """Strip comments and whitespace that does not change the stylesheet."""
+    css = CSS_COMMENT_RE.sub("", css)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{}:;,>])\s*", r"\1", css)
+    return css.replace(";}", "}").strip()
+
+
+def minify_declarations(style: str) -> str:
+    """Normalized inline style declarations, e.g. `fill: #ddd; stroke:#666;` -> `fill:#ddd;stroke:#666`."""
+    declarations = [part.strip() for part in style.split(";") if part.strip()]
+    return ";".join(re.sub(r"\s*:\s*", ":", declaration, count=1) for declaration in declarations)
+
+
+def dedupe_rules(css: str) -> Optional[List[Tuple[str, str]]]:
+    """
+    Split a minified stylesheet into rules, dropping earlier exact duplicates.
+
+    Keeping the last copy of a duplicate preserves the cascade order. Returns None
+    for stylesheets with at-rules, which are left as they are.
+    """
+    if "@" in css:
+        return None
+    rules = [(selector.strip(), body.strip()) for selector, body in CSS_RULE_RE.findall(css)]
+    last = {rule: index for index, rule in enumerate(rules)}
+    return [rule for index, rule in enumerate(rules) if last[rule] == index]
+
+
+class SvgOptimizer:
+    """
+    Size-reducing transforms applied to one parsed SVG tree.
+
+    All transforms preserve rendering: comments and layout whitespace are dropped,
+    fractional coordinates are rounded, <style> blocks are merged and deduplicated,
+    repeated inline styles become classes and repeated groups become a <symbol>
+    referenced by <use>. Inline styles only become classes when every stylesheet
+    selector is a plain type or class selector. Symbols additionally need class
+    selectors only, since a type selector such as `g` stops matching the replaced group.
+    """
+
+    def __init__(self, root: ET.Element, precision: int = 2):
+        self.root = root
+        self.precision = precision
+        self.ns = root.tag[:root.tag.index("}") + 1] if root.tag.startswith("{") else ""
+        self.parents = {child: parent for parent in root.iter() for child in parent}
+        self.stats = {"style_rules_removed": 0, "style_classes": 0, "symbols": 0, "symbol_uses": 0}
+
+    def tag(self, name: str) -> str:
+        return self.ns + name
+
+    def strip_whitespace_and_round(self) -> None:
+        for element in self.root.iter():
+            name = _local_name(element.tag)
+            parent = self.parents.get(element)
+            if name not in TEXT_ELEMENTS and element.text is not None and not element.text.strip():
+                element.text = None
+            if (parent is None or _local_name(parent.tag) not in TEXT_ELEMENTS) and element.tail is not None and not element.tail.strip():
+                element.tail = None
+
+            for attribute, value in element.attrib.items():
+                if attribute in NUMERIC_ATTRS:
+                    element.set(attribute, round_numbers(value, self.precision))
+                elif attribute == "style":
+                    element.set(attribute, minify_declarations(value))
+                elif attribute == "class":
+                    element.set(attribute, " ".join(dict.fromkeys(value.split())))
+
+    def merge_styles(self) -> Tuple[Optional[ET.Element], Optional[List[Tuple[str, str]]]]:
+        """Merge every <style> into one at the top of the document, in cascade order."""
+        styles = [element for element in self.root.iter(self.tag("style"))]
+        if not styles:
+            return None, []
+
+        css = "".join(minify_css(style.text or "") for style in styles)
+        for style in styles:
+            self.parents[style].remove(style)
+
+        merged = ET.Element(self.tag("style"))
+        rules = dedupe_rules(css)
+        if rules is None:
+            merged.text = css
+        else:
+            self.stats["style_rules_removed"] = len(CSS_RULE_RE.findall(css)) - len(rules)
+            merged.text = "".join(f"{selector}{{{body}}}" for selector, body in rules)
+        self.root.insert(0, merged)
+        self.parents[merged] = self.root
+        return merged, rules
+
+    def consolidate_inline_styles(self, style: Optional[ET.Element], rules: List[Tuple[str, str]]) -> None:
+        """Replace inline styles that repeat with a generated class appended to the stylesheet."""
+        elements = [element for element in self.root.iter() if element.get("style")]
+        counts: Dict[str, int] = {}
+        for element in elements:
+            counts[element.get("style")] = counts.get(element.get("style"), 0) + 1
+
+        existing_classes = {name for element in self.root.iter() for name in (element.get("class") or "").split()}
+        existing_classes.update(selector[1:] for selector, _ in rules if selector.startswith("."))
+        classes: Dict[str, str] = {}
+        for declarations, count in counts.items():
+            # worth it once the repeated attribute outweighs the new rule
+            if count < 2 or len(declarations) * (count - 1) <= 16:
+                continue
+            index = len(classes)
+            while f"s{index}" in existing_classes:
+                index += 1
+            classes[declarations] = f"s{index}"
+            existing_classes.add(f"s{index}")
+        if not classes:
+            return
+
+        for element in elements:
+            name = classes.get(element.get("style"))
+            if name:
+                del element.attrib["style"]
+                element.set("class", f"{element.get('class')} {name}" if element.get("class") else name)
+
+        if style is None:
+            style = ET.Element(self.tag("style"))
+            style.text = ""
+            self.root.insert(0, style)
+            self.parents[style] = self.root
+        # appended last, so the generated rules win ties just like the inline styles did
+        style.text = (style.text or "") + "".join(f".{name}{{{declarations}}}" for declarations, name in classes.items())
+        self.stats["style_classes"] = len(classes)
+
+    def extract_symbols(self) -> None:
+        """Move groups repeated with identical content into a <symbol> and reference it with <use>."""
+        group_tag = self.tag("g")
+
+        def key(group: ET.Element) -> Optional[str]:
+            if group.get("id") is not None or len(group) == 0:
+                return None
+            if any(element.get("id") is not None for element in group.iter() if element is not group):
+                return None
+            return "".join(ET.tostring(child, encoding="unicode") for child in group)
+
+        keys = {group: key(group) for group in self.root.iter(group_tag)}
+        counts: Dict[str, int] = {}
+        for value in keys.values():
+            if value is not None:
+                counts[value] = counts.get(value, 0) + 1
+
+        symbols: Dict[str, str] = {}
+        defs = None
+
+        def visit(element: ET.Element) -> None:
+            nonlocal defs
+            for index, child in enumerate(list(element)):
+                content = keys.get(child)
+                if content is None or counts.get(content, 0) < 2 or len(content) < MIN_SYMBOL_BYTES:
+                    visit(child)
+                    continue
+
+                symbol_id = symbols.get(content)
+                if symbol_id is None:
+                    symbol_id = f"sym{len(symbols)}"
+                    while self.root.find(f".//*[@id='{symbol_id}']") is not None:
+                        symbol_id += "_"
+                    symbols[content] = symbol_id
+                    if defs is None:
+                        defs = ET.Element(self.tag("defs"))
+                        self.root.insert(0, defs)
+                    # visible overflow keeps the symbol viewport from clipping the original geometry
+                    symbol = ET.SubElement(defs, self.tag("symbol"), {"id": symbol_id, "overflow": "visible"})
+                    symbol.extend(list(child))
+
+                # xlink:href as well, for SVG 1.1 renderers that do not read plain href
+                use = ET.Element(self.tag("use"), {**child.attrib, "href": f"#{symbol_id}", f"{{{XLINK_NS}}}href": f"#{symbol_id}"})
+                use.tail = child.tail
+                element.remove(child)
+                element.insert(index, use)
+                self.stats["symbol_uses"] += 1
+
+        visit(self.root)
+        self.stats["symbols"] = len(symbols)
+
+    def run(self) -> str:
+        self.strip_whitespace_and_round()
+        style, rules = self.merge_styles()
+        selectors = [part.strip() for selector, _ in rules or [] for part in selector.split(",")]
+        if rules is not None and all(SIMPLE_SELECTOR_RE.match(selector) for selector in selectors):
+            self.consolidate_inline_styles(style, rules)
+            if all(CLASS_SELECTOR_RE.match(selector) for selector in selectors):
+                self.extract_symbols()
+        # markup characters inside text and attributes are escaped, so this only touches tags
+        return ET.tostring(self.root, encoding="unicode").replace(" />", "/>")
+
+
+def optimize_svg(svg_code: str, precision: int = 2) -> Tuple[str, Dict[str, Any]]:
+    """
+    Shrink an SVG without changing how it renders.
+
+    Args:
+        svg_code: Cleaned SVG markup
+        precision: Decimal digits kept in coordinates and lengths
+
+    Returns:
+        The optimized SVG (the input unchanged if it cannot be parsed) and a report
+        with the byte sizes before and after plus the applied transforms
+    """
+    bytes_before = len(svg_code.encode("utf-8"))
+    try:
+        root = ET.fromstring(svg_code)
+    except ET.ParseError as e:
+        return svg_code, {"bytes_before": bytes_before, "bytes_after": bytes_before, "error": f"Not optimized: {e}"}
+
+    optimizer = SvgOptimizer(root, precision=precision)
+    optimized = optimizer.run()
+    bytes_after = len(optimized.encode("utf-8"))
+    if bytes_after >= bytes_before:
+        return svg_code, {"bytes_before": bytes_before, "bytes_after": bytes_before, **optimizer.stats}
+    return optimized, {"bytes_before": bytes_before, "bytes_after": bytes_after, **optimizer.stats}
@@ -0,0 +1,526 @@
+import re
+import xml.etree.ElementTree as ET
+from html.entities import html5
+from xml.parsers import expat
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+
+SVG_NS = "http://www.w3.org/2000/svg"
+XLINK_NS = "http://www.w3.org/1999/xlink"
+
+# shapes never have rendered children; a new start tag while one is open means it was left unclosed
+LEAF_ELEMENTS = {"rect", "circle", "ellipse", "line", "polyline", "polygon", "path", "image", "use"}
+LEAF_CHILDREN = {"title", "desc", "animate", "animateTransform", "animateMotion", "set"}
+
+NAME_RE = re.compile(r"[A-Za-z_][\w:.-]*")
+ATTRIBUTE_RE = re.compile(r"""([^\s=/>"']+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+)))?""")
+TAG_BODY_RE = re.compile(r"""(?:[^<>"']+|"[^"]*"|'[^']*')*""")
+# start tags that need no repair: every value double-quoted, no `<` or `&` in values
+CLEAN_TAG_RE = re.compile(r"""<[A-Za-z_][\w:.-]*(?:\s+[^\s=/>"']+="[^"<&]*")*\s*/?>""")
+CLEAN_ATTRIBUTE_NAME_RE = re.compile(r"""\s([^\s=/>"']+)=(?=")""")
+ENTITY_RE = re.compile(r"&(?:#\d+|#x[0-9A-Fa-f]+|[A-Za-z][\w.-]*);")
+DIMENSION_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*(?:px)?\s*$")
+# the only named entities XML defines without a DTD; HTML ones such as &nbsp; are undefined
+XML_ENTITIES = {"amp", "lt", "gt", "quot", "apos"}
+HTML_ENTITY_RE = re.compile(r"&([A-Za-z][\w.-]*);")
+
+# prefixes models copy from editor exports without declaring them
+KNOWN_NAMESPACES = {
+    "xlink": XLINK_NS,
+    "inkscape": "http://www.inkscape.org/namespaces/inkscape",
+    "sodipodi": "http://sodipodi.sourceforge.net/DTD/sodipodi-0.dtd",
+    "sketch": "http://www.bohemiancoding.com/sketch/ns",
+    "rdf": "http://www.w3.org/1999/02/22-rdf-syntax-ns#",
+    "dc": "http://purl.org/dc/elements/1.1/",
+    "cc": "http://creativecommons.org/ns#",
+}
+
+
+class SvgDiagnostic(BaseModel):
+    """ One problem found (and, when possible, repaired) while validating an SVG """
+    level: str  # "error", "warning" or "info"
+    code: str
+    message: str
+    line: int
+    column: int
+    repaired: bool = False
+
+
+class SvgValidationResult(BaseModel):
+    """ Repaired SVG and the diagnostics collected on the way """
+    svg_code: str
+    valid: bool
+    repaired: bool
+    diagnostics: List[SvgDiagnostic]
+
+
+def numeric_entity(name: str) -> Optional[str]:
+    """Numeric character reference for an HTML named entity, None if HTML does not define it."""
+    characters = html5.get(f"{name};")
+    if characters is None:
+        return None
+    return "".join(f"&#{ord(character)};" for character in characters)
+
+
+def escape_text(text: str) -> str:
+    """Escape ampersands that do not start an entity reference, and spell HTML entities numerically."""
+    if "&" not in text:
+        return text
+    parts = []
+    position = 0
+    for match in re.finditer("&", text):
+        start = match.start()
+        parts.append(text[position:start])
+        entity = ENTITY_RE.match(text, start)
+        if entity is None:
+            parts.append("&amp;")
+            position = start + 1
+            continue
+        name = entity.group(0)[1:-1]
+        if name[0] == "#" or name in XML_ENTITIES:
+            parts.append(entity.group(0))
+        else:
+            parts.append(numeric_entity(name) or f"&amp;{name};")
+        position = entity.end()
+    parts.append(text[position:])
+    return "".join(parts)
+
+
+def html_entities(text: str) -> List[str]:
+    """Named entity references in text that XML does not define."""
+    if "&" not in text:
+        return []
+    return [name for name in HTML_ENTITY_RE.findall(text) if name not in XML_ENTITIES]
+
+
+def namespace_prefix(name: str) -> Optional[str]:
+    """Prefix of a qualified element or attribute name that needs a declaration in scope."""
+    prefix, colon, _ = name.partition(":")
+    if not colon or prefix in ("xml", "xmlns"):
+        return None
+    return prefix
+
+
+def escape_attribute(value: str) -> str:
+    return escape_text(value).replace("<", "&lt;").replace('"', "&quot;")
+
+
+class SvgStreamValidator:
+    """
+    Incremental validator and repairer for SVG markup.
+
+    A pull parser over the text: `feed` accepts chunks as they arrive (for example
+    from a streamed model response) and returns the repaired markup that is final
+    so far, `close` flushes the rest. Every character is looked at once, apart from
+    the few bytes of an incomplete token that wait for the next chunk.
+
+    Repairs, each reported as a diagnostic:
+        - text and elements before the <svg> root or after it ends are dropped
+        - missing xmlns / viewBox on the root <svg> (only the root) are added
+        - unclosed shapes and unclosed elements are closed where they must end
+        - stray closing tags are dropped
+        - duplicate attributes, unquoted values, bare `&` and `<` are normalized
+        - HTML named entities such as &nbsp; are spelled as numeric references
+        - namespace prefixes used without a declaration are declared where used
+        - a truncated document is closed at the end of the stream
+
+    The repaired output is run through expat as it is produced; markup that is
+    still not well-formed is reported as an error.
+    """
+
+    def __init__(self, default_size: Tuple[int, int] = (1200, 800)):
+        self.default_size = default_size
+        self.buffer = ""
+        self.position = 0
+        self.stack: List[str] = []
+        # namespace prefixes declared by each open element, and how many open elements declare each
+        self.scopes: List[Tuple[str, ...]] = []
+        self.declared: Dict[str, int] = {}
+        self.diagnostics: List[SvgDiagnostic] = []
+        self.line = 1
+        self.column = 1
+        self.root_seen = False
+        self.root_closed = False
+        self.dropped_outside = False
+        self.closed = False
+        self.checker = expat.ParserCreate(namespace_separator=" ")
+
+    # diagnostics
+
+    def report(self, level: str, code: str, message: str, repaired: bool = True,
+               position: Optional[Tuple[int, int]] = None) -> None:
+        line, column = position or (self.line, self.column)
+        self.diagnostics.append(SvgDiagnostic(
+            level=level, code=code, message=message, line=line, column=column, repaired=repaired
+        ))
+
+    def report_entities(self, text: str, where: str) -> None:
+        names = html_entities(text)
+        if names:
+            self.report("warning", "html_entity", f"Rewrote entities {', '.join(sorted(set(names)))} in {where}, which XML does not define")
+
+    def check(self, output: str, final: bool = False) -> None:
+        """Feed repaired output to expat; the first error it finds is reported, then checking stops."""
+        if self.checker is None:
+            return
+        try:
+            self.checker.Parse(output, final)
+        except expat.ExpatError as error:
+            self.report(
+                "error", "not_well_formed", f"Repaired SVG is not well-formed XML: {expat.ErrorString(error.code)}",
+                repaired=False, position=(error.lineno, error.offset + 1),
+            )
+            self.checker = None
+
+    def advance(self, consumed: str) -> None:
+        newlines = consumed.count("\n")
+        if newlines:
+            self.line += newlines
+            self.column = len(consumed) - consumed.rfind("\n")
+        else:
+            self.column += len(consumed)
+
+    # tokenizing
+
+    def find_tag_end(self, start: int) -> int:
+        """Index of the `>` closing the tag at `start`, ignoring quoted `>`; -1 if not there yet."""
+        text = self.buffer
+        end = TAG_BODY_RE.match(text, start + 1).end()
+        if end < len(text):
+            char = text[end]
+            if char == ">":
+                return end
+            if char == "<":
+                # a new tag starts before this one ended; treat the tag as ending here
+                return end - 1
+            # unbalanced quote: fall back to the next `>`
+            close = text.find(">", end)
+            if close != -1:
+                return close
+        return -1
+
+    def next_token(self, final: bool) -> Optional[Tuple[str, int]]:
+        """Next complete token (kind, end index) at the read position, or None if more input is needed."""
+        text, start = self.buffer, self.position
+        if start >= len(text):
+            return None
+
+        if text[start] != "<":
+            end = text.find("<", start)
+            if end == -1:
+                end = len(text)
+                if not final:
+                    # hold back a trailing entity that may continue in the next chunk
+                    ampersand = text.rfind("&", start)
+                    if ampersand != -1 and ";" not in text[ampersand:] and len(text) - ampersand < 12:
+                        end = ampersand
+                if end == start:
+                    return None
+            return "text", end
+
+        for opener, closer, kind in (("<!--", "-->", "comment"), ("<![CDATA[", "]]>", "cdata"), ("<?", "?>", "pi")):
+            if text.startswith(opener, start):
+                end = text.find(closer, start + len(opener))
+                if end == -1:
+                    return ("truncated", len(text)) if final else None
+                return kind, end + len(closer)
+            if len(text) - start < len(opener) and opener.startswith(text[start:]) and not final:
+                return None
+
+        if text.startswith("<!", start):
+            # DOCTYPE, possibly with an internal subset in brackets
+            depth = 0
+            for index in range(start, len(text)):
+                char = text[index]
+                if char == "[":
+                    depth += 1
+                elif char == "]":
+                    depth -= 1
+                elif char == ">" and depth <= 0:
+                    return "doctype", index + 1
+            return ("truncated", len(text)) if final else None
+
+        if len(text) - start == 1:
+            return ("lt", start + 1) if final else None
+        if not (text[start + 1].isalpha() or text[start + 1] in "_/"):
+            # `<` that starts no tag, such as "a < b" in a label
+            return "lt", start + 1
+
+        end = self.find_tag_end(start)
+        if end == -1:
+            return ("truncated", len(text)) if final else None
+        return "tag", end + 1
+
+    # repairing
+
+    def parse_attributes(self, raw: str, name: str) -> Dict[str, str]:
+        attributes: Dict[str, str] = {}
+        for match in ATTRIBUTE_RE.finditer(raw):
+            key = match.group(1)
+            double, single, bare = match.group(2), match.group(3), match.group(4)
+            if double is None and single is None and bare is None:
+                self.report("warning", "attribute_without_value", f"Attribute {key} on <{name}> has no value and was dropped")
+                continue
+            if bare is not None:
+                self.report("warning", "unquoted_attribute", f"Quoted the value of {key} on <{name}>")
+            if key in attributes:
+                self.report("warning", "duplicate_attribute", f"Dropped duplicate attribute {key} on <{name}>")
+                continue
+            attributes[key] = double if double is not None else single if single is not None else bare
+        return attributes
+
+    def repair_root(self, attributes: Dict[str, str]) -> Dict[str, str]:
+        if "xmlns" not in attributes:
+            attributes = {"xmlns": SVG_NS, **attributes}
+            self.report("info", "missing_xmlns", "Added the SVG namespace to the root element")
+        # xlink:href further down would otherwise make the document unparseable
+        attributes.setdefault("xmlns:xlink", XLINK_NS)
+        if "viewBox" not in attributes:
+            width = DIMENSION_RE.match(attributes.get("width", ""))
+            height = DIMENSION_RE.match(attributes.get("height", ""))
+            size = (width.group(1), height.group(1)) if width and height else tuple(str(value) for value in self.default_size)
+            attributes["viewBox"] = f"0 0 {size[0]} {size[1]}"
+            self.report("info", "missing_viewbox", f"Added viewBox=\"{attributes['viewBox']}\" to the root element")
+        return attributes
+
+    def open_element(self, name: str, prefixes: Tuple[str, ...]) -> None:
+        self.stack.append(name)
+        self.scopes.append(prefixes)
+        for prefix in prefixes:
+            self.declared[prefix] = self.declared.get(prefix, 0) + 1
+
+    def undeclared(self, names: Iterable[str], declared_here: Iterable[str]) -> List[str]:
+        """Prefixes used by names that neither an open element nor the tag itself declares."""
+        missing = []
+        for name in names:
+            prefix = namespace_prefix(name)
+            if prefix and not self.declared.get(prefix) and prefix not in declared_here and prefix not in missing:
+                missing.append(prefix)
+        return missing
+
+    def close_to(self, depth: int) -> str:
+        closing = []
+        while len(self.stack) > depth:
+            closing.append(f"</{self.stack.pop()}>")
+            for prefix in self.scopes.pop():
+                self.declared[prefix] -= 1
+        if not self.stack and self.root_seen:
+            self.root_closed = True
+        return "".join(closing)
+
+    def drop_outside(self, what: str) -> None:
+        if not self.dropped_outside:
+            place = "after the end of" if self.root_closed else "before"
+            self.report("warning", "content_outside_root", f"Dropped {what} {place} the <svg> root element")
+            self.dropped_outside = True
+
+    def handle_tag(self, token: str) -> str:
+        body = token[1:-1] if token.endswith(">") else token[1:]
+        closing = body.lstrip().startswith("/")
+        body = body.lstrip().lstrip("/").lstrip()
+        self_closing = body.rstrip().endswith("/")
+        if self_closing:
+            body = body.rstrip()[:-1]
+
+        match = NAME_RE.match(body)
+        if not match:
+            self.report("warning", "invalid_tag", f"Dropped malformed tag {token[:40]!r}")
+            return ""
+        name = match.group(0)
+        local = name.rsplit(":", 1)[-1]
+
+        if not token.endswith(">"):
+            self.report("warning", "unterminated_tag", f"Closed the unterminated <{name}> tag")
+
+        if self.root_closed or (not self.stack and not (local == "svg" and not closing)):
+            self.drop_outside(f"<{'/' if closing else ''}{name}>")
+            return ""
+
+        if closing:
+            if name not in self.stack:
+                self.report("warning", "stray_closing_tag", f"Dropped </{name}> that closes no open element")
+                return ""
+            depth = len(self.stack) - 1 - self.stack[::-1].index(name)
+            for unclosed in self.stack[depth + 1:]:
+                self.report("warning", "unclosed_tag", f"Closed <{unclosed}> before </{name}>")
+            return self.close_to(depth)
+
+        output = ""
+        top = self.stack[-1] if self.stack else None
+        if top and top.rsplit(":", 1)[-1] in LEAF_ELEMENTS and local not in LEAF_CHILDREN:
+            self.report("warning", "unclosed_tag", f"Closed <{top}> before <{name}>")
+            output = self.close_to(len(self.stack) - 1)
+
+        if self.root_seen and CLEAN_TAG_RE.fullmatch(token):
+            names = CLEAN_ATTRIBUTE_NAME_RE.findall(token)
+            declared_here = tuple(key[6:] for key in names if key.startswith("xmlns:"))
+            if len(names) == len(set(names)) and not self.undeclared([name, *names], declared_here):
+                # already well-formed, pass it through untouched
+                if not self_closing:
+                    self.open_element(name, declared_here)
+                return output + token
+
+        attributes = self.parse_attributes(body[match.end():], name)
+        if not self.root_seen:
+            attributes = self.repair_root(attributes)
+            self.root_seen = True
+
+        declared_here = tuple(key[6:] for key in attributes if key.startswith("xmlns:"))
+        missing = self.undeclared([name, *attributes], declared_here)
+        if missing:
+            for prefix in missing:
+                attributes[f"xmlns:{prefix}"] = KNOWN_NAMESPACES.get(prefix, f"urn:x-undeclared:{prefix}")
+            declared_here += tuple(missing)
+            self.report("warning", "undeclared_prefix", f"Declared namespace prefix(es) {', '.join(missing)} on <{name}>")
+
+        self.report_entities("".join(attributes.values()), f"<{name}> attributes")
+        rendered = "".join(f' {key}="{escape_attribute(value)}"' for key, value in attributes.items())
+        if self_closing:
+            return output + f"<{name}{rendered}/>"
+        self.open_element(name, declared_here)
+        return output + f"<{name}{rendered}>"
+
+    def handle(self, kind: str, token: str) -> str:
+        if kind == "tag":
+            return self.handle_tag(token)
+        inside = bool(self.stack)
+        if kind == "text":
+            if inside:
+                self.report_entities(token, "text")
+                return escape_text(token)
+            if token.strip():
+                self.drop_outside("text")
+            return ""
+        if kind == "lt":
+            if inside:
+                self.report("warning", "bare_lt", "Escaped a '<' that starts no tag")
+                return "&lt;"
+            return ""
+        if kind == "truncated":
+            self.report("warning", "truncated", "Dropped an incomplete token at the end of the document")
+            return ""
+        if kind in ("pi", "doctype") and not self.root_seen:
+            return token
+        if kind in ("comment", "cdata") and inside:
+            return token
+        return ""
+
+    # public interface
+
+    def feed(self, chunk: str) -> str:
+        """
+        Consume the next chunk of markup.
+
+        Args:
+            chunk: Any slice of the document, split anywhere
+
+        Returns:
+            Repaired markup that no later input can change
+        """
+        self.buffer += chunk
+        output = self._drain(final=False)
+        self.check(output)
+        return output
+
+    def _drain(self, final: bool) -> str:
+        output = []
+        while True:
+            token = self.next_token(final)
+            if token is None:
+                break
+            kind, end = token
+            text = self.buffer[self.position:end]
+            output.append(self.handle(kind, text))
+            self.advance(text)
+            self.position = end
+        # keep only the incomplete tail for the next chunk
+        self.buffer = self.buffer[self.position:]
+        self.position = 0
+        return "".join(output)
+
+    def close(self) -> str:
+        """
+        Finish the document, closing whatever is still open.
+
+        Returns:
+            The remaining repaired markup
+        """
+        if self.closed:
+            return ""
+        self.closed = True
+        output = self._drain(final=True)
+        if self.stack:
+            self.report("warning", "unclosed_root", f"Closed {len(self.stack)} element(s) left open at the end of the document")
+            output += self.close_to(0)
+        if not self.root_seen:
+            self.report("error", "missing_root", "No <svg> root element found", repaired=False)
+        else:
+            self.check(output, final=True)
+        return output
+
+    @property
+    def valid(self) -> bool:
+        return not any(diagnostic.level == "error" for diagnostic in self.diagnostics)
+
+
+def validate_svg_stream(chunks: Iterable[str], default_size: Tuple[int, int] = (1200, 800)) -> SvgValidationResult:
+    """
+    Validate and repair SVG markup arriving in chunks.
+
+    Args:
+        chunks: Pieces of the document in order
+        default_size: Canvas size used for a viewBox the root is missing
+
+    Returns:
+        The repaired SVG and its diagnostics
+    """
+    validator = SvgStreamValidator(default_size=default_size)
+    parts = [validator.feed(chunk) for chunk in chunks]
+    parts.append(validator.close())
+    return SvgValidationResult(
+        svg_code="".join(parts),
+        valid=validator.valid,
+        repaired=any(diagnostic.repaired for diagnostic in validator.diagnostics),
+        diagnostics=validator.diagnostics,
+    )
+
+
+def validate_svg(svg_code: str, default_size: Tuple[int, int] = (1200, 800)) -> SvgValidationResult:
+    """
+    Validate and repair a complete SVG document in one pass.
+
+    Args:
+        svg_code: SVG markup, possibly with surrounding text or truncated
+        default_size: Canvas size used for a viewBox the root is missing
+
+    Returns:
+        The repaired SVG and its diagnostics
+    """
+    if is_clean_svg(svg_code):
+        return SvgValidationResult(svg_code=svg_code, valid=True, repaired=False, diagnostics=[])
+    return validate_svg_stream([svg_code], default_size=default_size)
+
+
+def is_clean_svg(svg_code: str) -> bool:
+    """
+    Fast check, in C, for documents the repairing pass would leave unchanged.
+
+    The document must be well-formed, start with the <svg> root carrying xmlns and
+    viewBox, end with its closing tag, and have no shape with nested elements.
+    """
+    stripped = svg_code.strip()
+    if not stripped.startswith("<svg") or not stripped.endswith("</svg>"):
+        return False
+    try:
+        root = ET.fromstring(stripped)
+    except ET.ParseError:
+        return False
+    if root.tag != f"{{{SVG_NS}}}svg" or "viewBox" not in root.attrib:
+        return False
+    for element in root.iter():
+        if len(element) and element.tag.rsplit("}", 1)[-1] in LEAF_ELEMENTS:
+            if any(child.tag.rsplit("}", 1)[-1] not in LEAF_CHILDREN for child in element):
+                return False
+    return True
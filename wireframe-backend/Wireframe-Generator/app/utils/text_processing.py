@@ -2,27 +2,23 @@ import re
 import json
 import html
 
+from app.utils.json_scanner import extract_json, parse_json
+
 def extract_json_from_text(text: str) -> str:
     """
     Extract JSON content from text that may contain Markdown or other formatting.
-    
+
+    Scans once from the first bracket (inside a ```json fence when there is one) to
+    its matching close, skipping brackets inside strings. Truncated JSON runs to the
+    end of the text and is closed by parse_json_safely.
+
     Args:
         text: The text containing JSON content
         
     Returns:
         Extracted JSON string
     """
-    # Try to find JSON in code blocks
-    json_match = re.search(r'```json\s*([\s\S]*?)\s*```', text)
-    if json_match:
-        return json_match.group(1)
-
-    # If no JSON code block, try to find JSON between curly braces
-    json_match = re.search(r'({[\s\S]*})', text)
-    if json_match:
-        return json_match.group(1)
-
-    return text  # Return the full text if no JSON pattern found
+    return extract_json(text)
 
 
 # def extract_svg_from_text(text: str) -> str:
@@ -225,65 +221,22 @@ def extract_svg_from_text(text):
 def parse_json_safely(json_str: str) -> dict:
     """
     Safely parse a JSON string with error handling.
+
+    Valid JSON goes straight to json.loads. Otherwise it is repaired in a single
+    pass that tracks string state: trailing commas, bare keys, stray quotes,
+    invalid escapes and truncated structures are fixed without touching string
+    contents.
     
     Args:
         json_str: The JSON string to parse
         
     Returns:
         Parsed JSON as a dictionary
+
+    Raises:
+        ValueError: If the string cannot be parsed even after repair
     """
-    try:
-        return json.loads(json_str)
-    except json.JSONDecodeError as e:
-        # Try to clean the string first
-        cleaned_str = json_str.strip()
-        
-        # Remove any trailing commas before closing brackets
-        cleaned_str = re.sub(r',(\s*[}\]])', r'\1', cleaned_str)
-        
-        # Fix unescaped quotes in strings
-        cleaned_str = re.sub(r'(?<!\\)"(?![,}\]\s])', r'\"', cleaned_str)
-        
-        # Fix malformed escape sequences
-        cleaned_str = re.sub(r'\\([^"\\/bfnrtu])', r'\1', cleaned_str)
-        
-        # Attempt to balance brackets and braces
-        bracket_stack = []
-        brace_stack = []
-        fixed_str = ""
-        
-        for char in cleaned_str:
-            if char == '{':
-                brace_stack.append(char)
-            elif char == '[':
-                bracket_stack.append(char)
-            elif char == '}' and brace_stack:
-                brace_stack.pop()
-            elif char == ']' and bracket_stack:
-                bracket_stack.pop()
-            fixed_str += char
-        
-        # Close any remaining open brackets/braces
-        fixed_str += '}' * len(brace_stack)
-        fixed_str += ']' * len(bracket_stack)
-        
-        try:
-            return json.loads(fixed_str)
-        except json.JSONDecodeError:
-            try:
-                # As a last resort, try to repair common formatting issues
-                lines = fixed_str.split('\n')
-                repaired_lines = []
-                for line in lines:
-                    # Remove trailing commas
-                    line = re.sub(r',\s*$', '', line)
-                    # Ensure property names are quoted
-                    line = re.sub(r'(\s*)(\w+)(:)', r'\1"\2"\3', line)
-                    repaired_lines.append(line)
-                final_str = '\n'.join(repaired_lines)
-                return json.loads(final_str)
-            except json.JSONDecodeError:
-                raise ValueError(f"Failed to parse JSON: {str(e)}")
+    return parse_json(json_str.strip())
 
 
 
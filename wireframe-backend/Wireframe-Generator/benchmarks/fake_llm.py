@@ -0,0 +1,210 @@
+import contextlib
+import json
+import random
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """
+    Build a latency sampler (seconds) from a compact distribution spec.
+
+    Supported specs:
+        const:0.05              always 50ms
+        uniform:0.02,0.2        uniformly between 20ms and 200ms
+        normal:0.1,0.02         gaussian, clamped at 0
+        lognormal:-2.3,0.5      log-normal with the given mu and sigma
+
+    Args:
+        spec: Distribution name and comma separated parameters
+
+    Returns:
+        Function drawing one latency from a random generator
+    """
+    name, _, raw = spec.partition(":")
+    params = [float(value) for value in raw.split(",") if value]
+
+    if name == "const":
+        return lambda rng: params[0]
+    if name == "uniform":
+        return lambda rng: rng.uniform(params[0], params[1])
+    if name == "normal":
+        return lambda rng: max(0.0, rng.gauss(params[0], params[1]))
+    if name == "lognormal":
+        return lambda rng: rng.lognormvariate(params[0], params[1])
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+def sample_plan(screen_count: int = 3, components_per_screen: int = 8) -> dict:
+    """Wireframe plan shaped like the Wireframe Planning Agent output."""
+    screens = []
+    for index in range(screen_count):
+        screens.append({
+            "id": f"screen-{index + 1}",
+            "name": f"Screen {index + 1}",
+            "purpose": "Let the user complete step %d of the main flow" % (index + 1),
+            "content_priority": {"primary": ["form", "call to action"], "secondary": ["help text"]},
+            "layout": {"grid": "12 columns", "spacing": {"section": 32, "element": 16}},
+            "components": [
+                {"type": "button" if i % 3 == 0 else "field", "label": f"Component {i}", "notes": "Placeholder \"quoted\" text, with commas"}
+                for i in range(components_per_screen)
+            ],
+            "states": ["default", "error", "success"],
+            "responsive_behavior": {"mobile": "stacked", "desktop": "two columns"},
+            "reasoning": "Keeps the primary action above the fold.",
+        })
+    return {
+        "metadata": {"project_name": "Benchmark", "fidelity_level": "low", "target_devices": ["mobile"], "design_approach": "mobile first"},
+        "strategic_overview": {"goals": ["convert"], "target_users": ["shoppers"], "design_principles": ["clarity"], "key_metrics": [], "reasoning": ""},
+        "user_journeys": [{"name": "Main flow", "steps": [screen["id"] for screen in screens]}],
+        "component_library": [{"name": "button", "variants": ["primary", "secondary"]}, {"name": "field", "variants": ["default", "error"]}],
+        "design_system": {"colors": ["#333", "#999"], "spacing": [4, 8, 16, 32]},
+        "screens": screens,
+        "technical_considerations": {
+            "performance": ["lazy load images below the fold", "prefetch the next step"],
+            "accessibility": ["visible focus states", "labels on every field", "error text tied to its field"],
+            "reasoning": "The flow is used on slow mobile connections, so every step has to stay light.",
+        },
+        "annotations": {screen["id"]: f"Primary action of {screen['name']} stays above the fold on every device." for screen in screens},
+    }
+
+
+def sample_layout(screen_count: int = 3) -> dict:
+    """Layout DSL document equivalent to sample_plan."""
+    screens = []
+    for index in range(screen_count):
+        items = [["navbar", 0, 0, 4, 1, "Brand"], ["title", 0, 2, 4, 1, f"Screen {index + 1}"]]
+        for row in range(6):
+            items.append(["label", 0, 3 + row * 2, 4, 1, f"Field {row}"])
+            items.append(["field", 0, 4 + row * 2, 4, 1, "Placeholder"])
+        items.append(["button", 0, 16, 4, 1, "Continue"])
+        screens.append({"id": f"screen-{index + 1}", "size": [360, 800], "cols": 4, "items": items})
+    flows = [[f"screen-{i + 1}", f"screen-{i + 2}", "Continue"] for i in range(screen_count - 1)]
+    return {"screens": screens, "flows": flows}
+
+
+def sample_svg(screen_count: int = 3, components_per_screen: int = 12) -> str:
+    """Raw SVG of the size and shape the SVG Generation Agent typically returns."""
+    parts = [
+        '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 %d 800" width="100%%" height="100%%">' % (screen_count * 480),
+        "<style>.screen{fill:#fff;stroke:#999}.button{fill:#ddd;stroke:#666}.form-label{font-size:13px}</style>",
+    ]
+    for screen in range(screen_count):
+        parts.append(f'<!-- Screen {screen + 1} --><g id="screen-{screen + 1}" transform="translate({screen * 480},0)">')
+        parts.append('<rect class="screen" x="0" y="0" width="360" height="800"/>')
+        for i in range(components_per_screen):
+            parts.append(
+                f'<rect class="button" x="20.000001" y="{60 + i * 56}.499999" width="320" height="40" rx="4" style="fill:#dddddd;stroke:#666666"/>'
+                f'<text class="form-label" x="30" y="{85 + i * 56}">Component {i}</text>'
+            )
+        parts.append("</g>")
+    parts.append("</svg>")
+    return "\n".join(parts)
+
+
+class FakeChatModel:
+    """
+    Stand-in for ChatGoogleGenerativeAI that answers each pipeline stage with a canned
+    response after sleeping for a latency drawn from the configured distribution.
+
+    Only the `invoke` / `stream` surface used by the agents is implemented.
+    """
+
+    def __init__(self, script: "FakeLLMScript", temperature: float = 0):
+        self.script = script
+        self.temperature = temperature
+
+    def invoke(self, prompt: str) -> AIMessage:
+        stage, content = self.script.respond(prompt)
+        time.sleep(self.script.sample_latency(stage))
+        return AIMessage(content=content)
+
+    def stream(self, prompt: str) -> Iterator[AIMessageChunk]:
+        stage, content = self.script.respond(prompt)
+        chunk_size = self.script.stream_chunk_size
+        chunks = [content[i:i + chunk_size] for i in range(0, len(content), chunk_size)] or [""]
+        delay = self.script.sample_latency(stage) / len(chunks)
+        for chunk in chunks:
+            time.sleep(delay)
+            yield AIMessageChunk(content=chunk)
+
+
+class FakeLLMScript:
+    """
+    Scripted responses and latency profile shared by every FakeChatModel it creates.
+
+    Stages are recognized from markers in the agent prompts, so the real agents run
+    unchanged. Per-stage latency specs override the default one.
+    """
+
+    STAGE_MARKERS = [
+        ("query_expansion", "interpreted_query"),
+        ("requirements", "requirements gathering agent"),
+        ("planning", "wireframe planning agent"),
+        ("layout", "compact layout format"),
+        ("labels", "labelling a wireframe traced"),
+        ("conversation", "UX/UI consultant"),
+    ]
+
+    def __init__(
+        self,
+        latency: str = "const:0",
+        stage_latency: Optional[Dict[str, str]] = None,
+        screen_count: int = 3,
+        seed: int = 0,
+        stream_chunk_size: int = 64,
+    ):
+        self.default_latency = parse_latency(latency)
+        self.stage_latency = {stage: parse_latency(spec) for stage, spec in (stage_latency or {}).items()}
+        self.screen_count = screen_count
+        self.stream_chunk_size = stream_chunk_size
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.calls: List[str] = []
+
+        plan = sample_plan(screen_count)
+        self.responses = {
+            "query_expansion": '```json\n{"interpreted_query": "I want a checkout flow for a fashion store"}\n```',
+            "requirements": "```json\n" + json.dumps({"project_type": "e-commerce", "pages": [s["name"] for s in plan["screens"]]}, indent=2) + "\n```",
+            "planning": "```json\n" + json.dumps(plan, indent=2) + "\n```",
+            "layout": "```json\n" + json.dumps(sample_layout(1)) + "\n```",
+            "labels": '```json\n{"labels": ["Brand", "", "Search", "Featured", "Add to cart", "", "Details"]}\n```',
+            "svg": "```svg\n" + sample_svg(1) + "\n```",
+            "conversation": "What type of application are you looking to create - a website, mobile app, or dashboard?",
+        }
+
+    def stage_of(self, prompt: str) -> str:
+        for stage, marker in self.STAGE_MARKERS:
+            if marker in prompt:
+                return stage
+        return "svg"
+
+    def respond(self, prompt: str) -> tuple:
+        stage = self.stage_of(prompt)
+        with self.lock:
+            self.calls.append(stage)
+        return stage, self.responses[stage]
+
+    def sample_latency(self, stage: str) -> float:
+        sampler = self.stage_latency.get(stage, self.default_latency)
+        with self.lock:
+            return sampler(self.rng)
+
+    def model_factory(self, TEMPERATURE: float = 0) -> FakeChatModel:
+        return FakeChatModel(self, temperature=TEMPERATURE)
+
+
+@contextlib.contextmanager
+def fake_llm(script: FakeLLMScript):
+    """Route every agent LLM call through the scripted fake for the duration of the block."""
+    from app.services.wireframe import agents
+
+    original = agents.get_llm_model
+    agents.get_llm_model = script.model_factory
+    try:
+        yield script
+    finally:
+        agents.get_llm_model = original
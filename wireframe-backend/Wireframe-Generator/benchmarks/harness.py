@@ -0,0 +1,99 @@
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+
+def measure(func: Callable[[], Any], repeat: int = 20, warmup: int = 2, min_time: float = 0.0) -> Dict[str, float]:
+    """
+    Time `func` and summarize the per-call wall clock in milliseconds.
+
+    Args:
+        func: Zero-argument callable to benchmark
+        repeat: Number of timed calls
+        warmup: Untimed calls made first to fill caches and import lazily loaded code
+        min_time: Keep calling past `repeat` until this many seconds were spent timing
+
+    Returns:
+        Summary statistics of the timed calls
+    """
+    for _ in range(warmup):
+        func()
+
+    samples: List[float] = []
+    spent = 0.0
+    while len(samples) < repeat or spent < min_time:
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        samples.append(elapsed * 1000)
+        spent += elapsed
+
+    samples.sort()
+    return {
+        "runs": len(samples),
+        "mean_ms": statistics.fmean(samples),
+        "median_ms": statistics.median(samples),
+        "p95_ms": samples[min(len(samples) - 1, int(round(0.95 * (len(samples) - 1))))],
+        "min_ms": samples[0],
+        "max_ms": samples[-1],
+        "stdev_ms": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+    }
+
+
+def environment() -> Dict[str, Any]:
+    """Metadata needed to decide whether two reports are comparable."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": commit,
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+
+
+def write_report(results: Dict[str, Dict[str, Any]], path: Optional[str]) -> Dict[str, Any]:
+    """Write a JSON report (or print it when no path is given) and return it."""
+    report = {"environment": environment(), "results": results}
+    payload = json.dumps(report, indent=2, sort_keys=True)
+    if path:
+        with open(path, "w", encoding="utf-8") as handle:
+            handle.write(payload + "\n")
+    else:
+        print(payload)
+    return report
+
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 1.2) -> List[str]:
+    """
+    Compare two reports on the median of every benchmark present in both.
+
+    Args:
+        baseline: Previously written report
+        current: Report of this run
+        threshold: Ratio current/baseline above which a benchmark counts as a regression
+
+    Returns:
+        Human readable lines, one per regression
+    """
+    regressions = []
+    for name, result in sorted(current["results"].items()):
+        base = baseline.get("results", {}).get(name)
+        if not base or not base.get("median_ms"):
+            continue
+        ratio = result["median_ms"] / base["median_ms"]
+        if ratio > threshold:
+            regressions.append(f"{name}: {base['median_ms']:.3f}ms -> {result['median_ms']:.3f}ms ({ratio:.2f}x)")
+    return regressions
@@ -0,0 +1,224 @@
+"""
+Load driver for the wireframe API.
+
+Sends a weighted mix of /generate, /conversation, /image-to-wireframe and /health
+traffic at a fixed concurrency and reports throughput and latency percentiles per
+endpoint. By default it starts the Gemini stand-in and the API in-process:
+
+    python -m benchmarks.load.driver --concurrency 32 --duration 30 --llm-latency lognormal:-1.2,0.4
+
+Use --target to drive an already running API instead (start it with
+GOOGLE_API_ENDPOINT / GOOGLE_API_TRANSPORT pointing at a running stand-in).
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import random
+import socket
+import sys
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import httpx
+
+
+QUERIES = [
+    "Login and signup screens for a fitness app",
+    "Landing page for a coffee shop with menu and contact sections",
+    "Admin dashboard with user table, charts and filters",
+    "Checkout flow for a fashion e-commerce store",
+    "Portfolio website for a photographer",
+    "Booking flow for a dental clinic appointment",
+    "Chat app with conversation list and message view",
+    "Online course page with lessons and progress",
+]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def serve_in_thread(app, port: int):
+    """Run an ASGI app with uvicorn on a daemon thread and wait until it accepts connections."""
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.time() + 15
+    while not server.started:
+        if time.time() > deadline:
+            raise RuntimeError(f"Server on port {port} did not start")
+        time.sleep(0.05)
+    return server
+
+
+def screenshot_png(width: int = 800, height: int = 600) -> bytes:
+    from benchmarks.run import synthetic_screenshot
+
+    buffer = io.BytesIO()
+    synthetic_screenshot(width, height).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+class LoadDriver:
+    """Closed-loop load generator: each worker sends its next request as soon as the previous one finishes."""
+
+    def __init__(self, base_url: str, mix: Dict[str, float], unique_ratio: float, seed: int = 0, timeout: float = 120):
+        self.base_url = base_url.rstrip("/")
+        self.mix = mix
+        self.unique_ratio = unique_ratio
+        self.rng = random.Random(seed)
+        self.timeout = timeout
+        self.image = screenshot_png()
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.counter = 0
+
+    def query(self) -> str:
+        query = self.rng.choice(QUERIES)
+        if self.rng.random() < self.unique_ratio:
+            # unique suffix defeats the response cache, repeated queries exercise it
+            self.counter += 1
+            query = f"{query} (variant {self.counter})"
+        return query
+
+    async def send(self, client: httpx.AsyncClient, endpoint: str) -> httpx.Response:
+        if endpoint == "generate":
+            return await client.post("/api/v1/wireframe/generate", json={"user_query": self.query()})
+        if endpoint == "conversation":
+            query = self.query()
+            turns = self.rng.randint(0, 3)
+            messages = [{"role": "user", "content": query}]
+            for turn in range(turns):
+                messages += [{"role": "assistant", "content": "Which pages do you need?"}, {"role": "user", "content": f"Detail {turn}"}]
+            return await client.post("/api/v1/wireframe/conversation", json={"messages": messages, "user_input": query})
+        if endpoint == "image":
+            name = f"screenshot-{self.rng.randint(0, 10 ** 6)}.png"
+            return await client.post("/api/v1/wireframe/image-to-wireframe", files={"file": (name, self.image, "image/png")})
+        return await client.get("/health")
+
+    async def worker(self, client: httpx.AsyncClient, deadline: float, remaining: List[int]) -> None:
+        endpoints, weights = zip(*self.mix.items())
+        while time.perf_counter() < deadline and remaining[0] != 0:
+            remaining[0] -= 1
+            endpoint = self.rng.choices(endpoints, weights)[0]
+            start = time.perf_counter()
+            try:
+                response = await self.send(client, endpoint)
+                status = str(response.status_code)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            self.latencies[endpoint].append((time.perf_counter() - start) * 1000)
+            self.statuses[endpoint][status] += 1
+
+    async def run(self, concurrency: int, duration: float, requests: int) -> Dict[str, dict]:
+        deadline = time.perf_counter() + duration
+        remaining = [requests if requests > 0 else -1]
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+        start = time.perf_counter()
+        async with httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout, limits=limits) as client:
+            await asyncio.gather(*(self.worker(client, deadline, remaining) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+        report = {}
+        for endpoint, values in sorted(self.latencies.items()):
+            values.sort()
+            report[endpoint] = {
+                "requests": len(values),
+                "throughput_rps": len(values) / elapsed,
+                "p50_ms": percentile(values, 0.50),
+                "p95_ms": percentile(values, 0.95),
+                "p99_ms": percentile(values, 0.99),
+                "max_ms": values[-1],
+                "statuses": dict(self.statuses[endpoint]),
+            }
+        report["_total"] = {
+            "requests": sum(len(values) for values in self.latencies.values()),
+            "elapsed_s": elapsed,
+            "throughput_rps": sum(len(values) for values in self.latencies.values()) / elapsed,
+        }
+        return report
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix = {}
+    for item in spec.split(","):
+        name, _, weight = item.partition("=")
+        if name not in ("generate", "conversation", "image", "health"):
+            raise ValueError(f"Unknown endpoint in mix: {name}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Mixed-traffic load test for the wireframe API")
+    parser.add_argument("--target", help="Base URL of a running API; omit to start the API and the Gemini stand-in in-process")
+    parser.add_argument("--mix", default="generate=1,conversation=3,image=1,health=1", help="Weighted endpoint mix")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=20, help="Seconds to run")
+    parser.add_argument("--requests", type=int, default=0, help="Stop after this many requests (0: duration only)")
+    parser.add_argument("--unique-ratio", type=float, default=0.5, help="Fraction of queries made unique to bypass the cache")
+    parser.add_argument("--llm-latency", default="lognormal:-1.6,0.4", help="Stand-in latency distribution")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0, help="Stand-in injected error rate")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    stub_server = None
+    base_url = args.target
+    if not base_url:
+        from benchmarks.load.gemini_stub import StubConfig, create_stub_app
+
+        stub_port, api_port = free_port(), free_port()
+        stub_app = create_stub_app(StubConfig(latency=args.llm_latency, error_rate=args.llm_error_rate, seed=args.seed))
+        stub_server = serve_in_thread(stub_app, stub_port)
+
+        # settings are read at import time, so configure the endpoint before importing the app
+        os.environ["GOOGLE_API_ENDPOINT"] = f"http://127.0.0.1:{stub_port}"
+        os.environ["GOOGLE_API_TRANSPORT"] = "rest"
+        os.environ.setdefault("GOOGLE_API_KEY", "load-test")
+        from app.main import app
+
+        serve_in_thread(app, api_port)
+        base_url = f"http://127.0.0.1:{api_port}"
+
+    driver = LoadDriver(base_url, parse_mix(args.mix), args.unique_ratio, seed=args.seed)
+    report = asyncio.run(driver.run(args.concurrency, args.duration, args.requests))
+    if stub_server is not None:
+        stats = stub_server.config.app.state.stats
+        report["_llm"] = {"requests": stats.requests, "errors": stats.errors, "stages": stats.stages, "max_in_flight": stats.max_in_flight}
+
+    for endpoint, result in report.items():
+        if endpoint.startswith("_"):
+            continue
+        print(
+            f"{endpoint:14s} n={result['requests']:6d} {result['throughput_rps']:8.2f} rps  "
+            f"p50 {result['p50_ms']:9.1f}ms  p95 {result['p95_ms']:9.1f}ms  p99 {result['p99_ms']:9.1f}ms  {result['statuses']}",
+            file=sys.stderr,
+        )
+    payload = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(payload + "\n")
+    else:
+        print(payload)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
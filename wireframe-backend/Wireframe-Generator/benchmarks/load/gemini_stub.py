@@ -0,0 +1,172 @@
+"""
+Local stand-in for the Gemini generate-content REST API.
+
+Serves canned pipeline responses with configurable latency and error rates so the
+backend can be load tested without spending quota:
+
+    python -m benchmarks.load.gemini_stub --port 8081 --latency lognormal:-1.2,0.4 --error-rate 0.05
+
+Point the backend at it with GOOGLE_API_ENDPOINT=http://127.0.0.1:8081 and
+GOOGLE_API_TRANSPORT=rest.
+"""
+import argparse
+import asyncio
+import json
+import random
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from benchmarks.fake_llm import FakeLLMScript, parse_latency
+
+
+# status -> (gRPC style status, message) returned for injected failures
+ERROR_TYPES = {
+    429: ("RESOURCE_EXHAUSTED", "Resource has been exhausted (e.g. check quota)."),
+    500: ("INTERNAL", "An internal error has occurred."),
+    503: ("UNAVAILABLE", "The model is overloaded. Please try again later."),
+}
+
+
+@dataclass
+class StubConfig:
+    latency: str = "const:0.05"
+    stage_latency: Dict[str, str] = field(default_factory=dict)
+    error_rate: float = 0.0
+    error_statuses: tuple = (429, 500, 503)
+    screen_count: int = 3
+    seed: int = 0
+
+
+@dataclass
+class StubStats:
+    requests: int = 0
+    errors: Dict[int, int] = field(default_factory=dict)
+    stages: Dict[str, int] = field(default_factory=dict)
+    in_flight: int = 0
+    max_in_flight: int = 0
+
+
+def create_stub_app(config: Optional[StubConfig] = None) -> FastAPI:
+    """
+    Build the stand-in app.
+
+    Args:
+        config: Latency, error injection and canned response settings
+
+    Returns:
+        FastAPI app serving `models/{model}:generateContent` and `:streamGenerateContent`
+    """
+    config = config or StubConfig()
+    script = FakeLLMScript(screen_count=config.screen_count, seed=config.seed)
+    default_latency = parse_latency(config.latency)
+    stage_latency = {stage: parse_latency(spec) for stage, spec in config.stage_latency.items()}
+    rng = random.Random(config.seed)
+    stats = StubStats()
+
+    app = FastAPI(title="Gemini stand-in")
+    app.state.config = config
+    app.state.stats = stats
+
+    def candidate(text: str, finish_reason: Optional[str] = "STOP") -> dict:
+        body = {"content": {"parts": [{"text": text}], "role": "model"}, "index": 0}
+        if finish_reason:
+            body["finishReason"] = finish_reason
+        return body
+
+    def usage(prompt: str, text: str) -> dict:
+        # roughly 4 characters per token, good enough for throughput accounting
+        prompt_tokens, output_tokens = len(prompt) // 4, len(text) // 4
+        return {"promptTokenCount": prompt_tokens, "candidatesTokenCount": output_tokens, "totalTokenCount": prompt_tokens + output_tokens}
+
+    def error_response(status: int) -> JSONResponse:
+        code, message = ERROR_TYPES.get(status, ("UNKNOWN", "Injected failure"))
+        return JSONResponse(status_code=status, content={"error": {"code": status, "message": message, "status": code}})
+
+    @app.post("/v1beta/models/{model_action}")
+    async def generate_content(model_action: str, request: Request):
+        model, _, action = model_action.partition(":")
+        payload = await request.json()
+        prompt = "".join(
+            part.get("text", "")
+            for content in payload.get("contents", [])
+            for part in content.get("parts", [])
+        )
+        stage, text = script.respond(prompt)
+
+        stats.requests += 1
+        stats.stages[stage] = stats.stages.get(stage, 0) + 1
+        stats.in_flight += 1
+        stats.max_in_flight = max(stats.max_in_flight, stats.in_flight)
+        try:
+            await asyncio.sleep(stage_latency.get(stage, default_latency)(rng))
+
+            if config.error_rate and rng.random() < config.error_rate:
+                status = rng.choice(config.error_statuses)
+                stats.errors[status] = stats.errors.get(status, 0) + 1
+                return error_response(status)
+        finally:
+            stats.in_flight -= 1
+
+        if action == "streamGenerateContent":
+            chunks = [text[i:i + 256] for i in range(0, len(text), 256)] or [""]
+
+            async def events():
+                for index, chunk in enumerate(chunks):
+                    last = index == len(chunks) - 1
+                    event = {"candidates": [candidate(chunk, "STOP" if last else None)], "modelVersion": model}
+                    if last:
+                        event["usageMetadata"] = usage(prompt, text)
+                    yield f"data: {json.dumps(event)}\r\n\r\n"
+
+            if request.query_params.get("alt") == "sse":
+                return StreamingResponse(events(), media_type="text/event-stream")
+            return JSONResponse([
+                {"candidates": [candidate(chunk, "STOP" if index == len(chunks) - 1 else None)], "modelVersion": model}
+                for index, chunk in enumerate(chunks)
+            ])
+
+        return {"candidates": [candidate(text)], "usageMetadata": usage(prompt, text), "modelVersion": model}
+
+    @app.get("/stats")
+    async def get_stats():
+        return {
+            "requests": stats.requests,
+            "errors": stats.errors,
+            "stages": stats.stages,
+            "in_flight": stats.in_flight,
+            "max_in_flight": stats.max_in_flight,
+        }
+
+    return app
+
+
+def main(argv=None) -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Local Gemini generate-content stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency", default="const:0.05", help="Default latency distribution, see benchmarks.fake_llm.parse_latency")
+    parser.add_argument("--stage-latency", action="append", default=[], metavar="STAGE=SPEC", help="Per-stage latency, e.g. planning=uniform:0.5,1.5")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with an injected error")
+    parser.add_argument("--error-status", type=int, action="append", help="Statuses to inject (default 429, 500, 503)")
+    parser.add_argument("--screens", type=int, default=3, help="Screens in the canned wireframe plan")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    config = StubConfig(
+        latency=args.latency,
+        stage_latency=dict(item.split("=", 1) for item in args.stage_latency),
+        error_rate=args.error_rate,
+        error_statuses=tuple(args.error_status or (429, 500, 503)),
+        screen_count=args.screens,
+        seed=args.seed,
+    )
+    uvicorn.run(create_stub_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
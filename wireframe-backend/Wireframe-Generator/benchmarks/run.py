@@ -0,0 +1,303 @@
+"""
+Offline benchmarks for the backend hot paths.
+
+Runs without network access: every LLM call goes through benchmarks.fake_llm.
+
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.run --only text --compare bench.json
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import re
+import sys
+import tempfile
+from typing import Any, Callable, Dict, List, Tuple
+
+from PIL import Image, ImageDraw
+
+from benchmarks.fake_llm import FakeLLMScript, fake_llm, sample_plan, sample_svg
+from benchmarks.harness import compare_reports, measure, write_report
+
+
+Case = Tuple[str, Callable[[], Any], Dict[str, Any]]
+
+IMAGE_SIZES = [(320, 240), (800, 600), (1920, 1080)]
+
+LATENCY_PROFILES = {
+    "instant": {"latency": "const:0"},
+    "typical": {
+        "latency": "lognormal:-1.6,0.3",
+        "stage_latency": {"planning": "lognormal:-0.9,0.3", "svg": "lognormal:-0.7,0.3", "layout": "lognormal:-1.6,0.3"},
+    },
+}
+
+
+def synthetic_screenshot(width: int, height: int) -> Image.Image:
+    """Screenshot-like image: header bar, cards, buttons and text lines on a light background."""
+    image = Image.new("RGB", (width, height), "#f7f7f7")
+    draw = ImageDraw.Draw(image)
+    draw.rectangle([0, 0, width, max(20, height // 12)], fill="#333333")
+    card_width = max(40, width // 4)
+    for column in range(3):
+        left = 20 + column * (card_width + 20)
+        top = height // 6
+        draw.rectangle([left, top, left + card_width, top + height // 3], outline="#888888", fill="#ffffff", width=2)
+        for line in range(4):
+            y = top + 20 + line * 18
+            draw.line([left + 10, y, left + card_width - 20, y], fill="#aaaaaa", width=3)
+        draw.rounded_rectangle([left + 10, top + height // 3 - 40, left + card_width // 2, top + height // 3 - 12], radius=6, fill="#4477cc")
+    draw.rectangle([0, height - max(20, height // 12), width, height], fill="#dddddd")
+    return image
+
+
+def synthetic_page(width: int, height: int) -> Image.Image:
+    """Full-page capture: stacked screenshots, with a rule and a bordered section spanning several of them."""
+    page = Image.new("RGB", (width, height), "#f7f7f7")
+    for top in range(0, height, 600):
+        page.paste(synthetic_screenshot(width, 600), (0, top))
+    draw = ImageDraw.Draw(page)
+    draw.line([10, 0, 10, height], fill="#333333", width=2)
+    draw.rectangle([40, 300, width - 40, height // 2], outline="#555555", width=3)
+    return page
+
+
+def text_cases() -> List[Case]:
+    from app.utils.json_scanner import IncrementalJsonParser
+    from app.utils.svg_optimizer import optimize_svg
+    from app.utils.svg_validator import validate_svg, validate_svg_stream
+    from app.utils.text_processing import clean_svg, extract_json_from_text, extract_svg_from_text, parse_json_safely
+
+    small_plan = json.dumps(sample_plan(2, 4), indent=2)
+    large_plan = json.dumps(sample_plan(30, 20), indent=2)
+    broken_plan = large_plan.replace('"states"', '"states",').rstrip("}\n ")  # trailing junk and truncation
+
+    def tolerant_parse(text: str) -> Callable[[], Any]:
+        def run():
+            try:
+                return parse_json_safely(text)
+            except ValueError:
+                return None
+        return run
+
+    plan_chunks = [large_plan[i:i + 64] for i in range(0, len(large_plan), 64)]
+
+    def streamed_parse():
+        parser = IncrementalJsonParser(watch=("screens",))
+        screens = [screen for chunk in plan_chunks for screen in parser.feed(chunk)]
+        return screens, parser.close()
+
+    svg_response = "Here is the wireframe:\n```svg\n" + sample_svg(4) + "\n```\nLet me know if you need changes."
+    large_svg_response = "```svg\n" + sample_svg(12, 40) + "\n```"
+    escaped_svg = json.dumps(sample_svg(4))[1:-1]
+    generated_svg = sample_svg(12, 40)
+    _, optimized = optimize_svg(generated_svg)
+    # unquoted attributes and a truncated tail force the repairing pass
+    damaged_svg = generated_svg.replace('rx="4"', "rx=4")[:-200]
+    svg_chunks = [generated_svg[i:i + 64] for i in range(0, len(generated_svg), 64)]
+
+    return [
+        ("text.extract_json.fenced_small", lambda: extract_json_from_text("Sure!\n```json\n" + small_plan + "\n```"), {"bytes": len(small_plan)}),
+        ("text.extract_json.bare_large", lambda: extract_json_from_text("Here is the plan: " + large_plan + " Done."), {"bytes": len(large_plan)}),
+        ("text.parse_json.clean_large", lambda: parse_json_safely(large_plan), {"bytes": len(large_plan)}),
+        ("text.parse_json.broken_large", tolerant_parse(broken_plan), {"bytes": len(broken_plan)}),
+        ("text.parse_json.streamed_large", streamed_parse, {"bytes": len(large_plan), "chunks": len(plan_chunks)}),
+        ("text.extract_svg.fenced", lambda: extract_svg_from_text(svg_response), {"bytes": len(svg_response)}),
+        ("text.extract_svg.fenced_large", lambda: extract_svg_from_text(large_svg_response), {"bytes": len(large_svg_response)}),
+        ("text.clean_svg.escaped", lambda: clean_svg(escaped_svg), {"bytes": len(escaped_svg)}),
+        ("text.validate_svg.clean_large", lambda: validate_svg(generated_svg), {"bytes": len(generated_svg)}),
+        ("text.validate_svg.damaged_large", lambda: validate_svg(damaged_svg), {"bytes": len(damaged_svg)}),
+        ("text.validate_svg.streamed_large", lambda: validate_svg_stream(svg_chunks), {"bytes": len(generated_svg), "chunks": len(svg_chunks)}),
+        ("text.optimize_svg.large", lambda: optimize_svg(generated_svg), {"bytes": optimized["bytes_before"], "optimized_bytes": optimized["bytes_after"]}),
+    ]
+
+
+def image_cases(workdir: str) -> List[Case]:
+    from app.utils.image_processor import contours_to_paths, detect_elements, elements_to_svg, get_contours, get_contours_tiled, get_edge_points, image_to_svg, load_image, points_to_path
+
+    def path_vertices(svg: str) -> int:
+        """Vertices the renderer has to stroke, counted from the path data."""
+        return sum(len(re.findall(r"-?\d+", data)) for data in re.findall(r'd="([^"]*)"', svg)) // 2
+
+    cases: List[Case] = []
+    for width, height in IMAGE_SIZES:
+        image = synthetic_screenshot(width, height)
+        path = os.path.join(workdir, f"screenshot_{width}x{height}.png")
+        image.save(path)
+        points = get_edge_points(image)
+        contours = get_contours(image)
+        label = f"{width}x{height}"
+        contour_svg = asyncio.run(image_to_svg(path))
+        points_svg = asyncio.run(image_to_svg(path, vectorizer="points"))
+
+        cases.append((f"image.get_edge_points.{label}", lambda image=image: get_edge_points(image), {"pixels": width * height}))
+        cases.append((f"image.points_to_path.{label}", lambda points=points: points_to_path(points), {"points": len(points)}))
+        cases.append((f"image.get_contours.{label}", lambda image=image: get_contours(image), {"contours": len(contours)}))
+        cases.append((f"image.contours_to_paths.{label}", lambda contours=contours: contours_to_paths(contours), {"vertices": sum(map(len, contours))}))
+        elements = detect_elements(image)
+        box_svg = elements_to_svg(elements, width, height)
+        cases.append((f"image.detect_elements.{label}", lambda image=image: detect_elements(image), {"elements": len(elements)}))
+        cases.append((
+            f"image.elements_to_svg.{label}",
+            lambda elements=elements, width=width, height=height: elements_to_svg(elements, width, height),
+            {"svg_bytes": len(box_svg)},
+        ))
+        cases.append((
+            f"image.image_to_svg.{label}",
+            lambda path=path: asyncio.run(image_to_svg(path)),
+            {"svg_bytes": len(contour_svg), "path_vertices": path_vertices(contour_svg)},
+        ))
+        cases.append((
+            f"image.image_to_svg_points.{label}",
+            lambda path=path: asyncio.run(image_to_svg(path, vectorizer="points")),
+            {"svg_bytes": len(points_svg), "path_vertices": path_vertices(points_svg)},
+        ))
+
+    # full-page captures: one pass over the whole page vs. bands stitched across seams
+    page = synthetic_page(800, 6000)
+    contours = get_contours(page)
+    cases.append(("image.get_contours.page_800x6000", lambda: get_contours(page), {"contours": len(contours)}))
+    cases.append(("image.get_contours_tiled.page_800x6000", lambda: get_contours_tiled(page), {"contours": len(get_contours_tiled(page))}))
+
+    # decoding large uploads down to the 800px working size
+    photo = synthetic_screenshot(*IMAGE_SIZES[-1]).resize((4000, 3000))
+    for image_format in ("JPEG", "PNG"):
+        buffer = io.BytesIO()
+        photo.save(buffer, format=image_format)
+        content = buffer.getvalue()
+        cases.append((
+            f"image.load_image.{image_format.lower()}_4000x3000",
+            lambda content=content: load_image(content),
+            {"upload_bytes": len(content)},
+        ))
+    return cases
+
+
+def payload_cases() -> List[Case]:
+    """Response encodings of /generate for the same result, with their wire size."""
+    import gzip
+
+    from app.api.responses import PreparedWireframe
+    from app.models.wireframe import WireframeResponse
+    from app.services.wireframe.layout_dsl import compile_layout
+    from benchmarks.fake_llm import sample_layout
+
+    plan = sample_plan(3)
+    requirements = {"project_type": "e-commerce", "pages": [screen["name"] for screen in plan["screens"]], "notes": ["responsive"] * 20}
+    response = WireframeResponse(
+        svg_code=compile_layout(sample_layout(3)),
+        detailed_requirements=requirements,
+        wireframe_plan=plan,
+        artifacts={"svg_code": "0" * 64, "detailed_requirements": "1" * 64, "wireframe_plan": "2" * 64},
+        errors=[],
+        status=200,
+    )
+
+    prepared = PreparedWireframe(response)
+    encodings = {
+        "full_json": lambda: prepared.json_body(),
+        "fields_svg_code": lambda: prepared.json_body(fields=["svg_code"]),
+        "raw_svg": lambda: prepared.svg,
+        "ids_only": lambda: prepared.json_body(ids_only=True, fields=["artifacts", "status"]),
+        # what a cache hit cost before responses were stored pre-serialized
+        "model_full_json": lambda: WireframeResponse.model_validate(response).model_dump_json().encode("utf-8"),
+        "prepare_once": lambda: PreparedWireframe(response).json_body(),
+    }
+    full = len(encodings["full_json"]())
+
+    cases: List[Case] = []
+    for name, encode in encodings.items():
+        body = encode()
+        cases.append((f"payload.{name}", encode, {
+            "bytes": len(body),
+            "gzip_bytes": len(gzip.compress(body)),
+            "reduction_vs_full": round(1 - len(body) / full, 4),
+        }))
+    return cases
+
+
+def pipeline_cases() -> List[Case]:
+    from app.services.wireframe.graph import generate_wireframe
+    from app.services.wireframe.image_plan import image_requirements, image_wireframe_plan
+    from app.utils.image_processor import detect_layout
+
+    cases: List[Case] = []
+    for profile, options in LATENCY_PROFILES.items():
+        for variants in (1, 3):
+            script = FakeLLMScript(seed=42, **options)
+
+            def run(script=script, variants=variants):
+                with fake_llm(script):
+                    result = generate_wireframe("Checkout flow for a fashion store", variants=variants)
+                if result.get("errors"):
+                    raise RuntimeError(f"Pipeline failed: {result['errors']}")
+                return result
+
+            cases.append((f"pipeline.generate_wireframe.{profile}.variants{variants}", run, {"script": script}))
+
+        # image-guided: the plan comes from the detected layout, only SVG generation calls the LLM
+        script = FakeLLMScript(seed=42, **options)
+        layout = detect_layout(synthetic_screenshot(800, 600))
+        partial_state = {"detailed_requirements": image_requirements(layout), "wireframe_plan": image_wireframe_plan(layout)}
+
+        def run_image(script=script, partial_state=partial_state):
+            with fake_llm(script):
+                result = generate_wireframe("Wireframe of an uploaded screenshot", partial_state=partial_state)
+            if result.get("errors"):
+                raise RuntimeError(f"Pipeline failed: {result['errors']}")
+            return result
+
+        cases.append((f"pipeline.image_guided.{profile}", run_image, {"script": script}))
+    return cases
+
+
+def run_cases(cases: List[Case], repeat: int, pipeline: bool = False) -> Dict[str, Dict[str, Any]]:
+    results = {}
+    for name, func, extra in cases:
+        script = extra.pop("script", None)
+        stats = measure(func, repeat=repeat if not pipeline else max(3, repeat // 5), warmup=1)
+        if script is not None:
+            extra["llm_calls_per_run"] = len(script.calls) / (stats["runs"] + 1)
+        results[name] = {**stats, **extra}
+        print(f"{name:60s} median {stats['median_ms']:10.3f}ms  p95 {stats['p95_ms']:10.3f}ms", file=sys.stderr)
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the wireframe backend")
+    parser.add_argument("--only", choices=["text", "image", "payload", "pipeline"], action="append", help="Run only these groups")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per micro benchmark")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    parser.add_argument("--compare", help="Baseline report to compare medians against")
+    parser.add_argument("--threshold", type=float, default=1.2, help="Slowdown ratio counted as a regression")
+    args = parser.parse_args(argv)
+
+    groups = args.only or ["text", "image", "payload", "pipeline"]
+    results: Dict[str, Dict[str, Any]] = {}
+
+    with tempfile.TemporaryDirectory() as workdir:
+        if "text" in groups:
+            results.update(run_cases(text_cases(), args.repeat))
+        if "image" in groups:
+            results.update(run_cases(image_cases(workdir), args.repeat))
+        if "payload" in groups:
+            results.update(run_cases(payload_cases(), args.repeat))
+        if "pipeline" in groups:
+            results.update(run_cases(pipeline_cases(), args.repeat, pipeline=True))
+
+    report = write_report(results, args.output)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+        regressions = compare_reports(baseline, report, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
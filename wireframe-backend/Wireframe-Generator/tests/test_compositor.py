@@ -0,0 +1,71 @@
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from app.services.wireframe.compositor import composite_screens, extract_screen_flows, split_plan_by_screen
+from app.services.wireframe.layout_dsl import compile_layout
+
+
+def screen(sid, style, body):
+    return {
+        "screen_id": sid,
+        "svg_code": f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 100 100"><style>{style}</style>{body}</svg>',
+    }
+
+
+def style_text(svg):
+    return ET.fromstring(svg).find("{http://www.w3.org/2000/svg}style").text
+
+
+def test_shared_style_sheet_is_kept_unscoped():
+    svg = composite_screens([screen("a", ".button{fill:red}", "<rect/>"), screen("b", ".button { fill:red }", "<rect/>")])
+    assert ".button { fill:red }" in style_text(svg)
+    assert "#screen-" not in style_text(svg)
+
+
+def test_differing_rules_are_scoped_per_screen():
+    svg = composite_screens([screen("a", ".button{fill:red}", "<rect/>"), screen("b", ".button{fill:blue}", "<rect/>")])
+    css = style_text(svg)
+    assert "#screen-a .button { fill:red }" in css
+    assert "#screen-b .button { fill:blue }" in css
+
+
+def test_media_blocks_and_id_selectors_survive():
+    style = "@media (max-width: 600px) { .button { fill: green } } #logo { fill: url(#grad) } svg text { font-size: 12px }"
+    svg = composite_screens([
+        screen("a", style, '<defs><linearGradient id="grad"/></defs><rect id="logo"/>'),
+        screen("b", "", "<rect/>"),
+    ])
+    css = style_text(svg)
+    assert "@media (max-width: 600px) { #screen-a .button { fill: green } }" in css
+    assert "#screen-a #a-logo { fill: url(#a-grad) }" in css
+    assert "#screen-a text { font-size: 12px }" in css
+
+
+def test_unparsable_screen_is_reported():
+    with pytest.raises(ValueError, match="screen 'b'"):
+        composite_screens([screen("a", "", "<rect/>"), {"screen_id": "b", "svg_code": "<svg><g></svg>"}])
+
+
+def screen_groups(svg):
+    return [group.get("id") for group in ET.fromstring(svg).findall("{http://www.w3.org/2000/svg}g")]
+
+
+def test_compiled_layout_screen_ids_are_unique_and_id_safe():
+    layout = {
+        "screens": [
+            {"id": "Home", "items": [["title", 0, 0, 4, 1, "One"]]},
+            {"id": "home", "items": [["title", 0, 0, 4, 1, "Two"]]},
+            {"id": "???", "items": [["title", 0, 0, 4, 1, "Three"]]},
+        ],
+        "flows": [["Home", "???", "Next"], ["home", "nowhere"]],
+    }
+    svg = compile_layout(layout, default_size=(360, 800))
+    assert screen_groups(svg) == ["screen-home", "screen-home-2", "screen-screen-3"]
+    assert svg.count('class="arrow"') == 1
+
+
+def test_plan_screens_with_the_same_name_get_distinct_ids():
+    plan = {"screens": [{"name": "Details"}, {"name": "Details"}, {"id": "details-2"}]}
+    assert [sub["screen_id"] for sub in split_plan_by_screen(plan)] == ["details", "details-2", "details-2-3"]
+    assert extract_screen_flows(plan) == [("details", "details-2", ""), ("details-2", "details-2-3", "")]
@@ -0,0 +1,44 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.endpoints import wireframe
+from app.config import settings
+from app.main import app
+from app.services.conversation import ConversationSession
+from app.services.conversation.intent import IntentDecision
+
+
+def test_session_keeps_the_transcript_as_lines():
+    session = ConversationSession()
+    for role, content in [("user", "a shop"), ("assistant", "Which pages?"), ("user", "cart"), ("user", "and checkout")]:
+        session.append(role, content)
+
+    assert session.history_text == "user: a shop\nassistant: Which pages?\nuser: cart\nuser: and checkout"
+    assert session.user_description() == "a shop\ncart\nand checkout"
+    assert session.recent_user_text(2) == "cart\nand checkout"
+    assert session.recent_user_text(0) == ""
+
+
+@pytest.fixture
+def scored(monkeypatch):
+    texts = []
+
+    def decide(text, **thresholds):
+        texts.append(text)
+        return IntentDecision(action="ask", probability=0.1, missing=["purpose"], question="What is it for?")
+
+    monkeypatch.setattr(wireframe, "get_intent_classifier", lambda: SimpleNamespace(decide=decide))
+    monkeypatch.setattr(settings, "INTENT_CLASSIFIER_ENABLED", True)
+    monkeypatch.setattr(settings, "INTENT_CONTEXT_MESSAGES", 2)
+    return texts
+
+
+def test_intent_scores_the_new_message_with_a_bounded_window(scored):
+    client = TestClient(app)
+    session_id = client.post("/api/v1/wireframe/conversation", json={"user_input": "one", "start_session": True}).json()["session_id"]
+    for text in ("two", "three", "four"):
+        client.post("/api/v1/wireframe/conversation", json={"user_input": text, "session_id": session_id})
+
+    assert scored == ["one", "one\ntwo", "one\ntwo\nthree", "two\nthree\nfour"]
@@ -0,0 +1,60 @@
+import asyncio
+import io
+
+from PIL import Image, ImageDraw
+
+from app.api.dependencies import SimpleCache
+from app.services.imaging import ImageResultCache, PerceptualHashIndex
+from app.utils.image_processor import load_image
+
+
+class InlinePool:
+    """Runs conversions in the calling thread, in place of the process pool."""
+
+    async def run(self, func, *args):
+        return func(*args)
+
+
+def screenshot(width, height):
+    image = Image.new("RGB", (800, 600), "white")
+    draw = ImageDraw.Draw(image)
+    draw.rectangle([0, 0, 799, 60], fill="#223344")
+    draw.rectangle([40, 120, 380, 420], outline="black", width=3)
+    draw.rectangle([420, 120, 760, 220], fill="#4477cc")
+    return image.resize((width, height))
+
+
+def encode(image, fmt="PNG", **options):
+    buffer = io.BytesIO()
+    image.save(buffer, fmt, **options)
+    return buffer.getvalue()
+
+
+def image_size(content):
+    return load_image(content).size
+
+
+def convert(cache, content):
+    return asyncio.run(cache.convert(InlinePool(), image_size, content))
+
+
+def test_near_hits_require_the_same_working_size():
+    cache = ImageResultCache(SimpleCache(), PerceptualHashIndex(max_distance=16))
+    assert convert(cache, encode(screenshot(800, 600))) == (800, 600)
+
+    assert convert(cache, encode(screenshot(800, 600), "JPEG", quality=70)) == (800, 600)
+    assert cache.stats["near_hits"] == 1
+    # downscaled to the same working size on load
+    assert convert(cache, encode(screenshot(1600, 1200))) == (800, 600)
+    assert cache.stats["near_hits"] == 2
+    # a smaller copy gets results in its own coordinates
+    assert convert(cache, encode(screenshot(400, 300))) == (400, 300)
+    assert cache.stats["misses"] == 2
+
+
+def test_results_are_bounded_by_the_cache():
+    store = SimpleCache(max_entries=4)
+    cache = ImageResultCache(store)
+    for width in range(100, 160, 10):
+        convert(cache, encode(screenshot(width, 100)))
+    assert len(store.cache) == 4
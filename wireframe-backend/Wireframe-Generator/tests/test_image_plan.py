@@ -0,0 +1,39 @@
+import xml.etree.ElementTree as ET
+
+from app.services.wireframe.image_plan import image_wireframe_plan, is_traced_plan, traced_components, traced_layout
+from app.services.wireframe.layout_dsl import compile_layout
+
+
+SVG_RECT = "{http://www.w3.org/2000/svg}rect"
+
+LAYOUT = {
+    "width": 600,
+    "height": 450,
+    "elements": [
+        {"id": 0, "type": "navbar", "x": 0, "y": 0, "width": 600, "height": 37, "parent": None},
+        {"id": 1, "type": "card", "x": 17, "y": 75, "width": 281, "height": 151, "parent": None},
+        {"id": 2, "type": "button", "x": 33, "y": 181, "width": 121, "height": 29, "parent": 1},
+        {"id": 3, "type": "input", "x": 317, "y": 75, "width": 263, "height": 31, "parent": None},
+    ],
+}
+
+
+def test_traced_components_list_containers_before_their_children():
+    plan = image_wireframe_plan(LAYOUT, "sign up page")
+    assert is_traced_plan(plan)
+    components = traced_components(plan)
+    assert [component["type"] for component in components] == ["navbar", "card", "button", "field"]
+    assert [component["parent"] for component in components] == [None, None, 1, None]
+
+
+def test_traced_layout_compiles_at_the_measured_boxes():
+    plan = image_wireframe_plan(LAYOUT, "sign up page")
+    svg = compile_layout(traced_layout(plan, ["Brand", "", "Join now"]))
+
+    boxes = [
+        [round(float(rect.get(key))) for key in ("x", "y", "width", "height")]
+        for rect in ET.fromstring(svg).iter(SVG_RECT)
+        if rect.get("class") != "screen"
+    ]
+    assert boxes == [component["box"] for component in traced_components(plan)]
+    assert ">Brand<" in svg and ">Join now<" in svg
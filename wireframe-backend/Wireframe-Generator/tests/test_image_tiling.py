@@ -0,0 +1,143 @@
+import io
+import subprocess
+import sys
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw
+
+from app.utils.image_processor import get_contours, get_contours_tiled, image_bytes_to_svg, png_header, png_strips, working_strips
+
+
+WIDTH, HEIGHT = 600, 2400
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def tall_page():
+    """Full-page capture: repeated sections plus outlines that cross many band seams."""
+    page = Image.new("RGB", (WIDTH, HEIGHT), "#f7f7f7")
+    draw = ImageDraw.Draw(page)
+    for top in range(0, HEIGHT, 300):
+        draw.rectangle([0, top, WIDTH - 1, top + 50], fill="#223344")
+        draw.rectangle([30, top + 80, 280, top + 260], outline="black", width=3)
+        draw.ellipse([320, top + 90, 440, top + 210], outline="#333333", width=2)
+        for row in range(4):
+            draw.rectangle([470, top + 90 + row * 40, 570, top + 100 + row * 40], fill="#777777")
+    draw.line([10, 0, 10, HEIGHT], fill="#333333", width=2)
+    draw.rectangle([20, 270, WIDTH - 20, HEIGHT // 2], outline="#555555", width=3)
+    draw.ellipse([150, 900, 450, 1700], outline="#aa2222", width=4)
+    return page
+
+
+def coverage(outlines):
+    mask = np.zeros((HEIGHT, WIDTH), np.uint8)
+    for points, closed in outlines:
+        cv2.polylines(mask, [points.reshape(-1, 1, 2).astype(np.int32)], closed, 1, 1)
+    return mask
+
+
+@pytest.fixture(scope="module")
+def page():
+    return tall_page()
+
+
+@pytest.fixture(scope="module")
+def global_outlines(page):
+    return [(contour, True) for contour in get_contours(page)]
+
+
+@pytest.mark.parametrize("band_height", [97, 256, 512, 1000, HEIGHT])
+@pytest.mark.parametrize("threads", [1, 3])
+def test_tiled_tracing_matches_the_global_trace(page, global_outlines, band_height, threads):
+    tiled = get_contours_tiled(page, band_height=band_height, threads=threads)
+
+    assert len(tiled) == len(global_outlines)
+    assert all(closed for _, closed in tiled)
+
+    # both traces simplify the same outlines, so their vertices may differ by the simplification tolerance
+    expected, actual = coverage(global_outlines), coverage(tiled)
+    kernel = np.ones((5, 5), np.uint8)
+    assert not (actual & ~cv2.dilate(expected, kernel)).any()
+    assert not (expected & ~cv2.dilate(actual, kernel)).any()
+
+
+def test_tiled_tracing_keeps_the_outline_bounds(page, global_outlines):
+    bounds = lambda outlines: np.array([cv2.boundingRect(points.reshape(-1, 1, 2).astype(np.int32)) for points, _ in outlines])
+    expected, actual = bounds(global_outlines), bounds(get_contours_tiled(page, band_height=200))
+    # every outline has a counterpart within a couple of pixels, in both directions
+    distance = np.abs(expected[:, None, :] - actual[None, :, :]).max(axis=2)
+    assert distance.min(axis=1).max() <= 2
+    assert distance.min(axis=0).max() <= 2
+
+
+def encode_png(image, **options):
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG", **options)
+    return buffer.getvalue()
+
+
+@pytest.fixture(scope="module")
+def png_pages(page):
+    noise = np.random.default_rng(0).integers(0, 256, (HEIGHT, WIDTH, 3), dtype=np.uint8)
+    # enough colors for an 8-bit palette, the only depth png_strips reads
+    palette = Image.blend(page, Image.fromarray(noise), 0.5).quantize(200)
+    pages = {mode: encode_png(page.convert(mode)) for mode in ("RGB", "RGBA", "L", "LA")}
+    return {**pages, "P": encode_png(palette)}
+
+
+@pytest.mark.parametrize("mode", ["RGB", "RGBA", "L", "LA", "P"])
+@pytest.mark.parametrize("rows", [1, 7, 256, HEIGHT])
+def test_png_strips_match_the_whole_decode(png_pages, mode, rows):
+    content = png_pages[mode]
+    assert png_header(content) is not None
+    strips = np.concatenate([np.asarray(strip) for strip in png_strips(content, rows)])
+    assert np.array_equal(strips, np.asarray(Image.open(io.BytesIO(content)).convert("RGB")))
+
+
+def test_png_strips_reject_truncated_data(page):
+    content = encode_png(page)
+    with pytest.raises(OSError):
+        list(png_strips(content[:len(content) // 2]))
+
+
+def test_streamed_conversion_matches_the_decoded_page(page):
+    # wider than the working size, so strips are also resized on the way
+    content = encode_png(page.resize((900, 3600)))
+    size, strips = working_strips(content)
+    resized = np.concatenate([np.asarray(strip) for strip in strips])
+    expected = Image.open(io.BytesIO(content)).convert("RGB").resize(size, Image.BICUBIC)
+    assert np.array_equal(resized, np.asarray(expected))
+    assert image_bytes_to_svg(content) == image_bytes_to_svg(expected)
+
+
+def rectangles_page(height):
+    image = Image.new("RGB", (WIDTH, height), "white")
+    draw = ImageDraw.Draw(image)
+    for top in range(0, height, 300):
+        draw.rectangle([20, top + 20, WIDTH - 20, top + 380], outline="black", width=3)
+    return encode_png(image)
+
+
+# converts the PNG at argv[1] in a fresh process and prints the growth of its peak resident memory, in KB
+PEAK_MEMORY_SCRIPT = """
+import resource, sys
+from app.utils.image_processor import image_bytes_to_svg
+content = open(sys.argv[1], "rb").read()
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+image_bytes_to_svg(content)
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before)
+"""
+
+
+def test_streamed_tracing_memory_does_not_grow_with_the_page(tmp_path):
+    growth = []
+    for height in (4000, 20000):
+        path = tmp_path / f"page-{height}.png"
+        path.write_bytes(rectangles_page(height))
+        result = subprocess.run([sys.executable, "-c", PEAK_MEMORY_SCRIPT, str(path)], cwd=BACKEND_DIR,
+                                capture_output=True, text=True, check=True)
+        growth.append(int(result.stdout.split()[-1]))
+    # 16000 more rows are 27 MB of decoded pixels; traced in strips, the peak barely moves
+    assert growth[1] - growth[0] < 8 * 1024
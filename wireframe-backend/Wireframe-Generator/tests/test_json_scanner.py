@@ -0,0 +1,136 @@
+import json
+
+import pytest
+
+from app.utils import json_scanner
+from app.utils.json_scanner import IncrementalJsonParser, extract_json, parse_json, repair_json
+
+
+PLAN = {
+    "metadata": {"project_name": "Shop {beta}", "note": "brackets ] and \"quotes\" in strings"},
+    "component_library": ["navbar", "card"],
+    "screens": [
+        {"id": "home", "components": [{"type": "navbar"}, {"type": "card", "label": "a \\ b"}]},
+        {"id": "cart", "components": [], "notes": "[not a bracket]"},
+        {"id": "checkout", "nested": {"screens": [{"id": "ignored"}]}},
+    ],
+    "annotations": {"flows": [["home", "cart"], ["cart", "checkout"]]},
+}
+
+
+def chunked(text, size):
+    return [text[index:index + size] for index in range(0, len(text), size)]
+
+
+@pytest.mark.parametrize("damaged, expected", [
+    ('{"a": 1, "b": [1, 2,],}', {"a": 1, "b": [1, 2]}),
+    ("{a: 1, b: 'x'}", {"a": 1, "b": "x"}),
+    ("{'a': 'it\\'s \"here\"', 'b': [1, 'two words']}", {"a": "it's \"here\"", "b": [1, "two words"]}),
+    ('{"a": True, "b": None, "c": NaN}', {"a": True, "b": None, "c": None}),
+    ('{"a": 1 "b": 2}', {"a": 1, "b": 2}),
+    ('{"a": "say "hi" now", "b": 1}', {"a": 'say "hi" now', "b": 1}),
+    ('{"a": "line\nbreak", "b": "bad \\q escape"}', {"a": "line\nbreak", "b": "bad \\q escape"}),
+    ('{"pattern": "\\d+", "path": "C:\\\\dir", "u": "\\u00e9 \\uzz"}', {"pattern": "\\d+", "path": "C:\\dir", "u": "\u00e9 \\uzz"}),
+    ('{"a": 1, // comment\n "b": /* block */ 2}', {"a": 1, "b": 2}),
+    ('{"a": [1, 2', {"a": [1, 2]}),
+    ('{"a": 1, "b": "trunc', {"a": 1, "b": "trunc"}),
+    ('{"a": 1, "b":', {"a": 1}),
+    ('{"a": {"b": [1, {"c": 2}', {"a": {"b": [1, {"c": 2}]}}),
+    ('{"a": 1}}]', {"a": 1}),
+    ('{"a": [1, 2}, "b": 3}', {"a": [1, 2], "b": 3}),
+    ('[{"a": 1], {"b": 2}]', [{"a": 1}, {"b": 2}]),
+])
+def test_repair(damaged, expected):
+    assert parse_json(damaged) == expected
+    assert json.loads(repair_json(damaged)) == expected
+
+
+def test_deeply_nested_damage_is_repaired_in_linear_time(monkeypatch):
+    # retrying the C decoder at every container down to the damage would scan O(n * depth) characters
+    depth = 400
+    damaged = '{"a": ' * depth + '[1,, 2]' + "}" * depth
+    scanned = []
+
+    class CountingDecoder:
+        def raw_decode(self, text, position):
+            try:
+                end = json.JSONDecoder().raw_decode(text, position)[1]
+            except json.JSONDecodeError as e:
+                scanned.append(e.pos - position)
+                raise
+            scanned.append(end - position)
+            return None, end
+
+    monkeypatch.setattr(json_scanner, "DECODER", CountingDecoder())
+    repaired = json.loads(repair_json(damaged))
+    for _ in range(depth):
+        repaired = repaired["a"]
+    assert repaired == [1, 2]
+    assert sum(scanned) <= (json_scanner.DECODE_RETRY_PASSES + 2) * len(damaged)
+
+
+def test_valid_json_is_untouched():
+    text = json.dumps(PLAN)
+    assert repair_json(text) == text
+    assert parse_json(text) == PLAN
+
+
+def test_unparsable_text_raises():
+    with pytest.raises(ValueError):
+        parse_json("no json here")
+
+
+@pytest.mark.parametrize("response", [
+    "Here is the plan:\n```json\n{doc}\n```\nLet me know!",
+    "Here [is] the plan:\n```json\n{doc}\n```",
+    "{doc}",
+    "Sure {maybe}:\n```\n{doc}\n```",
+])
+def test_extract_json_prefers_the_fence(response):
+    text = response.replace("{doc}", json.dumps(PLAN))
+    assert json.loads(extract_json(text)) == PLAN
+
+
+def test_extract_json_keeps_truncated_documents():
+    text = "```json\n" + json.dumps(PLAN)[:120]
+    assert extract_json(text) == json.dumps(PLAN)[:120]
+    assert parse_json(extract_json(text))["metadata"] == PLAN["metadata"]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 5, 8, 13, 64, 10000])
+def test_incremental_parser_is_chunking_independent(size):
+    text = "Plan follows\n" + json.dumps(PLAN, indent=2)
+    parser = IncrementalJsonParser(watch=("screens",))
+    screens = [element for chunk in chunked(text, size) for element in parser.feed(chunk)]
+    assert screens == PLAN["screens"]
+    assert parser.close() == PLAN
+
+
+def test_incremental_parser_reports_screens_before_the_document_ends():
+    text = json.dumps(PLAN)
+    cut = text.index('"annotations"')
+    parser = IncrementalJsonParser(watch=("screens",))
+    assert parser.feed(text[:cut]) == PLAN["screens"]
+    assert parser.feed(text[cut:]) == []
+
+
+def test_incremental_parser_close_repairs_a_cut_stream():
+    text = json.dumps(PLAN)
+    cut = text.index('{"id": "cart"') + 20
+    parser = IncrementalJsonParser(watch=("screens",))
+    assert parser.feed(text[:cut]) == PLAN["screens"][:1]
+    assert parser.close()["screens"][0] == PLAN["screens"][0]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 10000])
+@pytest.mark.parametrize("response", [
+    "Here [is] the plan:\n```json\n{doc}\n```\nDone [ok].",
+    "Here {is} the plan:\n```json\n{doc}\n```",
+    "```json\n{doc}\n```",
+])
+def test_incremental_parser_follows_the_fence(response, size):
+    text = response.replace("{doc}", json.dumps(PLAN))
+    parser = IncrementalJsonParser(watch=("screens",))
+    screens = [element for chunk in chunked(text, size) for element in parser.feed(chunk)]
+    assert screens == PLAN["screens"]
+    assert parser.close() == PLAN
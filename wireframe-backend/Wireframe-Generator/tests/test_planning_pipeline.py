@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+from app.services.wireframe import agents
+from benchmarks.fake_llm import FakeLLMScript, fake_llm, sample_plan
+
+
+@pytest.fixture
+def drawn(monkeypatch):
+    plans = []
+    original = agents.svg_screen_agent
+
+    def spy(state):
+        plans.append(state["wireframe_plan"])
+        return original(state)
+
+    monkeypatch.setattr(agents, "svg_screen_agent", spy)
+    return plans
+
+
+def plan_stream(plan):
+    script = FakeLLMScript(screen_count=len(plan["screens"]), stream_chunk_size=16)
+    script.responses["planning"] = "```json\n" + json.dumps(plan, indent=2) + "\n```"
+    return script
+
+
+def run_planning(script):
+    with fake_llm(script):
+        return agents.pipelined_planning_agent({"detailed_requirements": {"project_type": "shop"}, "errors": []})
+
+
+def test_screens_are_dispatched_while_the_plan_streams(drawn):
+    result = run_planning(plan_stream(sample_plan(4)))
+
+    assert not result.get("errors") and len(result["screen_svgs"]) == 4
+    # sections after the screens were not written yet when the screens were handed out
+    assert all("technical_considerations" not in plan for plan in drawn)
+    assert all("component_library" in plan and "design_system" in plan for plan in drawn)
+
+
+@pytest.mark.parametrize("late_key", ["design_system", "component_library"])
+def test_screens_wait_for_shared_sections_written_after_them(drawn, late_key):
+    plan = sample_plan(4)
+    plan[late_key] = plan.pop(late_key)
+
+    result = run_planning(plan_stream(plan))
+
+    assert not result.get("errors") and len(result["screen_svgs"]) == 4
+    assert len(drawn) == 4
+    assert all(plan[late_key] == drawn_plan[late_key] for drawn_plan in drawn)
+
+
+def test_discarded_screens_are_logged(drawn, caplog):
+    plan = sample_plan(3)
+    text = json.dumps(plan, indent=2)
+    # the model repeats a shared section after the screens; the later copy wins the parse
+    script = plan_stream(plan)
+    script.responses["planning"] = "```json\n" + text[:-2] + ',\n  "design_system": {"colors": ["#000"]}\n}\n```'
+
+    with caplog.at_level("INFO", logger=agents.__name__):
+        result = run_planning(script)
+
+    assert result["wireframe_plan"]["design_system"] == {"colors": ["#000"]}
+    assert len(result["screen_svgs"]) == 3
+    assert drawn[-3:] == [result["wireframe_plan"]] * 3
+    assert any(record.getMessage().startswith("Discarding 3 screen generations") for record in caplog.records)
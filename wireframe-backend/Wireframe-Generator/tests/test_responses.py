@@ -0,0 +1,37 @@
+import itertools
+
+import orjson
+
+from app.api.responses import MAX_PREPARED_BODIES, PreparedWireframe
+from app.models.wireframe import WireframeResponse
+
+
+def prepared():
+    return PreparedWireframe(WireframeResponse(
+        svg_code="<svg/>",
+        detailed_requirements={"project": "shop"},
+        wireframe_plan={"screens": []},
+        svg_variants=None,
+        svg_optimization=None,
+        artifacts={"svg_code": "abc"},
+        errors=None,
+        status=200,
+    ))
+
+
+def test_field_selections_share_one_body_whatever_their_order():
+    response = prepared()
+    body = response.json_body(fields=["status", "svg_code"])
+    assert response.json_body(fields=["svg_code", "status", "svg_code"]) is body
+    assert orjson.loads(body) == {"svg_code": "<svg/>", "status": 200}
+    assert list(orjson.loads(body)) == ["svg_code", "status"]
+
+
+def test_cached_bodies_are_bounded():
+    response = prepared()
+    selections = [list(pair) for pair in itertools.combinations(WireframeResponse.model_fields, 2)]
+    assert len(selections) > MAX_PREPARED_BODIES
+    for ids_only in (False, True):
+        for fields in selections:
+            assert set(orjson.loads(response.json_body(ids_only, fields))) == set(fields)
+    assert len(response.bodies) == MAX_PREPARED_BODIES + 1
@@ -0,0 +1,70 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.dependencies import get_artifact_store, get_cache, get_speculation_manager
+from app.api.endpoints import wireframe
+from app.main import app
+from app.services.wireframe.speculation import SpeculationManager, covers
+from benchmarks.fake_llm import FakeLLMScript, fake_llm
+
+
+@pytest.fixture
+def client(monkeypatch):
+    manager = SpeculationManager(max_workers=1)
+    monkeypatch.setattr(wireframe, "get_conversation_llm", lambda: SimpleNamespace(
+        invoke=lambda prompt: SimpleNamespace(content="Which screens do you need?")
+    ))
+    app.dependency_overrides[get_speculation_manager] = lambda: manager
+    app.dependency_overrides[get_cache] = lambda: None
+    app.dependency_overrides[get_artifact_store] = lambda: None
+    with fake_llm(FakeLLMScript()) as script:
+        yield TestClient(app), manager, script
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.parametrize("speculated, current, expected", [
+    ("I need a fitness app", "I need a fitness app", True),
+    ("I need a fitness app", "I need a fitness app\nyes", True),
+    ("I need a fitness app", "I need a fitness app\nand a dashboard for the admins", False),
+    ("I need a fitness app", "I need a recipe app", False),
+])
+def test_covers(speculated, current, expected):
+    assert covers(speculated, current, max_drift=40) is expected
+
+
+def test_generate_claims_the_run_of_its_session(client):
+    client, manager, script = client
+    reply = client.post("/api/v1/wireframe/conversation", json={
+        "user_input": "I need a fitness app", "start_session": True,
+    }).json()
+    session_id = reply["session_id"]
+    client.post("/api/v1/wireframe/conversation", json={"user_input": "yes", "session_id": session_id})
+    assert manager.report()["started"] == 1
+    manager.entries[session_id]["future"].result(timeout=10)
+    del script.calls[:]
+
+    # the frontend wraps the conversation in its own prompt, the run still stands in for it
+    response = client.post("/api/v1/wireframe/generate", json={
+        "user_query": "Conversation Context:\nuser: I need a fitness app\n\nuser: yes\n\nBased on this conversation, create a wireframe.",
+        "session_id": session_id,
+    })
+
+    assert response.status_code == 200
+    assert manager.report()["hits"] == 1
+    assert "query_expansion" not in script.calls and "requirements" not in script.calls
+
+
+def test_generate_discards_a_run_the_session_outgrew(client):
+    client, manager, _ = client
+    session_id = client.post("/api/v1/wireframe/conversation", json={
+        "user_input": "I need a fitness app", "start_session": True,
+    }).json()["session_id"]
+    manager.start(session_id, "I need a recipe app")
+
+    response = client.post("/api/v1/wireframe/generate", json={"user_query": "I need a fitness app", "session_id": session_id})
+
+    assert response.status_code == 200
+    report = manager.report()
+    assert report["hits"] == 0 and report["discarded"] == 2
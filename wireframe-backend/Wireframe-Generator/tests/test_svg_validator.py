@@ -0,0 +1,107 @@
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from app.utils.svg_validator import validate_svg, validate_svg_stream
+
+
+HEAD = '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 100 100">'
+
+
+def codes(result):
+    return {diagnostic.code for diagnostic in result.diagnostics}
+
+
+def chunked(text, size):
+    return [text[index:index + size] for index in range(0, len(text), size)]
+
+
+def test_clean_svg_passes_unchanged():
+    svg = HEAD + '<rect x="1" y="2" width="3" height="4"/><text>a &amp; b</text></svg>'
+    result = validate_svg(svg)
+    assert result.valid and not result.repaired
+    assert result.svg_code == svg
+
+
+def test_html_entities_become_character_references():
+    result = validate_svg(HEAD + "<text>A&nbsp;B &copy; &amp; &#169;</text></svg>")
+    assert result.valid
+    assert "html_entity" in codes(result)
+    text = ET.fromstring(result.svg_code).find("{http://www.w3.org/2000/svg}text").text
+    assert text == "A B © & ©"
+
+
+def test_unknown_entity_is_escaped():
+    result = validate_svg(HEAD + '<text title="&bogus;">&bogus;</text></svg>')
+    assert result.valid
+    element = ET.fromstring(result.svg_code).find("{http://www.w3.org/2000/svg}text")
+    assert element.text == "&bogus;"
+    assert element.get("title") == "&bogus;"
+
+
+def test_entities_in_attributes_are_converted():
+    result = validate_svg(HEAD + '<text aria-label="Next&hellip;">x</text></svg>')
+    assert result.valid
+    element = ET.fromstring(result.svg_code).find("{http://www.w3.org/2000/svg}text")
+    assert element.get("aria-label") == "Next…"
+
+
+def test_undeclared_prefixes_are_declared():
+    svg = HEAD + '<g inkscape:label="x"/><sodipodi:namedview id="n"><rect/></sodipodi:namedview><foo:bar/></svg>'
+    result = validate_svg(svg)
+    assert result.valid
+    assert "undeclared_prefix" in codes(result)
+    root = ET.fromstring(result.svg_code)
+    group = root.find("{http://www.w3.org/2000/svg}g")
+    assert group.get("{http://www.inkscape.org/namespaces/inkscape}label") == "x"
+
+
+def test_prefix_declared_by_an_ancestor_is_kept():
+    svg = HEAD + '<g xmlns:app="urn:app"><rect app:role="button"/></g><rect app:role="x"/></svg>'
+    result = validate_svg(svg)
+    assert result.valid
+    ET.fromstring(result.svg_code)
+    # the first rect is covered by its parent, the second needs its own declaration
+    assert result.svg_code.count('xmlns:app=') == 2
+
+
+def test_xlink_href_without_declaration_parses():
+    result = validate_svg('<svg viewBox="0 0 10 10"><use xlink:href="#a"/></svg>')
+    assert result.valid
+    ET.fromstring(result.svg_code)
+
+
+def test_unrepairable_markup_is_invalid():
+    result = validate_svg(HEAD + '<rect a:b:c="1"/></svg>')
+    assert not result.valid
+    assert "not_well_formed" in codes(result)
+
+
+def test_missing_root_is_invalid():
+    result = validate_svg("no svg here")
+    assert not result.valid
+    assert "missing_root" in codes(result)
+
+
+@pytest.mark.parametrize("svg", [
+    '<svg width="300" height="200"><rect x=1 y="2" width="3" height="4"><circle r="2"/></svg>',
+    'Here you go: <svg viewBox="0 0 9 9"><text>a < b & c &nbsp;</text><g><rect/></svg> trailing',
+    HEAD + '<g inkscape:label="x"><text>&copy; 2024</text></g><path d="M0 0',
+])
+def test_repairs_produce_well_formed_svg(svg):
+    result = validate_svg(svg)
+    assert result.valid and result.repaired
+    ET.fromstring(result.svg_code)
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64])
+def test_stream_matches_single_pass(size):
+    svg = (
+        'Sure! <svg width="300" height="200"><g inkscape:label="nav"><text>Home&nbsp;&amp; more</text>'
+        '<rect x=1 y="2" width="3" height="4"><circle r="2"/></g><text title="&copy;">a < b</text>'
+    )
+    single = validate_svg_stream([svg])
+    streamed = validate_svg_stream(chunked(svg, size))
+    assert streamed.svg_code == single.svg_code
+    assert streamed.valid == single.valid
+    ET.fromstring(streamed.svg_code)
@@ -9,11 +9,14 @@ interface ChatMessage {
 interface ConversationRequest {
     messages: ChatMessage[];
     user_input: string;
+    session_id?: string;
+    start_session?: boolean;
 }
 
 interface ConversationResponse {
     response: string;
     should_generate: boolean;
+    session_id?: string | null;
 }
 
 const axiosInstance = axios.create({
@@ -23,17 +26,24 @@ const axiosInstance = axios.create({
     }
 });
 
-export const handleConversation = async (messages: ChatMessage[], user_input: string): Promise<ConversationResponse> => {
+// With a session id only the messages after the first `syncedCount` are sent, the server keeps the rest
+export const handleConversation = async (messages: ChatMessage[], user_input: string, sessionId?: string | null, syncedCount: number = 0): Promise<ConversationResponse> => {
+    const request: ConversationRequest = {
+        messages: (sessionId ? messages.slice(syncedCount) : messages).map(m => ({
+            role: m.role,
+            content: m.content
+        })),
+        user_input: user_input,
+        ...(sessionId ? { session_id: sessionId } : { start_session: true })
+    };
     try {
-        const response = await axiosInstance.post('/wireframe/conversation', { 
-            messages: messages.map(m => ({
-                role: m.role,
-                content: m.content
-            })),
-            user_input: user_input
-        });
+        const response = await axiosInstance.post('/wireframe/conversation', request);
         return response.data as ConversationResponse;
     } catch (error: any) {
+        if (sessionId && error.response?.status === 404) {
+            // the session expired on the server, start a new one from the full history
+            return handleConversation(messages, user_input);
+        }
         console.error('Error in handleConversation:', error);
         if (error.response?.status === 500) {
             return {
@@ -48,9 +58,13 @@ export const handleConversation = async (messages: ChatMessage[], user_input: st
     }
 };
 
-export const generateWireframe = async (user_query: string): Promise<WireframeResponse> => {
+export const generateWireframe = async (user_query: string, sessionId?: string | null): Promise<WireframeResponse> => {
     try {
-        const response = await axiosInstance.post<Omit<WireframeResponse, 'status'>>('/wireframe/generate', { user_query });
+        // with the session id the server may reuse the stages it started during the conversation
+        const response = await axiosInstance.post<Omit<WireframeResponse, 'status'>>('/wireframe/generate', {
+            user_query,
+            ...(sessionId ? { session_id: sessionId } : {})
+        });
         return {
             ...response.data,
             status: response.status
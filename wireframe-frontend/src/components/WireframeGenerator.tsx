@@ -39,6 +39,8 @@ const WireframeGenerator: React.FC<WireframeGeneratorProps> = ({ initialDescript
     const [tabValue, setTabValue] = useState(0);
     const [questionCount, setQuestionCount] = useState(0);
     const [hasStarted, setHasStarted] = useState(false);
+    // server-side conversation session, and how many of `messages` it already holds
+    const sessionRef = useRef<{ id: string | null; synced: number }>({ id: null, synced: 0 });
     const messagesEndRef = useRef<HTMLDivElement>(null);
     const inputRef = useRef<HTMLInputElement>(null);
 
@@ -96,7 +98,11 @@ const WireframeGenerator: React.FC<WireframeGeneratorProps> = ({ initialDescript
             }));
 
             // Get intelligent AI response
-            const conversationResponse = await handleConversation(apiMessages, messageText);
+            const conversationResponse = await handleConversation(apiMessages, messageText, sessionRef.current.id, sessionRef.current.synced);
+            if (conversationResponse.session_id) {
+                // the session now holds the history plus this user message and the reply
+                sessionRef.current = { id: conversationResponse.session_id, synced: apiMessages.length + 2 };
+            }
             
             const aiResponse: ChatMessage = {
                 role: 'assistant',
@@ -147,7 +153,7 @@ user: ${inputValue}
 Based on this detailed conversation, create a professional wireframe that addresses all the discussed requirements.`;
 
         try {
-            const result = await generateWireframe(enhancedPrompt);
+            const result = await generateWireframe(enhancedPrompt, sessionRef.current.id);
             
             if (result.errors && result.errors.length > 0) {
                 const errorMessage: ChatMessage = {
@@ -196,6 +202,7 @@ Based on this detailed conversation, create a professional wireframe that addres
         setWireframeResponse(null);
         setQuestionCount(0);
         setInputValue('');
+        sessionRef.current = { id: null, synced: 0 };
     };
 
     const handleTabChange = (event: React.SyntheticEvent, newValue: number) => {